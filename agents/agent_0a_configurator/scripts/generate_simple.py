@@ -9,11 +9,12 @@ Run ONCE per new project to set up folder structure and industry-specific prompt
 import json
 import os
 import sys
-import urllib.request
-import urllib.parse
 from datetime import datetime
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "shared"))
+from llm_client import call_claude_api
+
 def load_config():
     """Load configuration from config.json"""
     config_path = Path(__file__).parent.parent / "config.json"
@@ -87,45 +88,6 @@ def create_project_structure(project_name, base_path, agent_list):
     
     return True, created_folders
 
-def call_claude_api(prompt, config):
-    """Call Claude API using urllib"""
-    try:
-        url = "https://api.anthropic.com/v1/messages"
-        
-        data = {
-            "model": config['model'],
-            "max_tokens": config['max_tokens'],
-            "temperature": config['temperature'],
-            "messages": [
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ]
-        }
-        
-        json_data = json.dumps(data).encode('utf-8')
-        
-        req = urllib.request.Request(url)
-        req.add_header('Content-Type', 'application/json')
-        req.add_header('x-api-key', config['anthropic_api_key'])
-        req.add_header('anthropic-version', '2023-06-01')
-        
-        print("  Calling Claude API for prompt generation...")
-        
-        with urllib.request.urlopen(req, json_data) as response:
-            response_data = json.loads(response.read().decode('utf-8'))
-            
-        if 'content' in response_data and len(response_data['content']) > 0:
-            return response_data['content'][0]['text']
-        else:
-            print("Error: Unexpected API response format")
-            return None
-            
-    except Exception as e:
-        print(f"Error calling Claude API: {e}")
-        return None
-
 def generate_system_prompts(project_details, config):
     """Generate industry-specific prompts for all agents"""
     print(f"\nGenerating industry-specific prompts for {project_details['product_type']}...")
@@ -171,7 +133,7 @@ Generate broad, flexible system prompts optimized for each of these 8 agents:
 Generate comprehensive, industry-optimized but flexible prompts now:
 """
 
-    return call_claude_api(prompt_generation_request, config)
+    return call_claude_api(prompt_generation_request, config, agent="configurator")
 
 def parse_generated_prompts(generated_content):
     """Parse generated content into individual agent prompts"""
@@ -283,35 +245,6 @@ def write_system_prompts(project_name, base_path, agent_list, prompts):
     
     return written_files
 
-def update_agent_configs(project_name, base_path, agent_list):
-    """Update config.json files with current_project"""
-    print(f"\nUpdating agent configurations...")
-    
-    updated_configs = []
-    
-    for agent_name in agent_list:
-        config_path = Path(base_path) / agent_name / "config.json"
-        
-        try:
-            # Read existing config
-            with open(config_path, 'r') as f:
-                agent_config = json.load(f)
-            
-            # Update project name
-            agent_config['current_project'] = project_name
-            
-            # Write back
-            with open(config_path, 'w') as f:
-                json.dump(agent_config, f, indent=2)
-            
-            updated_configs.append(str(config_path))
-            print(f"  ✓ Updated: {agent_name}/config.json")
-            
-        except Exception as e:
-            print(f"  ✗ Failed to update {config_path}: {e}")
-    
-    return updated_configs
-
 def save_project_log(project_details, output_dir):
     """Save project setup log"""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -386,12 +319,8 @@ def main():
         prompts
     )
     
-    # Update agent configurations
-    updated_configs = update_agent_configs(
-        project_details['project_name'],
-        base_path,
-        config['agent_list']
-    )
+    # No agent config.json is modified: Agent 0b passes the project to each agent,
+    # so several projects can run at the same time
     
     # Save project log
     output_dir = Path(__file__).parent.parent / "3_unlabeled"
@@ -404,7 +333,6 @@ SUCCESS! Project workspace created successfully.
 ✅ Product Type: {project_details['product_type']} expertise configured
 ✅ {len(created_folders)} folders created across 8 agents
 ✅ {len(written_files)} system prompts written and deployed  
-✅ {len(updated_configs)} agent configurations updated
 ✅ Ready for Agent 0b execution
 
 Project Details:
@@ -420,7 +348,11 @@ Next Steps:
    - user_story_real_reviews_agent/1_input/{project_details['project_name']}/customer_reviews.csv (optional)
    
 2. Run Agent 0b to execute the pipeline:
-   python agent_0b_orchestrator/scripts/generate_simple.py
+   python agent_0b_orchestrator/scripts/run_pipeline_phase1.py
+   (several projects at once: python agent_0b_orchestrator/scripts/run_pipeline_projects.py --phase 1 --projects {project_details['project_name']} ...)
+
+3. Run a single agent or evaluator by hand with --project:
+   python message_house_agent/scripts/generate_simple.py --project {project_details['project_name']}
 """)
 
 if __name__ == "__main__":
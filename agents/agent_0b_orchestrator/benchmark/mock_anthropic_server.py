@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+"""
+Agent 0b: Pipeline Orchestrator - Mock Anthropic API Server (No external dependencies)
+
+Local stand-in for the Claude API so the pipeline can run without a key,
+e.g. to measure the orchestrator's own overhead (see run_benchmark.py):
+
+- POST /v1/messages: JSON responses, or server-sent events when the request
+  sets "stream": true (chunked, so keep-alive connections are reused)
+- POST /v1/messages/batches, GET /v1/messages/batches/{id} and
+  GET /v1/messages/batches/{id}/results: a batch ends `batch_seconds`
+  after it was created; the first `batch_errors` batch requests come back
+  errored (overloaded_error), so clients must resubmit them, and the next
+  `batch_bad_lines` come back as malformed result lines (succeeded without
+  a message)
+- Canned responses: the sample asset in examples/sample_outputs whose agent
+  matches the system prompt, cut to max_tokens; the keywords vocabulary
+  judge (scripts/auto_approval.py) gets passing JSON scores; other prompts
+  get filler text
+- Latency: time to first token drawn from a distribution ("fixed:0.5",
+  "uniform:0.2,1.5", "normal:0.8,0.2" or "lognormal:0.6,0.5" = median,
+  sigma), then output at `tokens_per_second`
+- Error injection: per-request probabilities for 429 (with Retry-After), 500,
+  529, "timeout" (no response for `hang_seconds`) and "disconnect" (the
+  connection drops, mid-stream for streaming requests)
+- Prompt caching: system blocks with cache_control are reported as cache
+  writes the first time and cache reads afterwards
+- GET /_mock/stats returns every request served (start/end epoch seconds,
+  status, model, temperature, judge request or not, tokens); POST /_mock/reset
+  clears it
+
+Usage:
+    python benchmark/mock_anthropic_server.py --port 8765 --latency lognormal:0.6,0.5 --errors 429=0.05,529=0.02
+    # then set "api_base_url": "http://127.0.0.1:8765" in the agents' config.json
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import socket
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+DEFAULT_SAMPLES_DIR = Path(__file__).resolve().parent.parent.parent.parent / "examples" / "sample_outputs"
+DEFAULT_LATENCY = "lognormal:0.3,0.4"
+DEFAULT_TOKENS_PER_SECOND = 1000.0
+DEFAULT_HANG_SECONDS = 30.0
+DEFAULT_BATCH_SECONDS = 2.0
+# Characters per streamed text delta
+STREAM_CHUNK_CHARS = 40
+
+# System prompt phrase -> sample output shown for that agent (first match wins)
+CANNED_RESPONSES = (
+    ("expansion engine", "5_keywords_expansion_phase2.md"),
+    ("vocabulary generation", "5_keywords_vocabulary_phase1.md"),
+    ("twitter agent", "8_social_media.md"),
+    ("testimonial agent", "7_testimonials.md"),
+    ("website copy agent", "9_website_copy_with_Psychology_Logic.md"),
+    ("user story generator", "2_brand_personas.md"),
+    ("message house generator", "1_message_house.md"),
+)
+
+# Reply of the keywords vocabulary judge (weighted score 7.8)
+JUDGE_RESPONSE = json.dumps({
+    "scores": {"strategic_alignment": 8, "completeness": 8, "creative_expansion": 7,
+               "insightfulness": 8, "actionability": 8},
+    "notes": "Mock judgement.",
+})
+
+ERROR_RESPONSES = {
+    429: ("rate_limit_error", "Number of request tokens has exceeded your per-minute rate limit"),
+    500: ("api_error", "Internal server error"),
+    529: ("overloaded_error", "Overloaded"),
+}
+ERROR_KINDS = ("429", "500", "529", "timeout", "disconnect")
+
+
+def estimate_tokens(text):
+    """About 4 characters per token"""
+    return len(text) // 4 + 1
+
+
+def parse_latency(spec):
+    """Turn "kind:a,b" into a function returning seconds (never negative)"""
+    kind, _, args = spec.partition(':')
+    values = [float(value) for value in args.split(',') if value]
+    if kind == 'fixed':
+        return lambda rng: values[0]
+    if kind == 'uniform':
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == 'normal':
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == 'lognormal':
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def parse_errors(spec):
+    """Turn "429=0.05,timeout=0.01" into {"429": 0.05, "timeout": 0.01}"""
+    errors = {}
+    for item in filter(None, (spec or '').split(',')):
+        kind, _, probability = item.partition('=')
+        if kind not in ERROR_KINDS:
+            raise ValueError(f"Unknown error kind: {kind} (expected one of {', '.join(ERROR_KINDS)})")
+        errors[kind] = float(probability)
+    return errors
+
+
+def system_text(system):
+    """Plain text of a string or block-list system prompt"""
+    if isinstance(system, list):
+        return "\n".join(block.get('text', '') for block in system)
+    return system or ''
+
+
+def message_text(messages):
+    return "\n".join(
+        message['content'] if isinstance(message['content'], str)
+        else "\n".join(block.get('text', '') for block in message['content'])
+        for message in messages
+    )
+
+
+class MockAPI:
+    """Response generation, latency, error injection and request log shared by all handler threads"""
+
+    def __init__(self, latency=DEFAULT_LATENCY, tokens_per_second=DEFAULT_TOKENS_PER_SECOND, errors=None,
+                 hang_seconds=DEFAULT_HANG_SECONDS, batch_seconds=DEFAULT_BATCH_SECONDS, batch_errors=0,
+                 batch_bad_lines=0, samples_dir=DEFAULT_SAMPLES_DIR, seed=None):
+        self.first_token_latency = parse_latency(latency)
+        self.tokens_per_second = tokens_per_second
+        self.errors = errors or {}
+        self.hang_seconds = hang_seconds
+        self.batch_seconds = batch_seconds
+        self.batch_errors = batch_errors
+        self.batch_bad_lines = batch_bad_lines
+        self.samples = {}
+        for _, name in CANNED_RESPONSES:
+            path = Path(samples_dir) / name
+            if path.exists():
+                self.samples[name] = path.read_text(encoding='utf-8')
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.cached_prefixes = set()
+        self.batches = {}
+        self.requests = []
+
+    def draw(self):
+        """(time to first token, injected error or None) for one request"""
+        with self.lock:
+            first_token = self.first_token_latency(self.rng)
+            roll = self.rng.random()
+        for kind, probability in self.errors.items():
+            if roll < probability:
+                return first_token, kind
+            roll -= probability
+        return first_token, None
+
+    def record(self, **entry):
+        with self.lock:
+            self.requests.append(entry)
+
+    @staticmethod
+    def is_judge(params):
+        """Whether the request comes from the keywords vocabulary judge"""
+        return "vocabulary judge" in system_text(params.get('system')).lower()
+
+    def canned_text(self, params):
+        """Sample output matching the request's agent, cut to max_tokens"""
+        prompt = system_text(params.get('system')).lower()
+        text = JUDGE_RESPONSE if self.is_judge(params) else None
+        for phrase, name in CANNED_RESPONSES:
+            if text is None and phrase in prompt and name in self.samples:
+                text = self.samples[name]
+                break
+        if text is None:
+            prompt_text = message_text(params.get('messages', []))
+            text = "# Mock Response\n\n" + " ".join(
+                f"Generated paragraph {i + 1} for a {len(prompt_text)}-character prompt." for i in range(40)
+            )
+        max_chars = int(params.get('max_tokens', 4096)) * 4
+        if len(text) > max_chars:
+            return text[:max_chars], "max_tokens"
+        return text, "end_turn"
+
+    def usage(self, params, text):
+        """Usage block with simulated prompt caching of system blocks marked cache_control"""
+        system = params.get('system')
+        system_tokens = estimate_tokens(system_text(system)) if system else 0
+        input_tokens = estimate_tokens(message_text(params.get('messages', [])))
+        usage = {"input_tokens": input_tokens, "cache_creation_input_tokens": 0,
+                 "cache_read_input_tokens": 0, "output_tokens": estimate_tokens(text)}
+
+        cacheable = isinstance(system, list) and any('cache_control' in block for block in system)
+        if not cacheable:
+            usage["input_tokens"] += system_tokens
+            return usage
+        prefix = hashlib.sha256(f"{params.get('model')}\n{json.dumps(system, sort_keys=True)}".encode('utf-8')).hexdigest()
+        with self.lock:
+            hit = prefix in self.cached_prefixes
+            self.cached_prefixes.add(prefix)
+        usage["cache_read_input_tokens" if hit else "cache_creation_input_tokens"] = system_tokens
+        return usage
+
+    def message(self, params):
+        """Full Messages API response for params"""
+        text, stop_reason = self.canned_text(params)
+        return {
+            "id": f"msg_mock_{uuid.uuid4().hex[:24]}",
+            "type": "message",
+            "role": "assistant",
+            "model": params.get('model'),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": stop_reason,
+            "stop_sequence": None,
+            "usage": self.usage(params, text),
+        }
+
+    def create_batch(self, requests):
+        batch_id = f"msgbatch_mock_{uuid.uuid4().hex[:24]}"
+        with self.lock:
+            self.batches[batch_id] = {"created": time.time(), "requests": requests, "results": None}
+        return self.batch_status(batch_id)
+
+    def batch_status(self, batch_id, base_url=""):
+        with self.lock:
+            batch = self.batches.get(batch_id)
+        if batch is None:
+            return None
+        count = len(batch["requests"])
+        counts = {"processing": count, "succeeded": 0, "errored": 0, "canceled": 0, "expired": 0}
+        ended = time.time() - batch["created"] >= self.batch_seconds
+        if ended:
+            results = self.batch_results(batch_id)
+            counts["processing"] = 0
+            for line in results:
+                counts[line["result"]["type"]] += 1
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": counts,
+            "results_url": f"{base_url}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+    def batch_results(self, batch_id):
+        """Result lines of an ended batch, generated once; transient errors become errored results"""
+        with self.lock:
+            batch = self.batches[batch_id]
+            if batch["results"] is not None:
+                return batch["results"]
+        results = []
+        for request in batch["requests"]:
+            _, error = self.draw()
+            with self.lock:
+                if self.batch_errors > 0:
+                    self.batch_errors -= 1
+                    error = "529"
+                elif self.batch_bad_lines > 0:
+                    self.batch_bad_lines -= 1
+                    error = "bad_line"
+            if error == "bad_line":
+                result = {"type": "succeeded"}
+            elif error in ("429", "500", "529"):
+                error_type, error_message = ERROR_RESPONSES[int(error)]
+                result = {"type": "errored", "error": {"type": "error", "error": {"type": error_type, "message": error_message}}}
+            else:
+                result = {"type": "succeeded", "message": self.message(request["params"])}
+            results.append({"custom_id": request["custom_id"], "result": result})
+        with self.lock:
+            if batch["results"] is None:
+                batch["results"] = results
+            return batch["results"]
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    api = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status):
+        error_type, message = ERROR_RESPONSES.get(status, ("api_error", "Error"))
+        headers = {"retry-after": "1"} if status == 429 else None
+        self._send_json(status, {"type": "error", "error": {"type": error_type, "message": message}}, headers)
+
+    def _drop(self):
+        """Close the connection without (the rest of) a response"""
+        self.close_connection = True
+        try:
+            self.connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+    def _stream(self, message, first_token, disconnect):
+        """Send message as Messages API server-sent events, paced at tokens_per_second"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def event(kind, payload):
+            self._write_chunk(f"event: {kind}\ndata: {json.dumps(dict(payload, type=kind))}\n\n".encode('utf-8'))
+
+        text = message["content"][0]["text"]
+        start = dict(message, content=[], stop_reason=None, usage=dict(message["usage"], output_tokens=1))
+        event("message_start", {"message": start})
+        time.sleep(first_token)
+        event("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}})
+
+        chunk_seconds = STREAM_CHUNK_CHARS / 4 / self.api.tokens_per_second if self.api.tokens_per_second else 0
+        chunks = [text[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(text), STREAM_CHUNK_CHARS)]
+        for i, chunk in enumerate(chunks):
+            if disconnect and i >= len(chunks) // 2:
+                self._drop()
+                return
+            event("content_block_delta", {"index": 0, "delta": {"type": "text_delta", "text": chunk}})
+            if chunk_seconds:
+                time.sleep(chunk_seconds)
+
+        event("content_block_stop", {"index": 0})
+        event("message_delta", {"delta": {"stop_reason": message["stop_reason"], "stop_sequence": None},
+                                "usage": {"output_tokens": message["usage"]["output_tokens"]}})
+        event("message_stop", {})
+        self._write_chunk(b"")
+
+    def _messages(self):
+        started = time.time()
+        params = self._read_json()
+        stream = bool(params.get('stream'))
+        first_token, error = self.api.draw()
+        entry = {"path": "/v1/messages", "kind": "stream" if stream else "sync", "start": started,
+                 "model": params.get('model'), "temperature": params.get('temperature'),
+                 "judge": self.api.is_judge(params), "error": error}
+
+        if error in ("429", "500", "529"):
+            self._send_error(int(error))
+            self.api.record(end=time.time(), status=int(error), **entry)
+            return
+        if error == "timeout":
+            time.sleep(self.api.hang_seconds)
+            self._drop()
+            self.api.record(end=time.time(), status=None, **entry)
+            return
+        if error == "disconnect" and not stream:
+            self._drop()
+            self.api.record(end=time.time(), status=None, **entry)
+            return
+
+        message = self.api.message(params)
+        usage = message["usage"]
+        if stream:
+            self._stream(message, first_token, disconnect=error == "disconnect")
+        else:
+            output_seconds = usage["output_tokens"] / self.api.tokens_per_second if self.api.tokens_per_second else 0
+            time.sleep(first_token + output_seconds)
+            self._send_json(200, message)
+        self.api.record(end=time.time(), status=None if error else 200, input_tokens=usage["input_tokens"],
+                        output_tokens=usage["output_tokens"],
+                        cache_read_input_tokens=usage["cache_read_input_tokens"], **entry)
+
+    def do_POST(self):
+        if self.path == "/v1/messages":
+            self._messages()
+        elif self.path == "/v1/messages/batches":
+            started = time.time()
+            requests = self._read_json().get('requests', [])
+            self._send_json(200, self.api.create_batch(requests))
+            self.api.record(path=self.path, kind="batch", start=started, end=time.time(), status=200,
+                            requests=len(requests), payloads=[
+                                {"model": r["params"].get('model'), "temperature": r["params"].get('temperature'),
+                                 "judge": self.api.is_judge(r["params"])} for r in requests])
+        elif self.path == "/_mock/reset":
+            self._read_json()
+            with self.api.lock:
+                self.api.requests = []
+            self._send_json(200, {"ok": True})
+        else:
+            self._send_json(404, {"type": "error", "error": {"type": "not_found_error", "message": self.path}})
+
+    def do_GET(self):
+        parts = self.path.strip('/').split('/')
+        if self.path == "/_mock/stats":
+            with self.api.lock:
+                requests = list(self.api.requests)
+            self._send_json(200, {"requests": requests})
+        elif parts[:3] == ["v1", "messages", "batches"] and len(parts) in (4, 5):
+            host = self.headers.get("Host", f"{self.server.server_address[0]}:{self.server.server_address[1]}")
+            status = self.api.batch_status(parts[3], f"http://{host}")
+            if status is None:
+                self._send_json(404, {"type": "error", "error": {"type": "not_found_error", "message": parts[3]}})
+            elif len(parts) == 4:
+                self._send_json(200, status)
+            else:
+                body = "".join(json.dumps(line) + "\n" for line in self.api.batch_results(parts[3])).encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-jsonl")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+        else:
+            self._send_json(404, {"type": "error", "error": {"type": "not_found_error", "message": self.path}})
+
+
+class MockAnthropicServer:
+    """Threaded mock API server; start() returns its base URL"""
+
+    def __init__(self, host="127.0.0.1", port=0, **options):
+        self.api = MockAPI(**options)
+        handler = type("BoundMockHandler", (MockHandler,), {"api": self.api})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="mock-anthropic", daemon=True)
+        self.thread.start()
+        return self.url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def stats(self):
+        with self.api.lock:
+            return list(self.api.requests)
+
+
+def add_mock_arguments(parser):
+    """Mock server options shared with run_benchmark.py"""
+    parser.add_argument("--latency", default=DEFAULT_LATENCY,
+                        help=f"time-to-first-token distribution (default {DEFAULT_LATENCY})")
+    parser.add_argument("--tokens-per-second", type=float, default=DEFAULT_TOKENS_PER_SECOND,
+                        help="output speed after the first token; 0 = instant (default %(default)s)")
+    parser.add_argument("--errors", default="", help="error probabilities, e.g. 429=0.05,529=0.02,timeout=0.01")
+    parser.add_argument("--hang-seconds", type=float, default=DEFAULT_HANG_SECONDS,
+                        help="how long an injected timeout holds the request (default %(default)s)")
+    parser.add_argument("--batch-seconds", type=float, default=DEFAULT_BATCH_SECONDS,
+                        help="processing time of a message batch (default %(default)s)")
+    parser.add_argument("--batch-errors", type=int, default=0,
+                        help="number of batch requests answered with an errored result (default %(default)s)")
+    parser.add_argument("--batch-bad-lines", type=int, default=0,
+                        help="number of batch requests answered with a malformed result line (default %(default)s)")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for latency and errors")
+
+
+def mock_options(args):
+    return {
+        "latency": args.latency,
+        "tokens_per_second": args.tokens_per_second,
+        "errors": parse_errors(args.errors),
+        "hang_seconds": args.hang_seconds,
+        "batch_seconds": args.batch_seconds,
+        "batch_errors": args.batch_errors,
+        "batch_bad_lines": args.batch_bad_lines,
+        "seed": args.seed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the Claude Messages and Message Batches APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockAnthropicServer(args.host, args.port, **mock_options(args))
+    print(f"Mock Anthropic API listening on {server.url} (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,553 @@
+#!/usr/bin/env python3
+"""
+Agent 0b: Pipeline Orchestrator - Offline Benchmark
+
+Runs Phase 1 and Phase 2 end to end against mock_anthropic_server.py, so
+orchestrator changes can be measured without an API key:
+
+1. Copies the agent folders (scripts, system assets, examples; no project
+   data or config.json) into a temporary workspace
+2. Creates synthetic projects: the sample 12 Q&A input from examples/ and,
+   in validation mode, a generated customer review CSV
+3. Writes every agent's config.json pointing at the mock server (response
+   cache off, so every call reaches the server), each with its own model
+   name and temperature
+4. Runs execute_phase1_pipeline(), approves the Keywords Phase 1 output the
+   way evaluate_phase1.py would (or, with --judge, through the auto-approval
+   judge on its own model), then runs execute_phase2_pipeline()
+   (non-interactive, same code path as run_pipeline_phase1.py/phase2.py)
+5. Reports wall-clock time per phase, per-agent latency split into time in
+   API calls and everything else (file copies, example loading, imports,
+   subprocess start-up), and the time no API call was in flight
+6. Checks that every request carried the model and temperature of the
+   agent that sent it (agents running in one process must not share
+   settings) and that judge requests carried the judge model; a mismatch
+   fails the run
+
+With --batch the projects run as in run_pipeline_batch.py: every API call
+goes through the mock's Message Batches endpoints (submit, poll, collect
+results), the first --batch-errors requests (default 1) come back errored
+and must be resubmitted, and the run fails unless every agent that ran left
+its output in 3_unlabeled/{project}. It then submits one more request on a
+single-connection client while the mock answers with a malformed result
+line, and fails unless that batch fails and the client can still make a
+request afterwards (a leaked connection slot would hang every later call).
+
+Agent output goes to benchmark.log in the workspace unless --verbose is set.
+
+Usage:
+    python benchmark/run_benchmark.py
+    python benchmark/run_benchmark.py --mode new_brand --workers 1 --latency fixed:1.0
+    python benchmark/run_benchmark.py --errors 429=0.1,529=0.05 --json results.json
+    python benchmark/run_benchmark.py --projects 4 --concurrent
+    python benchmark/run_benchmark.py --judge
+    python benchmark/run_benchmark.py --batch --projects 2 --batch-seconds 0.5
+"""
+
+import argparse
+import concurrent.futures
+import contextlib
+import csv
+import functools
+import json
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from mock_anthropic_server import MockAnthropicServer, add_mock_arguments, mock_options
+
+AGENTS_DIR = Path(__file__).resolve().parent.parent.parent
+SAMPLE_INPUT = AGENTS_DIR.parent / "examples" / "sample_input_12_Q&A.md"
+
+AGENT_MAPPING = {
+    "1": "message_house_agent",
+    "2": "user_story_agent",
+    "3": "user_story_real_reviews_agent",
+    "4": "gap_analysis_agent",
+    "5": "keywords_bank_agent",
+    "7": "testimonial_agent",
+    "8": "social_media_twitter_agent",
+    "9": "website_copy_agent",
+}
+AGENT_DEPENDENCIES = {
+    "1": [], "2": [1], "3": [], "4": [2, 3], "5": [1, 2, 3],
+    "7": [2, 3, 5], "8": [1, 2, 3, 5, 7], "9": [1, 5, 7],
+}
+# Config keys some agents require on top of the API settings
+AGENT_CONFIG_EXTRAS = {
+    "website_copy_agent": {"system_prompt_file": "2_system_assets/system_prompt.md",
+                           "input_dir": "1_input", "output_dir": "3_unlabeled"},
+}
+# auto_approval.model used with --judge
+JUDGE_MODEL = "claude-mock-judge"
+# Message batch collection and polling for --batch (the mock ends a batch after --batch-seconds)
+BATCH_SETTINGS = {"collect_seconds": 0.5, "max_collect_seconds": 5.0, "poll_interval": 0.2}
+# Project data and local state that must not be copied into the workspace
+WORKSPACE_IGNORE = shutil.ignore_patterns(
+    "1_input", "3_unlabeled", "4_labeled_md", "5_labeled_json", ".cache", "__pycache__",
+    "response_cache", "rate_limit", "config.json", "benchmark",
+)
+
+REVIEW_AREAS = ("Texas", "California", "New York", "Ontario", "London", "Bavaria")
+REVIEW_PHRASES = {
+    5: ("Absolutely love it, works exactly as described.", "Best purchase this year, my whole family uses it.",
+        "Setup took five minutes and it has been flawless since."),
+    4: ("Very good overall, a few small quirks.", "Solid value for the price, would buy again."),
+    3: ("It is fine, nothing special.", "Does the job but the instructions were confusing."),
+    2: ("Stopped working properly after a month.", "Customer support took two weeks to answer."),
+    1: ("Arrived broken and the refund was a hassle.", "Complete waste of money, do not buy."),
+}
+
+
+class Timings:
+    """Thread-safe record of agent runs and of API time per thread"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.agents = []
+        self.local = threading.local()
+
+    def api_seconds(self):
+        return getattr(self.local, "api_seconds", 0.0)
+
+    def api_calls(self):
+        return getattr(self.local, "api_calls", 0)
+
+    def add_api_time(self, seconds):
+        self.local.api_seconds = self.api_seconds() + seconds
+        self.local.api_calls = self.api_calls() + 1
+
+    def add_agent(self, **entry):
+        with self.lock:
+            self.agents.append(entry)
+
+
+def timed_agent(timings, phase, fn, agent_of):
+    """Wrap an orchestrator run function to record its wall time and the API time on its thread"""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        agent, project = agent_of(*args, **kwargs)
+        api_before, calls_before = timings.api_seconds(), timings.api_calls()
+        started = time.time()
+        success = False
+        try:
+            success = fn(*args, **kwargs)
+            return success
+        finally:
+            ended = time.time()
+            api = timings.api_seconds() - api_before
+            timings.add_agent(phase=phase, project=project, agent=agent, start=started, end=ended,
+                              wall=ended - started, api=api, calls=timings.api_calls() - calls_before,
+                              success=bool(success))
+    return wrapper
+
+
+def timed_send(timings, send):
+    """Wrap LLMClient._send_message to add each attempt's duration to the calling thread"""
+    @functools.wraps(send)
+    def wrapper(self, *args, **kwargs):
+        started = time.monotonic()
+        try:
+            return send(self, *args, **kwargs)
+        finally:
+            timings.add_api_time(time.monotonic() - started)
+    return wrapper
+
+
+def write_reviews(path, count, rng):
+    """Synthetic review CSV with a realistic star mix and some templated duplicates"""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=["Review Content", "Stars", "Area", "Date"])
+        writer.writeheader()
+        for i in range(count):
+            stars = rng.choices((5, 4, 3, 2, 1), weights=(45, 25, 10, 10, 10))[0]
+            text = " ".join(rng.sample(REVIEW_PHRASES[stars], k=min(2, len(REVIEW_PHRASES[stars]))))
+            if rng.random() > 0.2:
+                text += f" Review number {i} mentions detail {rng.randint(1, 500)}."
+            writer.writerow({"Review Content": text, "Stars": stars, "Area": rng.choice(REVIEW_AREAS),
+                             "Date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"})
+
+
+def agent_settings(agent_name):
+    """Model and temperature written to an agent's config.json, distinct per agent"""
+    index = list(AGENT_MAPPING.values()).index(agent_name)
+    return {"model": f"claude-mock-{agent_name}", "temperature": round(0.3 + index * 0.05, 2)}
+
+
+def build_workspace(root, api_url, projects, mode, reviews, workers, in_process, seed):
+    """Copy the agents into root and create configs and project inputs; returns base_path"""
+    base_path = Path(root) / "agents"
+    shutil.copytree(AGENTS_DIR, base_path, ignore=WORKSPACE_IGNORE)
+
+    agent_config = {
+        "anthropic_api_key": "mock-key",
+        "api_base_url": api_url,
+        "max_tokens": 4000,
+        "request_timeout": 10,
+        "response_cache": {"enabled": False},
+        "retry": {"initial_delay": 0.2, "max_delay": 2.0},
+    }
+    for agent_name in AGENT_MAPPING.values():
+        with open(base_path / agent_name / "config.json", 'w', encoding='utf-8') as f:
+            json.dump(dict(agent_config, **agent_settings(agent_name), **AGENT_CONFIG_EXTRAS.get(agent_name, {})),
+                      f, indent=2)
+
+    orchestrator_config = {
+        "base_path": str(base_path),
+        "agent_mapping": AGENT_MAPPING,
+        "agent_dependencies": AGENT_DEPENDENCIES,
+        "max_parallel_agents": workers,
+        "in_process_agents": in_process,
+    }
+    with open(base_path / "agent_0b_orchestrator" / "config.json", 'w', encoding='utf-8') as f:
+        json.dump(orchestrator_config, f, indent=2)
+
+    rng = random.Random(seed)
+    for project in projects:
+        for agent_name in AGENT_MAPPING.values():
+            agent_dir = base_path / agent_name
+            for folder in ("1_input", "3_unlabeled"):
+                (agent_dir / folder / project).mkdir(parents=True, exist_ok=True)
+            # Project system prompts as Agent 0a would write them (Keywords uses its phase prompts)
+            if agent_name != "keywords_bank_agent":
+                (agent_dir / "2_system_assets" / project).mkdir(parents=True, exist_ok=True)
+                shutil.copy2(agent_dir / "2_system_assets" / "system_prompt.md",
+                             agent_dir / "2_system_assets" / project / "system_prompt.md")
+
+        shutil.copy2(SAMPLE_INPUT, base_path / "message_house_agent" / "1_input" / project / "12_questions_qa.md")
+        if mode == "validation":
+            write_reviews(base_path / "user_story_real_reviews_agent" / "1_input" / project / "customer_reviews.csv",
+                          reviews, rng)
+    return base_path
+
+
+def approve_keywords_phase1(base_path, project):
+    """Record a passing Keywords Phase 1 evaluation, as evaluate_phase1.py does after human review"""
+    agent_dir = base_path / "keywords_bank_agent"
+    vocab_files = list((agent_dir / "3_unlabeled" / project).glob("keywords_bank_vocabulary_*.md"))
+    if not vocab_files:
+        return False
+    vocab = max(vocab_files, key=lambda f: f.stat().st_mtime)
+    labeled_dir = agent_dir / "5_labeled_json"
+    labeled_dir.mkdir(exist_ok=True)
+    evaluation = {
+        "overall_score": 8.0,
+        "passed_threshold": True,
+        "evaluation_date": datetime.now().isoformat(),
+        "project": project,
+        "notes": "Approved automatically by run_benchmark.py",
+    }
+    with open(labeled_dir / vocab.name.replace(".md", "_labeled.json"), 'w', encoding='utf-8') as f:
+        json.dump(evaluation, f, indent=2)
+    return True
+
+
+def busy_seconds(intervals):
+    """Total length of the union of (start, end) intervals"""
+    total, current_start, current_end = 0.0, None, None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+def run_pipeline(base_path, projects, phases, timings, log, together=False, judge=False, batch=False):
+    """Run the requested phases for every project; returns per-phase wall-clock windows
+
+    Projects run one after another, or with together=True all at once through
+    run_pipeline_projects.py, sharing one pool of max_parallel_agents workers.
+    With judge=True Keywords Phase 1 is approved by auto_approval.py's judge
+    on JUDGE_MODEL instead of a recorded human evaluation. batch=True runs
+    the projects together through the Message Batches API, each project
+    with its own workers, as run_pipeline_batch.py does.
+    """
+    sys.path.insert(0, str(base_path / "agent_0b_orchestrator" / "scripts"))
+    sys.path.insert(0, str(base_path / "shared"))
+    import run_pipeline_phase1 as phase1
+    import run_pipeline_phase2 as phase2
+    import llm_client
+
+    approve = approve_keywords_phase1
+    if judge:
+        import auto_approval
+
+        def approve(base_path, project):
+            with contextlib.redirect_stdout(log):
+                return auto_approval.approve_keywords_phase1(project, str(base_path), "judge",
+                                                             auto_approval.APPROVAL_THRESHOLD, JUDGE_MODEL)[0]
+
+    llm_client.LLMClient._send_message = timed_send(timings, llm_client.LLMClient._send_message)
+    agent_of = lambda number, name, base, project, **kwargs: (name, project)
+    phase1.run_agent_script = timed_agent(timings, 1, phase1.run_agent_script, agent_of)
+    phase2.run_agent_script = timed_agent(timings, 2, phase2.run_agent_script, agent_of)
+    phase2.run_keywords_phase2 = timed_agent(timings, 2, phase2.run_keywords_phase2,
+                                             lambda project, base, **kwargs: ("keywords_bank_agent (phase 2)", project))
+    config = phase1.load_config()
+    if batch:
+        import agent_runner
+        agent_runner.use_message_batches(str(base_path), BATCH_SETTINGS)
+
+    if together or batch:
+        import run_pipeline_projects
+        windows = []
+        for phase in sorted(phases):
+            started = time.time()
+            with contextlib.redirect_stdout(log), contextlib.ExitStack() as stack:
+                pool = None if batch else stack.enter_context(
+                    concurrent.futures.ThreadPoolExecutor(max_workers=config['max_parallel_agents']))
+                results = run_pipeline_projects.run_projects(phase, projects, str(base_path), config, pool=pool)
+            windows.append({"phase": phase, "project": f"{len(projects)} projects", "start": started,
+                            "end": time.time(), "success": all(results.values())})
+            if phase == 1:
+                for project in projects:
+                    if not results[project] or not approve(base_path, project):
+                        print(f"Phase 1 did not complete for {project}; see the log")
+        return windows
+
+    windows = []
+    for project in projects:
+        if 1 in phases:
+            started = time.time()
+            with contextlib.redirect_stdout(log):
+                mode, sequence = phase1.detect_execution_mode(project, str(base_path))
+                ok = phase1.execute_phase1_pipeline(project, str(base_path), config, sequence, mode, interactive=False)
+            windows.append({"phase": 1, "project": project, "start": started, "end": time.time(), "success": ok})
+            if not ok or not approve(base_path, project):
+                print(f"Phase 1 did not complete for {project}; see the log")
+                continue
+        if 2 in phases:
+            started = time.time()
+            with contextlib.redirect_stdout(log):
+                mode, sequence = phase2.detect_execution_mode(project, str(base_path))
+                ok = phase2.execute_phase2_pipeline(project, str(base_path), config, sequence, mode, interactive=False)
+            windows.append({"phase": 2, "project": project, "start": started, "end": time.time(), "success": ok})
+    return windows
+
+
+def check_agent_settings(requests, timings):
+    """Requests whose model or temperature is not their agent's, and agents that ran without a request of their own
+
+    Judge requests must carry JUDGE_MODEL with the Keywords Bank temperature.
+    """
+    expected = {settings["model"]: settings["temperature"]
+                for settings in map(agent_settings, AGENT_MAPPING.values())}
+    judge = {JUDGE_MODEL: agent_settings("keywords_bank_agent")["temperature"]}
+    # Batch jobs carry their requests' settings as payloads
+    payloads = [r for r in requests if r["path"] == "/v1/messages"]
+    payloads += [payload for r in requests for payload in r.get("payloads", [])]
+    mismatched = [r for r in payloads
+                  if (judge if r.get("judge") else expected).get(r["model"], object()) != r.get("temperature")]
+    seen = {r["model"] for r in payloads}
+    ran = {entry["agent"].split(" ")[0] for entry in timings.agents if entry["success"]}
+    missing = sorted(agent for agent in ran if agent_settings(agent)["model"] not in seen)
+    return mismatched, missing
+
+
+def check_batch_run(base_path, timings, requests, batch_errors):
+    """Batch jobs and errored requests seen, and agent runs that left no output in 3_unlabeled/{project}"""
+    import message_batches
+    totals = message_batches.batch_report()
+    jobs = [r for r in requests if r.get("kind") == "batch"]
+    missing = []
+    for entry in timings.agents:
+        output_dir = base_path / entry["agent"].split(" ")[0] / "3_unlabeled" / entry["project"]
+        outputs = [path for path in output_dir.glob("*") if path.is_file() and path.suffix != ".partial"]
+        if not entry["success"] or not outputs:
+            missing.append(f"{entry['agent']} ({entry['project']})")
+    return {
+        "jobs": len(jobs),
+        "requests": sum(r.get("requests", 0) for r in jobs),
+        "errored": totals["failed"],
+        "expected_errored": batch_errors,
+        "agents_without_output": missing,
+        "ok": bool(jobs) and totals["failed"] >= batch_errors and not missing and bool(timings.agents),
+    }
+
+
+def check_bad_results_line(server, timeout):
+    """Whether a malformed batch result line fails its batch and leaves the client usable
+
+    Runs on a daemon thread so a hang shows up as a failure after timeout
+    seconds instead of blocking the benchmark.
+    """
+    import llm_client
+    import message_batches
+    client = llm_client.LLMClient({"api_base_url": server.url, "connection_pool_size": 1,
+                                   "anthropic_api_key": "mock", "retry": {"enabled": False}})
+    dispatcher = message_batches.BatchDispatcher(client, BATCH_SETTINGS)
+    settings = agent_settings("message_house_agent")
+    params = dict(settings, max_tokens=64, messages=[{"role": "user", "content": "Malformed result line check"}])
+    outcome = {"batch": "hung", "next_request": False}
+
+    def probe():
+        try:
+            dispatcher.submit(params)
+            outcome["batch"] = "succeeded"
+        except Exception as e:
+            outcome["batch"] = f"failed ({type(e).__name__})"
+        client.post_json("/_mock/stats", None, "GET")
+        outcome["next_request"] = True
+
+    server.api.batch_bad_lines = 1
+    thread = threading.Thread(target=probe, name="bad-results-line-check", daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return dict(outcome, ok=outcome["batch"].startswith("failed") and outcome["next_request"])
+
+
+def summarize(windows, timings, requests):
+    """Per-phase and per-agent numbers for the report and the JSON output"""
+    api_requests = [r for r in requests if r["path"] == "/v1/messages"]
+    phases = []
+    for window in windows:
+        served = [(max(r["start"], window["start"]), min(r["end"], window["end"])) for r in api_requests
+                  if r["end"] > window["start"] and r["start"] < window["end"]]
+        wall = window["end"] - window["start"]
+        busy = busy_seconds(served)
+        phases.append(dict(window, wall=wall, api_busy=busy, idle=wall - busy, requests=len(served)))
+
+    agents = [dict(entry, overhead=entry["wall"] - entry["api"]) for entry in timings.agents]
+    errors = {}
+    for r in api_requests:
+        if r.get("error"):
+            errors[r["error"]] = errors.get(r["error"], 0) + 1
+    mismatched, missing = check_agent_settings(requests, timings)
+    return {
+        "phases": phases,
+        "agents": agents,
+        "settings_mismatches": [{"model": r["model"], "temperature": r.get("temperature")} for r in mismatched],
+        "agents_without_own_settings": missing,
+        "api_requests": len(api_requests),
+        "injected_errors": errors,
+        "output_tokens": sum(r.get("output_tokens", 0) for r in api_requests),
+    }
+
+
+def print_report(summary, args):
+    print(f"\n{'='*78}")
+    print("ORCHESTRATOR BENCHMARK")
+    print(f"{'='*78}")
+    together = " (message batches)" if args.batch else " (concurrent)" if args.concurrent else ""
+    print(f"Mode: {args.mode}  Projects: {args.projects}{together}  "
+          f"Workers: {args.workers}  "
+          f"Agents: {'in-process' if not args.subprocess else 'subprocess'}")
+    print(f"Mock latency: {args.latency}  Output: {args.tokens_per_second:g} tokens/s  Errors: {args.errors or 'none'}")
+
+    print(f"\n{'Phase':<7} {'Project':<20} {'Wall (s)':>9} {'API busy':>9} {'No call':>9} {'Requests':>9}  Result")
+    for phase in summary["phases"]:
+        print(f"{phase['phase']:<7} {phase['project']:<20} {phase['wall']:>9.2f} {phase['api_busy']:>9.2f} "
+              f"{phase['idle']:>9.2f} {phase['requests']:>9}  {'ok' if phase['success'] else 'FAILED'}")
+
+    print(f"\n{'Agent':<36} {'Wall (s)':>9} {'In API':>9} {'Overhead':>9} {'Calls':>6}  Result")
+    for agent in sorted(summary["agents"], key=lambda a: a["start"]):
+        if args.subprocess:
+            # API calls happen in the child process and cannot be timed from here
+            split = f"{'-':>9} {'-':>9} {'-':>6}"
+        else:
+            split = f"{agent['api']:>9.2f} {agent['overhead']:>9.2f} {agent['calls']:>6}"
+        print(f"{agent['agent']:<36} {agent['wall']:>9.2f} {split}  {'ok' if agent['success'] else 'FAILED'}")
+
+    total_wall = sum(phase["wall"] for phase in summary["phases"])
+    total_overhead = sum(agent["overhead"] for agent in summary["agents"])
+    print(f"\nTotal wall-clock: {total_wall:.2f}s, API requests served: {summary['api_requests']}")
+    if not args.subprocess:
+        print(f"Agent time outside API calls: {total_overhead:.2f}s")
+    if summary["injected_errors"]:
+        print("Injected errors: " + ", ".join(f"{kind} x{count}" for kind, count in sorted(summary["injected_errors"].items())))
+    if summary["settings_mismatches"] or summary["agents_without_own_settings"]:
+        print(f"Agent settings check FAILED: {len(summary['settings_mismatches'])} requests with a model/temperature "
+              f"pair no agent is configured with; no request with their own model from: "
+              f"{', '.join(summary['agents_without_own_settings']) or '-'}")
+    else:
+        print("Agent settings check: every request carried its agent's model and temperature")
+    batch = summary.get("batch")
+    if batch:
+        print(f"Batch check {'passed' if batch['ok'] else 'FAILED'}: {batch['jobs']} jobs, {batch['requests']} "
+              f"requests, {batch['errored']} errored (expected at least {batch['expected_errored']}) and resubmitted; "
+              f"agent runs without output in 3_unlabeled: {', '.join(batch['agents_without_output']) or 'none'}")
+        bad_line = batch["bad_results_line"]
+        print(f"Malformed result line check {'passed' if bad_line['ok'] else 'FAILED'}: batch {bad_line['batch']}, "
+              f"next request on the client {'completed' if bad_line['next_request'] else 'did not complete'}")
+    print("(\"No call\": phase time with no API request in flight. \"In API\": request attempts on the agent's own "
+          "thread; retry backoff counts as overhead)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline orchestrator against a local mock API")
+    parser.add_argument("--mode", choices=("validation", "new_brand"), default="validation",
+                        help="validation creates a review CSV so Agents 3 and 4 run (default %(default)s)")
+    parser.add_argument("--projects", type=int, default=1, help="number of synthetic projects, run one after another")
+    parser.add_argument("--concurrent", action="store_true",
+                        help="run the projects at once, sharing one pool of --workers agent workers")
+    parser.add_argument("--phases", type=int, nargs="+", choices=(1, 2), default=[1, 2])
+    parser.add_argument("--reviews", type=int, default=2000, help="rows in the generated review CSV")
+    parser.add_argument("--workers", type=int, default=4, help="max_parallel_agents for the run")
+    parser.add_argument("--subprocess", action="store_true", help="run agents as subprocesses instead of in-process")
+    parser.add_argument("--batch", action="store_true",
+                        help="run the projects together through the mock Message Batches API and check their outputs")
+    parser.add_argument("--judge", action="store_true",
+                        help=f"approve Keywords Phase 1 with the auto-approval judge on model {JUDGE_MODEL}")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    parser.add_argument("--keep", action="store_true", help="keep the workspace instead of deleting it")
+    parser.add_argument("--verbose", action="store_true", help="show agent output instead of logging it")
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+    if args.batch and args.subprocess:
+        parser.error("--batch needs in-process agents (batching works across one process's API calls)")
+    if args.batch and not args.batch_errors:
+        args.batch_errors = 1
+
+    server = MockAnthropicServer(**mock_options(args))
+    api_url = server.start()
+    workspace = tempfile.mkdtemp(prefix="gtm_benchmark_")
+    projects = [f"benchmark_project_{i + 1}" for i in range(args.projects)]
+    print(f"Mock API: {api_url}")
+    print(f"Workspace: {workspace}")
+
+    try:
+        base_path = build_workspace(workspace, api_url, projects, args.mode, args.reviews, args.workers,
+                                    not args.subprocess, args.seed)
+        timings = Timings()
+        with contextlib.ExitStack() as stack:
+            log = sys.stdout if args.verbose else stack.enter_context(
+                open(Path(workspace) / "benchmark.log", 'w', encoding='utf-8'))
+            windows = run_pipeline(base_path, projects, set(args.phases), timings, log, args.concurrent, args.judge,
+                                   args.batch)
+
+        summary = summarize(windows, timings, server.stats())
+        if args.batch:
+            summary["batch"] = check_batch_run(base_path, timings, server.stats(), args.batch_errors)
+            bad_line = check_bad_results_line(server, args.batch_seconds + 30)
+            summary["batch"]["bad_results_line"] = bad_line
+            summary["batch"]["ok"] = summary["batch"]["ok"] and bad_line["ok"]
+        print_report(summary, args)
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(dict(summary, settings=vars(args)), f, indent=2)
+            print(f"Results written to: {args.json}")
+    finally:
+        server.stop()
+        if args.keep:
+            print(f"Workspace kept at: {workspace}")
+        else:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+    failed = [phase for phase in summary["phases"] if not phase["success"]]
+    settings_failed = summary["settings_mismatches"] or summary["agents_without_own_settings"]
+    batch_failed = args.batch and not summary["batch"]["ok"]
+    sys.exit(1 if failed or settings_failed or batch_failed or not summary["phases"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Agent 0b: Pipeline Orchestrator - In-Process Agent Runner
+
+Loads each agent script once and calls its run(project, config) entry point
+inside the orchestrator process. Agents then share one interpreter, one
+pooled API client (shared/llm_client.py), the response cache and their
+parsed config.json, instead of paying a Python start-up and a fresh TLS
+handshake per agent.
+
+The project is passed explicitly, so in-process runs never depend on the
+working directory or on the agent's "current_project" setting. Scripts
+without a run() entry point are reported to the caller, which falls back to
+running them as a subprocess.
+"""
+
+import importlib.util
+import json
+import sys
+import threading
+import traceback
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "shared"))
+from run_trace import end_trace, start_trace, trace_path, trace_span
+from trace_export import load_trace, print_critical_path, send_otlp, write_chrome_trace
+
+_modules = {}
+_configs = {}
+_lock = threading.Lock()
+
+
+def load_agent_module(agent_path, script_name="generate_simple.py"):
+    """Import an agent script once per process and return the module
+
+    Every agent's script is called generate_simple.py, so each one gets a
+    module name derived from its agent folder.
+    """
+    script_path = (Path(agent_path) / "scripts" / script_name).resolve()
+    with _lock:
+        module = _modules.get(script_path)
+        if module is None:
+            module_name = f"{script_path.parent.parent.name}_{script_path.stem}"
+            with trace_span("import", script=str(script_path)):
+                spec = importlib.util.spec_from_file_location(module_name, script_path)
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+            _modules[script_path] = module
+        return module
+
+
+def load_agent_config(agent_path):
+    """Read an agent's config.json once per process (None if missing or invalid)"""
+    config_path = (Path(agent_path) / "config.json").resolve()
+    with _lock:
+        if config_path not in _configs:
+            try:
+                with open(config_path, 'r', encoding='utf-8') as f:
+                    _configs[config_path] = json.load(f)
+            except FileNotFoundError:
+                print(f"Error: config.json not found: {config_path}")
+                return None
+            except json.JSONDecodeError:
+                print(f"Error: config.json is not valid JSON: {config_path}")
+                return None
+        return _configs[config_path]
+
+
+def get_entry_point(agent_path, script_name="generate_simple.py"):
+    """Return the script's run(project, config) function, or None to use a subprocess"""
+    try:
+        module = load_agent_module(agent_path, script_name)
+    except Exception as e:
+        print(f"Could not import {script_name} in-process: {e}")
+        return None
+
+    entry_point = getattr(module, "run", None)
+    return entry_point if callable(entry_point) else None
+
+
+def run_in_process(entry_point, agent_path, project_name):
+    """Call an agent entry point for one project; True if it produced an output"""
+    config = load_agent_config(agent_path)
+    if config is None:
+        return False
+
+    try:
+        return bool(entry_point(project=project_name, config=config))
+    except SystemExit as e:
+        # Agent helpers such as load_config() still exit on fatal errors
+        return e.code in (None, 0)
+    except Exception as e:
+        print(f"Agent raised {type(e).__name__}: {e}")
+        traceback.print_exc()
+        return False
+
+
+def print_usage_report():
+    """Print per-agent token usage and prompt-cache hit rates for in-process runs
+
+    Agents import shared/llm_client.py themselves, so the report is only
+    available once at least one agent has run in this process.
+    """
+    llm_client = sys.modules.get("llm_client")
+    if llm_client is not None and hasattr(llm_client, "print_usage_report"):
+        llm_client.print_usage_report()
+
+
+def use_message_batches(base_path, settings=None):
+    """Route every agent API call in this process through the Message Batches API
+
+    Imports base_path/shared/llm_client.py the same way the agents do, so the
+    in-process agents pick up the setting.
+    """
+    shared_dir = str((Path(base_path) / "shared").resolve())
+    if shared_dir not in sys.path:
+        sys.path.insert(0, shared_dir)
+    import llm_client
+    llm_client.enable_message_batches(settings)
+
+
+def print_batch_report():
+    """Print how many batch jobs and requests this process submitted"""
+    message_batches = sys.modules.get("message_batches")
+    if message_batches is None:
+        return
+    totals = message_batches.batch_report()
+    if totals["batches"]:
+        print(f"\nMessage batches: {totals['batches']} jobs, {totals['requests']} requests "
+              f"({totals['succeeded']} succeeded, {totals['failed']} failed)")
+
+
+def start_run_trace(base_path, label, config):
+    """Open this run's trace in agent_0b_orchestrator/2_system_assets/traces; returns its path"""
+    trace_dir = Path(base_path) / "agent_0b_orchestrator" / "2_system_assets" / "traces"
+    path = start_trace(trace_dir, label, config.get('pricing'))
+    print(f"Run trace: {path}")
+    return path
+
+
+def finish_run_trace(config):
+    """Close the run trace, write its Chrome trace next to it and send it to config["otlp_endpoint"] if set"""
+    path = trace_path()
+    end_trace()
+    if path is None:
+        return
+    records = load_trace(path)
+    if not records:
+        return
+    chrome_path = write_chrome_trace(records, path.with_suffix(".chrome.json"))
+    print(f"Chrome trace: {chrome_path} (open in https://ui.perfetto.dev)")
+    print_critical_path(records)
+    if config.get('otlp_endpoint'):
+        send_otlp(records, config['otlp_endpoint'])
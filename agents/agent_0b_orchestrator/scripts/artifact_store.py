@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Agent 0b: Pipeline Orchestrator - Artifact Store
+
+Content-addressed store for the outputs handed from one agent to the next,
+in agent_0b_orchestrator/2_system_assets/artifacts/:
+
+    objects/ab/ab12...   one file per distinct content, named by its SHA-256
+    refs/{project}/{agent}.json   the output an agent last published for a project
+    provenance.jsonl     one line per hand-off: which content went to which agent
+
+When an agent completes, the orchestrator publishes its newest output:
+the file is hashed and hardlinked into objects/ (no bytes are copied, and
+identical outputs across projects share one object). Downstream inputs
+are materialized as hardlinks to the object under the output's file name,
+so agents keep reading their 1_input/{project} folders unchanged. Where
+hardlinks are not possible (another filesystem, unsupported filesystem),
+the file is copied instead. A hand-off replaces the earlier output the same
+source agent handed to that folder, so each input folder holds exactly the
+version recorded in provenance.jsonl.
+
+Objects, and every name linked to them, are made read-only, so editing a
+handed-off file in place cannot silently change the copies in other agents'
+folders.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import stat
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+_lock = threading.Lock()
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _link_or_copy(source, target):
+    """Atomically place source's content at target (hardlink, else copy); returns the mode used"""
+    target = Path(target)
+    temp = target.with_name(f".{target.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        os.link(source, temp)
+        mode = "link"
+    except OSError:
+        shutil.copy2(source, temp)
+        mode = "copy"
+    os.replace(temp, target)
+    return mode
+
+
+def _make_read_only(path):
+    mode = os.stat(path).st_mode
+    os.chmod(path, mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+
+
+class ArtifactStore:
+    """Objects, refs and provenance of the agent outputs handed off between agents"""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.refs_dir = self.root / "refs"
+        self.provenance_path = self.root / "provenance.jsonl"
+
+    def object_path(self, sha256):
+        return self.objects_dir / sha256[:2] / sha256
+
+    def put(self, path):
+        """Add a file's content to the store (hardlinked when possible); returns its SHA-256"""
+        sha256 = file_sha256(path)
+        object_path = self.object_path(sha256)
+        if not object_path.exists():
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            _link_or_copy(path, object_path)
+            _make_read_only(object_path)
+        return sha256
+
+    def publish(self, project_name, agent_name, path):
+        """Store an agent's output and make it the agent's current output for the project"""
+        path = Path(path)
+        ref = {
+            "sha256": self.put(path),
+            "name": path.name,
+            "source": str(path),
+            "published": datetime.now().isoformat(),
+        }
+        ref_path = self.refs_dir / project_name / f"{agent_name}.json"
+        ref_path.parent.mkdir(parents=True, exist_ok=True)
+        temp = ref_path.with_name(f".{ref_path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(ref, f, indent=2)
+        os.replace(temp, ref_path)
+        return ref
+
+    def get_ref(self, project_name, agent_name):
+        """The agent's current output for the project ({sha256, name, ...}), or None"""
+        ref_path = self.refs_dir / project_name / f"{agent_name}.json"
+        try:
+            with open(ref_path, 'r', encoding='utf-8') as f:
+                ref = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return ref if self.object_path(ref["sha256"]).exists() else None
+
+    def materialize(self, ref, target_dir):
+        """Place a ref's content in target_dir under its file name
+
+        Returns "linked", "copied" or "unchanged" (target already holds the object).
+        """
+        object_path = self.object_path(ref["sha256"])
+        target_dir = Path(target_dir)
+        target_dir.mkdir(parents=True, exist_ok=True)
+        target = target_dir / ref["name"]
+        if target.exists() and os.path.samefile(target, object_path):
+            return "unchanged"
+        mode = _link_or_copy(object_path, target)
+        if mode == "copy":
+            _make_read_only(target)
+        return "linked" if mode == "link" else "copied"
+
+    def handoff(self, project_name, source_agent, ref, target_agent, target_dir):
+        """Materialize a ref in target_dir, retire the source agent's earlier hand-off there and record it
+
+        Returns the materialize() result.
+        """
+        previous = [
+            entry for entry in self.provenance(project_name, target_agent)
+            if entry["source_agent"] == source_agent and entry["name"] != ref["name"]
+        ]
+        result = self.materialize(ref, target_dir)
+        for entry in previous:
+            old = Path(target_dir) / entry["name"]
+            # Only remove files that still hold what was handed off (not user edits)
+            old_object = self.object_path(entry["sha256"])
+            if old.exists() and old_object.exists() and os.path.samefile(old, old_object):
+                old.unlink()
+        self._record(project_name, source_agent, ref, target_agent, target_dir, result)
+        return result
+
+    def _record(self, project_name, source_agent, ref, target_agent, target_dir, result):
+        """Append one hand-off to provenance.jsonl"""
+        entry = {
+            "time": datetime.now().isoformat(),
+            "project": project_name,
+            "source_agent": source_agent,
+            "sha256": ref["sha256"],
+            "name": ref["name"],
+            "target_agent": target_agent,
+            "target": str(Path(target_dir) / ref["name"]),
+            "result": result,
+        }
+        with _lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self.provenance_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def provenance(self, project_name=None, target_agent=None):
+        """Recorded hand-offs, oldest first, optionally filtered"""
+        entries = []
+        try:
+            with open(self.provenance_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if project_name and entry["project"] != project_name:
+                        continue
+                    if target_agent and entry["target_agent"] != target_agent:
+                        continue
+                    entries.append(entry)
+        except FileNotFoundError:
+            pass
+        return entries
+
+
+def get_artifact_store(base_path):
+    return ArtifactStore(Path(base_path) / "agent_0b_orchestrator" / "2_system_assets" / "artifacts")
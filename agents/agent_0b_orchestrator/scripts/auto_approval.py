@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Agent 0b: Pipeline Orchestrator - Keywords Auto-Approval
+
+Phase 2 only runs once the project's Keywords Phase 1 vocabulary has a
+passing evaluation in keywords_bank_agent/5_labeled_json/. Interactive runs
+wait for a human to score it in evaluate_phase1.py. Headless runs
+(run_pipeline.py) choose an approval rule instead:
+
+- "human": only an existing evaluation of the latest vocabulary counts; the
+  project stops after Phase 1 until someone evaluates it (default)
+- "judge": Claude scores the vocabulary on the five evaluate_phase1.py
+  criteria; the weighted score must reach the threshold
+- "auto": every generated vocabulary is approved (trusted or test runs)
+
+Judge and auto decisions are saved as evaluations like a human one, with
+"evaluator" set to "auto_judge" or "auto", so they can be reviewed (and
+overruled in evaluate_phase1.py) afterwards.
+"""
+
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from agent_runner import load_agent_config
+from run_pipeline_phase2 import APPROVAL_THRESHOLD
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "shared"))
+from llm_client import call_claude_api
+
+APPROVAL_MODES = ("human", "judge", "auto")
+
+# Same criteria and weights as keywords_bank_agent/scripts/evaluate_phase1.py
+CRITERIA = (
+    ("strategic_alignment", "Strategic Alignment", "Message house extraction quality and brand consistency", 0.25),
+    ("completeness", "Completeness", "All persona language and themes captured", 0.20),
+    ("creative_expansion", "Creative Expansion", "Semantic variations quality beyond simple synonyms", 0.20),
+    ("insightfulness", "Insightfulness", "Thematic cluster analysis and strategic synthesis", 0.20),
+    ("actionability", "Actionability", "Clear structure for expansion engine usage", 0.15),
+)
+
+JUDGE_SYSTEM_PROMPT = """You are the Keywords Vocabulary Judge of a go-to-market content pipeline.
+You score a Phase 1 keyword bank vocabulary before it is expanded into hundreds of keywords,
+exactly as the human evaluator would, on a 1-10 scale per criterion:
+
+{criteria}
+
+Be strict: a 7 means ready for expansion without changes. Reply with JSON only:
+{{"scores": {{"strategic_alignment": 0, "completeness": 0, "creative_expansion": 0,
+"insightfulness": 0, "actionability": 0}}, "notes": "one or two sentences"}}"""
+
+
+def latest_vocabulary(project_name, base_path):
+    """Newest Keywords Phase 1 vocabulary file of the project, or None"""
+    vocab_dir = Path(base_path) / "keywords_bank_agent" / "3_unlabeled" / project_name
+    vocab_files = list(vocab_dir.glob("keywords_bank_vocabulary_*.md"))
+    return max(vocab_files, key=lambda f: f.stat().st_mtime) if vocab_files else None
+
+
+def evaluation_path(vocab_path, base_path):
+    """Where evaluate_phase1.py keeps the evaluation of a vocabulary file"""
+    return Path(base_path) / "keywords_bank_agent" / "5_labeled_json" / f"{vocab_path.stem}_labeled.json"
+
+
+def weighted_score(scores):
+    return round(sum(float(scores[key]) * weight for key, _, _, weight in CRITERIA), 2)
+
+
+def judge_vocabulary(vocab_text, config):
+    """Ask Claude for criterion scores; returns {"scores": {...}, "notes": str} or None"""
+    criteria = "\n".join(f"- {key} ({name}, weight {weight:.0%}): {description}"
+                         for key, name, description, weight in CRITERIA)
+    prompt = f"Score this keyword bank vocabulary:\n\n{vocab_text}"
+    response = call_claude_api(prompt, config, system=JUDGE_SYSTEM_PROMPT.format(criteria=criteria),
+                               max_tokens=1000, agent="keywords_judge")
+    if not response:
+        return None
+    try:
+        verdict = json.loads(response[response.index("{"):response.rindex("}") + 1])
+        for key, _, _, _ in CRITERIA:
+            verdict["scores"][key] = max(1.0, min(10.0, float(verdict["scores"][key])))
+        return verdict
+    except (ValueError, KeyError, TypeError) as e:
+        print(f"Error: Could not read the judge's scores: {e}")
+        return None
+
+
+def save_evaluation(path, vocab_path, project_name, score, threshold, evaluator, scores=None, notes=None):
+    evaluation = {
+        "file_path": str(vocab_path),
+        "project": project_name,
+        "evaluation_date": datetime.now().isoformat(),
+        "overall_score": score,
+        "criteria_scores": scores or {},
+        "criteria_weights": {key: weight for key, _, _, weight in CRITERIA},
+        "passed_threshold": score >= threshold,
+        "evaluator": evaluator,
+    }
+    if notes:
+        evaluation["notes"] = notes
+    path.parent.mkdir(exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(evaluation, f, indent=2)
+
+
+def approve_keywords_phase1(project_name, base_path, mode="human", threshold=APPROVAL_THRESHOLD, judge_model=None):
+    """Decide whether the project's latest vocabulary may go to Phase 2
+
+    An existing evaluation of the latest vocabulary is always reused (a
+    human verdict is never overwritten). The judge uses the Keywords Bank
+    agent's API settings, with judge_model in place of its model if given.
+    Returns (approved, score, evaluator);
+    score is None when there is nothing to score yet.
+    """
+    vocab_path = latest_vocabulary(project_name, base_path)
+    if vocab_path is None:
+        print(f"No Keywords Phase 1 vocabulary for {project_name}")
+        return False, None, None
+
+    path = evaluation_path(vocab_path, base_path)
+    if path.exists():
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                evaluation = json.load(f)
+            score = evaluation.get('overall_score', 0)
+            approved = score >= max(threshold, APPROVAL_THRESHOLD) and evaluation.get('passed_threshold', True)
+            return approved, score, evaluation.get('evaluator', 'human')
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read {path.name}: {e}")
+
+    if mode == "auto":
+        save_evaluation(path, vocab_path, project_name, threshold, threshold, "auto",
+                        notes="Approved automatically by run_pipeline.py --approval auto")
+        print(f"Keywords Phase 1 of {project_name} approved automatically")
+        return True, threshold, "auto"
+
+    if mode == "judge":
+        config = load_agent_config(Path(base_path) / "keywords_bank_agent")
+        if config is None:
+            return False, None, None
+        if judge_model:
+            config = dict(config, model=judge_model)
+        with open(vocab_path, 'r', encoding='utf-8') as f:
+            verdict = judge_vocabulary(f.read(), config)
+        if verdict is None:
+            return False, None, None
+        score = weighted_score(verdict["scores"])
+        save_evaluation(path, vocab_path, project_name, score, threshold, "auto_judge",
+                        verdict["scores"], verdict.get("notes"))
+        print(f"Keywords Phase 1 of {project_name} judged {score:.1f} (threshold {threshold:.1f})")
+        return score >= threshold, score, "auto_judge"
+
+    print(f"Keywords Phase 1 of {project_name} awaits evaluation: "
+          f"python keywords_bank_agent/scripts/evaluate_phase1.py --project {project_name}")
+    return False, None, None
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Agent 0b: Pipeline Orchestrator - DAG Scheduler
+
+Runs pipeline agents as soon as their dependencies (config.json
+"agent_dependencies") are complete, using a bounded worker pool.
+Agents with no dependency between them run at the same time, e.g. in
+Validation Mode Agent 1 (Message House) and Agent 3 (Customer Personas)
+start together, and Agent 2 starts as soon as Agent 1 finishes.
+
+State updates, file copying and user prompts stay on the calling thread;
+only the agent runs themselves happen in worker threads. Several DAGs (one
+per project) can share one worker pool, so concurrent projects draw on one
+bounded set of workers.
+"""
+
+import concurrent.futures
+import contextlib
+
+DEFAULT_MAX_WORKERS = 4
+
+
+def normalize_dependencies(agent_dependencies):
+    """Convert config.json {"2": [1], ...} into {2: [1], ...}"""
+    return {int(agent): [int(dep) for dep in deps] for agent, deps in agent_dependencies.items()}
+
+
+def topological_order(agents, dependencies):
+    """Return agents sorted so every agent comes after its dependencies
+
+    Ties keep the order of the input list. Dependencies outside `agents` are
+    ignored here (they are either already completed or block the agent).
+    Raises ValueError if the dependencies contain a cycle.
+    """
+    agents = list(agents)
+    position = {agent: i for i, agent in enumerate(agents)}
+    indegree = {agent: 0 for agent in agents}
+    dependents = {agent: [] for agent in agents}
+
+    for agent in agents:
+        for dep in dependencies.get(agent, []):
+            if dep in position:
+                indegree[agent] += 1
+                dependents[dep].append(agent)
+
+    ready = sorted((a for a in agents if indegree[a] == 0), key=position.get)
+    order = []
+    while ready:
+        agent = ready.pop(0)
+        order.append(agent)
+        for dependent in dependents[agent]:
+            indegree[dependent] -= 1
+            if indegree[dependent] == 0:
+                ready.append(dependent)
+                ready.sort(key=position.get)
+
+    if len(order) != len(agents):
+        cyclic = sorted(set(agents) - set(order))
+        raise ValueError(f"Dependency cycle between agents: {cyclic}")
+    return order
+
+
+def run_dag(agents, dependencies, run_agent, completed=(), max_workers=DEFAULT_MAX_WORKERS,
+            on_success=None, on_failure=None, pool=None):
+    """Run agents concurrently in dependency order
+
+    Args:
+        agents: agent numbers to run, in preferred order
+        dependencies: {agent_number: [dependency agent numbers]}
+        run_agent: callable(agent_number) -> bool, executed in a worker thread
+        completed: agents already finished (their dependents may start immediately)
+        max_workers: maximum number of agents running at the same time
+        on_success: callable(agent_number), called on this thread after a success
+        on_failure: callable(agent_number, attempt) -> "retry" | "continue" | "stop",
+            called on this thread after a failure (default: "continue")
+        pool: executor shared with other DAGs (default: a private pool of
+            max_workers threads); max_workers still caps this DAG's share
+
+    Returns:
+        (succeeded, failed, skipped) lists of agent numbers. Skipped agents never
+        ran because a dependency failed, was missing, or the run was stopped.
+    """
+    max_workers = max(1, int(max_workers))
+    done = set(completed)
+    pending = [agent for agent in topological_order(agents, dependencies) if agent not in done]
+    attempts = {}
+    succeeded, failed = [], []
+    stopped = False
+
+    # A shared pool is left running for the other DAGs using it
+    if pool is None:
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+    else:
+        executor = contextlib.nullcontext(pool)
+    with executor as pool:
+        running = {}
+        while True:
+            if not stopped:
+                for agent in list(pending):
+                    if len(running) >= max_workers:
+                        break
+                    if all(dep in done for dep in dependencies.get(agent, [])):
+                        pending.remove(agent)
+                        attempts[agent] = attempts.get(agent, 0) + 1
+                        running[pool.submit(run_agent, agent)] = agent
+
+            if not running:
+                break
+
+            finished, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                agent = running.pop(future)
+                try:
+                    success = future.result()
+                except Exception as e:
+                    print(f"Error running Agent {agent}: {e}")
+                    success = False
+
+                if success:
+                    done.add(agent)
+                    succeeded.append(agent)
+                    if on_success:
+                        on_success(agent)
+                    continue
+
+                decision = on_failure(agent, attempts[agent]) if on_failure else "continue"
+                if decision == "retry":
+                    pending.insert(0, agent)
+                else:
+                    failed.append(agent)
+                    if decision == "stop":
+                        stopped = True
+
+    for agent in pending:
+        missing_deps = [dep for dep in dependencies.get(agent, []) if dep not in done]
+        if missing_deps:
+            print(f"Skipping Agent {agent} - missing dependencies: {missing_deps}")
+        else:
+            print(f"Skipping Agent {agent} - pipeline stopped")
+
+    return succeeded, failed, pending
@@ -109,9 +109,11 @@ def run_agent_script(agent_number, agent_name, base_path, project_name):
         original_cwd = os.getcwd()
         os.chdir(agent_path)
         
-        print(f"Executing: python scripts/generate_simple.py")
-        result = subprocess.run([sys.executable, "scripts/generate_simple.py"], 
-                              capture_output=True, text=True, timeout=300)
+        # Agents no longer read the project from config.json, so name it explicitly
+        print(f"Executing: python scripts/generate_simple.py --project {project_name}")
+        result = subprocess.run([sys.executable, "scripts/generate_simple.py", "--project", project_name],
+                              capture_output=True, text=True, timeout=300,
+                              env=dict(os.environ, PIPELINE_PROJECT=project_name))
         
         os.chdir(original_cwd)
         
@@ -273,7 +275,7 @@ PIPELINE PAUSED: Keywords Bank Phase 1 Complete
 ==================================================
 
 REQUIRED NEXT STEP: Human Evaluation
-   Run: python keywords_bank_agent/scripts/evaluate_phase1.py
+   Run: python keywords_bank_agent/scripts/evaluate_phase1.py --project {project_name}
    
    - Evaluate vocabulary quality
    - Score must be >=7.0 to proceed
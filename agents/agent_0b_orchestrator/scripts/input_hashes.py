@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Agent 0b: Pipeline Orchestrator - Input Hashes
+
+Make-style incremental rebuilds. When an agent completes, its phase state
+records a hash of everything the output was generated from:
+
+- the files in its 1_input/{project} folder
+- its shared prompt assets in 2_system_assets/ (system prompts, templates,
+  examples) and the project's own 2_system_assets/{project}; other
+  projects' folders are left out, so editing one project's system prompt
+  only reruns that project
+- its Example Map: labeled evaluations in 5_labeled_json/ scoring >= 8.0
+- the generation settings in its config.json (model, max_tokens,
+  temperature, ...); API keys, endpoints and retry/cache/rate-limit settings
+  do not change the output and are left out
+- the script that generates it
+- the latest outputs of the agents it depends on
+
+On the next run, completed agents whose hash changed run again, together
+with every completed agent downstream of them. Everything else stays
+skipped, so editing one input costs one agent run (plus its dependents)
+instead of a full pipeline.
+"""
+
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "shared"))
+from example_index import ExampleIndex
+
+# Agents only render labeled evaluations at or above this score as examples
+EXAMPLE_MIN_SCORE = 8.0
+MAX_EXAMPLES = 1000
+
+# config.json settings that change how requests are sent, not what is generated
+RUNTIME_CONFIG_KEYS = {
+    "anthropic_api_key", "api_base_url", "current_project", "connection_pool_size", "request_timeout",
+    "retry", "rate_limit", "response_cache", "message_batches",
+}
+
+
+def _hash_file(digest, path, label):
+    digest.update(f"{label}\0".encode('utf-8'))
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    digest.update(b"\0")
+
+
+def _hash_tree(digest, folder, label, exclude=()):
+    """Hash every file below folder (hidden files, __pycache__ and top-level `exclude` names left out) in a stable order"""
+    folder = Path(folder)
+    if not folder.is_dir():
+        return
+    for path in sorted(folder.rglob('*')):
+        relative = path.relative_to(folder)
+        if not path.is_file() or any(part.startswith('.') or part == '__pycache__' for part in relative.parts):
+            continue
+        if relative.parts[0] in exclude:
+            continue
+        _hash_file(digest, path, f"{label}/{relative.as_posix()}")
+
+
+def input_hash(agent_path, project_name, script_name="generate_simple.py", upstream_files=(), examples=True):
+    """SHA-256 over everything an agent's output for project_name depends on
+
+    examples=False leaves out 5_labeled_json/ for agents that build no
+    Example Map from it (Keywords Bank keeps its own evaluations there).
+    """
+    agent_path = Path(agent_path)
+    digest = hashlib.sha256()
+
+    _hash_tree(digest, agent_path / "1_input" / project_name, "input")
+    # Project folders (one per 1_input/{project}) are hashed only for their own project
+    input_dir = agent_path / "1_input"
+    projects = {path.name for path in input_dir.iterdir() if path.is_dir()} if input_dir.is_dir() else set()
+    _hash_tree(digest, agent_path / "2_system_assets", "assets", exclude=projects | {project_name})
+    _hash_tree(digest, agent_path / "2_system_assets" / project_name, f"assets/{project_name}")
+
+    labeled_dir = agent_path / "5_labeled_json"
+    if examples and labeled_dir.is_dir():
+        for entry in ExampleIndex(labeled_dir).top_examples(min_score=EXAMPLE_MIN_SCORE, limit=MAX_EXAMPLES):
+            if entry["path"].is_file():
+                _hash_file(digest, entry["path"], f"example/{entry['path'].name}")
+
+    try:
+        with open(agent_path / "config.json", 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        settings = {key: value for key, value in config.items() if key not in RUNTIME_CONFIG_KEYS}
+        digest.update(f"config\0{json.dumps(settings, sort_keys=True)}\0".encode('utf-8'))
+    except (OSError, ValueError):
+        digest.update(b"config\0missing\0")
+
+    script_path = agent_path / "scripts" / script_name
+    if script_path.is_file():
+        _hash_file(digest, script_path, f"script/{script_name}")
+
+    for number, path in enumerate(upstream_files):
+        if path and Path(path).is_file():
+            _hash_file(digest, path, f"upstream/{number}/{Path(path).name}")
+
+    return digest.hexdigest()
+
+
+def stale_agents(agents, completed, recorded, current_hash, dependencies):
+    """Find completed agents that have to run again
+
+    Args:
+        agents: agent numbers scheduled in this phase
+        completed: agents the phase state lists as completed
+        recorded: {"agent number": hash} from the phase state; agents without
+            an entry (completed before hashes were recorded) get the current
+            hash and are trusted as up to date
+        current_hash: callable(agent_number) -> hash of its inputs now
+        dependencies: {agent_number: [dependency agent numbers]}
+
+    Returns:
+        (changed, stale): agents whose own inputs changed, and those plus every
+        completed agent downstream of them
+    """
+    changed = []
+    for agent in agents:
+        if agent not in completed:
+            continue
+        current = current_hash(agent)
+        if recorded.setdefault(str(agent), current) != current:
+            changed.append(agent)
+
+    stale = set(changed)
+    grew = True
+    while grew:
+        grew = False
+        for agent in agents:
+            if agent in completed and agent not in stale and any(dep in stale for dep in dependencies.get(agent, [])):
+                stale.add(agent)
+                grew = True
+    return changed, sorted(stale)
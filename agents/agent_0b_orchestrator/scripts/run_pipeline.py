@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Agent 0b: Pipeline Orchestrator - Headless Pipeline
+Runs Phase 1, Keywords approval and Phase 2 for one or more projects without prompts
+
+Made for cron and job runners: nothing is read from stdin. For every
+project, in its own thread, it runs:
+
+    Phase 1 -> Keywords Phase 1 approval -> Phase 2
+
+Failed agents are retried up to --retries times; after that the project
+either continues without them (--on-failure continue) or stops
+(--on-failure stop). Keywords approval follows --approval (see
+auto_approval.py): "human" stops the project after Phase 1 until someone
+evaluates the vocabulary, "judge" lets Claude score it against the
+threshold, "auto" approves it. The defaults come from "auto_approval" in
+config.json.
+
+Exit codes: 0 every project completed both phases, 2 some projects only
+await a human Keywords evaluation, 1 anything failed.
+
+Usage:
+    python scripts/run_pipeline.py --projects brand_a brand_b --approval judge
+    python scripts/run_pipeline.py --all --phases 2 --retries 2 --on-failure stop
+"""
+
+import argparse
+import concurrent.futures
+import os
+import sys
+
+import run_pipeline_phase1 as phase1
+from agent_runner import finish_run_trace, print_usage_report, start_run_trace
+from auto_approval import APPROVAL_MODES, approve_keywords_phase1
+from dag_scheduler import DEFAULT_MAX_WORKERS
+from run_pipeline_phase2 import APPROVAL_THRESHOLD
+from run_pipeline_projects import resolve_projects, run_phase1_project, run_phase2_project
+from run_trace import print_summary as print_trace_summary
+
+def run_project(project_name, base_path, config, phases, approval, pool, options):
+    """Run the requested phases for one project; returns its result dict"""
+    result = {"phase1": None, "approved": None, "score": None, "evaluator": None, "phase2": None}
+
+    if 1 in phases:
+        result["phase1"] = run_phase1_project(project_name, base_path, config, pool, **options)
+        if not result["phase1"]:
+            print(f"{project_name}: Phase 1 incomplete - Phase 2 skipped")
+            return result
+
+    if 2 in phases:
+        approved, score, evaluator = approve_keywords_phase1(project_name, base_path, approval["mode"],
+                                                             approval["threshold"], approval.get("model"))
+        result.update(approved=approved, score=score, evaluator=evaluator)
+        if not approved:
+            print(f"{project_name}: Keywords Phase 1 not approved - Phase 2 skipped")
+            return result
+        result["phase2"] = run_phase2_project(project_name, base_path, config, pool, **options)
+
+    return result
+
+def project_status(result, phases):
+    """COMPLETE, AWAITING APPROVAL or FAILED"""
+    if 1 in phases and not result["phase1"]:
+        return "FAILED"
+    if 2 in phases and not result["approved"]:
+        # Nothing was judged: the vocabulary waits for a human evaluation
+        return "AWAITING APPROVAL" if result["score"] is None else "FAILED"
+    if 2 in phases and not result["phase2"]:
+        return "FAILED"
+    return "COMPLETE"
+
+def print_headless_summary(projects, results, phases):
+    """One line per project: phase results and the Keywords approval"""
+    def mark(value):
+        return "-" if value is None else ("ok" if value else "FAILED")
+
+    print(f"\n{'='*60}")
+    print("HEADLESS PIPELINE REPORT")
+    print(f"{'='*60}")
+    for project_name in projects:
+        result = results[project_name]
+        if result["score"] is not None:
+            approval = f"{result['score']:.1f} ({result['evaluator']})"
+        else:
+            approval = "pending" if 2 in phases and result["approved"] is not None else "-"
+        print(f"  {project_name:<30} {project_status(result, phases):<18} phase1 {mark(result['phase1']):<7}"
+              f" keywords {approval:<22} phase2 {mark(result['phase2'])}")
+
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Run the pipeline for one or more projects without prompts")
+    selection = parser.add_mutually_exclusive_group(required=True)
+    selection.add_argument("--projects", nargs="+", metavar="PROJECT", help="projects to run")
+    selection.add_argument("--all", action="store_true", help="run every available project")
+    parser.add_argument("--phases", type=int, nargs="+", choices=(1, 2), default=[1, 2],
+                        help="phases to run (default: 1 2)")
+    parser.add_argument("--retries", type=int, default=1, help="retries per failed agent (default: 1)")
+    parser.add_argument("--on-failure", choices=("continue", "stop"), default="continue",
+                        help="after the last retry, continue without the agent or stop the project")
+    parser.add_argument("--approval", choices=APPROVAL_MODES,
+                        help="Keywords Phase 1 approval rule (default: auto_approval.mode or human)")
+    parser.add_argument("--approval-threshold", type=float,
+                        help=f"minimum judge score (default: auto_approval.threshold or {APPROVAL_THRESHOLD})")
+    parser.add_argument("--workers", type=int, help="agents running at once across all projects "
+                                                    "(default: max_parallel_agents)")
+    parser.add_argument("--no-cache", action="store_true", help="bypass the response cache for this run")
+    args = parser.parse_args()
+
+    print("Agent 0b: Pipeline Orchestrator - Headless Pipeline Starting...")
+
+    # Per-run response cache bypass (read by in-process agents, inherited by subprocesses)
+    if args.no_cache:
+        os.environ["LLM_CACHE_BYPASS"] = "1"
+        print("Response cache bypassed for this run")
+
+    config = phase1.load_config()
+    base_path = config['base_path']
+    projects = resolve_projects(base_path, args.projects, args.all)
+    phases = sorted(set(args.phases))
+    workers = max(1, args.workers or config.get('max_parallel_agents', DEFAULT_MAX_WORKERS))
+
+    approval = dict(config.get('auto_approval', {}))
+    approval["mode"] = args.approval or approval.get("mode", "human")
+    approval["threshold"] = args.approval_threshold or approval.get("threshold", APPROVAL_THRESHOLD)
+    if approval["mode"] not in APPROVAL_MODES:
+        print(f"Error: Unknown approval mode '{approval['mode']}' (choose from {', '.join(APPROVAL_MODES)})")
+        sys.exit(1)
+    if approval["threshold"] < APPROVAL_THRESHOLD:
+        print(f"Error: Approval threshold must be at least {APPROVAL_THRESHOLD} (Phase 2 requirement)")
+        sys.exit(1)
+    options = {"retries": max(0, args.retries), "stop_on_failure": args.on_failure == "stop"}
+
+    print(f"Projects: {', '.join(projects)}")
+    print(f"Phases: {' + '.join(str(phase) for phase in phases)}  |  retries {options['retries']}, "
+          f"on failure {args.on_failure}  |  approval {approval['mode']} (threshold {approval['threshold']:.1f})")
+    print(f"Running up to {workers} agents at once across all projects")
+    start_run_trace(base_path, "headless", config)
+
+    # One worker pool for every project's agents; each project runs in its own thread
+    config = dict(config, max_parallel_agents=workers)
+    results = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(projects)) as project_pool:
+            futures = {project: project_pool.submit(run_project, project, base_path, config, phases,
+                                                    approval, pool, options)
+                       for project in projects}
+        for project_name, future in futures.items():
+            try:
+                results[project_name] = future.result()
+            except Exception as e:
+                print(f"Error running {project_name}: {e}")
+                results[project_name] = {"phase1": False, "approved": None, "score": None,
+                                         "evaluator": None, "phase2": None}
+
+    print_headless_summary(projects, results, phases)
+    print_usage_report()
+    print_trace_summary()
+    finish_run_trace(config)
+
+    statuses = {project_status(result, phases) for result in results.values()}
+    if "FAILED" in statuses:
+        sys.exit(1)
+    sys.exit(2 if "AWAITING APPROVAL" in statuses else 0)
+
+if __name__ == "__main__":
+    main()
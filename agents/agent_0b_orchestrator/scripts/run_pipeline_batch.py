@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Agent 0b: Pipeline Orchestrator - Batch Mode Script
+Runs Phase 1 or Phase 2 for several projects through the Message Batches API
+
+Every project's pipeline runs in its own thread with the usual DAG
+scheduling. The API calls of all agents that are ready at the same time,
+across all selected projects, are collected into shared batch jobs
+(shared/message_batches.py). When a job ends, each agent writes its output to
+3_unlabeled/{project} exactly as in a synchronous run, and its dependents
+join the next job.
+
+Batch requests cost half as much as synchronous ones but can take minutes to
+hours, so this mode is meant for unattended (e.g. nightly) runs. It never
+prompts: failed agents are recorded in the phase state and skipped.
+
+Usage:
+    python scripts/run_pipeline_batch.py --phase 1 --projects brand_a brand_b
+    python scripts/run_pipeline_batch.py --phase 2 --all
+"""
+
+import argparse
+import os
+import sys
+
+import run_pipeline_phase1 as phase1
+from agent_runner import finish_run_trace, print_batch_report, print_usage_report, start_run_trace, use_message_batches
+from run_pipeline_projects import print_projects_summary, resolve_projects, run_projects
+from run_trace import print_summary as print_trace_summary
+
+def print_batch_summary(phase, projects, results, base_path):
+    """One line per project with its completed and failed agents"""
+    print_projects_summary(phase, projects, results, base_path, title="BATCH REPORT")
+    print_batch_report()
+    print_usage_report()
+    print_trace_summary()
+
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(
+        description="Run a pipeline phase for several projects through the Message Batches API"
+    )
+    parser.add_argument("--phase", type=int, choices=(1, 2), required=True, help="pipeline phase to run")
+    selection = parser.add_mutually_exclusive_group(required=True)
+    selection.add_argument("--projects", nargs="+", metavar="PROJECT", help="projects to run")
+    selection.add_argument("--all", action="store_true", help="run every available project")
+    parser.add_argument("--no-cache", action="store_true", help="bypass the response cache for this run")
+    args = parser.parse_args()
+
+    print(f"Agent 0b: Pipeline Orchestrator - Phase {args.phase} Batch Mode Starting...")
+
+    # Per-run response cache bypass (read by in-process agents)
+    if args.no_cache:
+        os.environ["LLM_CACHE_BYPASS"] = "1"
+        print("Response cache bypassed for this run")
+
+    config = phase1.load_config()
+    base_path = config['base_path']
+
+    projects = resolve_projects(base_path, args.projects, args.all)
+
+    # Batching only works for agents that share this process's API client
+    config = dict(config, in_process_agents=True)
+    use_message_batches(base_path, config.get('message_batches', {}))
+    print(f"Projects: {', '.join(projects)}")
+    start_run_trace(base_path, f"batch_phase{args.phase}", config)
+
+    # Every project keeps its own workers so all ready agents join the same batch jobs
+    results = run_projects(args.phase, projects, base_path, config)
+
+    print_batch_summary(args.phase, projects, results, base_path)
+    finish_run_trace(config)
+    sys.exit(0 if all(results.values()) else 1)
+
+if __name__ == "__main__":
+    main()
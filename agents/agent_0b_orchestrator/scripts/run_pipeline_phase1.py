@@ -15,11 +15,20 @@ PAUSE for Keywords Agent evaluation after completion.
 import json
 import os
 import sys
-import shutil
+import sqlite3
 import subprocess
+import time
 from datetime import datetime
 from pathlib import Path
 
+from agent_runner import finish_run_trace, get_entry_point, print_usage_report, run_in_process, start_run_trace
+from artifact_store import get_artifact_store
+from run_trace import print_summary as print_trace_summary, trace_env, trace_span
+from dag_scheduler import DEFAULT_MAX_WORKERS, normalize_dependencies, run_dag
+from input_hashes import input_hash, stale_agents
+from project_context import project_env
+from state_store import get_state_store, load_phase_state, record_agent_run
+
 def load_config():
     """Load configuration from config.json"""
     config_path = Path(__file__).parent.parent / "config.json"
@@ -70,22 +79,11 @@ def select_project(base_path):
         except ValueError:
             print("Please enter a number.")
 
-def get_phase1_state_file(project_name, base_path):
-    """Get the Phase 1 state tracking file path"""
-    state_dir = Path(base_path) / "agent_0b_orchestrator" / "2_system_assets"
-    state_dir.mkdir(exist_ok=True)
-    return state_dir / f"phase1_state_{project_name}.json"
-
 def load_phase1_state(project_name, base_path):
-    """Load Phase 1 execution state"""
-    state_file = get_phase1_state_file(project_name, base_path)
-    
-    if state_file.exists():
-        try:
-            with open(state_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            pass
+    """Load Phase 1 execution state from the pipeline state store"""
+    state = load_phase_state(project_name, base_path, 1)
+    if state is not None:
+        return state
     
     # Default state
     return {
@@ -98,14 +96,12 @@ def load_phase1_state(project_name, base_path):
     }
 
 def save_phase1_state(state, base_path):
-    """Save Phase 1 execution state"""
+    """Save Phase 1 execution state (one transaction)"""
     state["last_updated"] = datetime.now().isoformat()
-    state_file = get_phase1_state_file(state["project_name"], base_path)
     
     try:
-        with open(state_file, 'w', encoding='utf-8') as f:
-            json.dump(state, f, indent=2)
-    except Exception as e:
+        get_state_store(base_path).save_state(state)
+    except sqlite3.Error as e:
         print(f"Warning: Could not save state: {e}")
 
 def detect_execution_mode(project_name, base_path):
@@ -135,8 +131,12 @@ def detect_execution_mode(project_name, base_path):
         print("Mode: NEW BRAND MODE (Phase 1: 1->2)")
         return "new_brand", [1, 2]
 
-def run_agent_script(agent_number, agent_name, base_path, project_name):
-    """Execute specific agent's generate_simple.py script"""
+def run_agent_script(agent_number, agent_name, base_path, project_name, in_process=True):
+    """Execute specific agent's generate_simple.py script
+    
+    In-process via the script's run() entry point by default; as a
+    subprocess when in_process is False or the script has no entry point.
+    """
     print(f"\n{'='*50}")
     print(f"Running Agent {agent_number}: {agent_name}")
     print(f"{'='*50}")
@@ -148,16 +148,24 @@ def run_agent_script(agent_number, agent_name, base_path, project_name):
         print(f"Script not found: {script_path}")
         return False
     
+    if in_process:
+        entry_point = get_entry_point(agent_path)
+        if entry_point:
+            print(f"Executing in-process: scripts/generate_simple.py run()")
+            if run_in_process(entry_point, agent_path, project_name):
+                print(f"Agent {agent_number} completed successfully")
+                return True
+            print(f"Agent {agent_number} failed")
+            return False
+        print(f"No run() entry point - falling back to subprocess")
+    
     try:
-        # Change to agent directory and run script
-        original_cwd = os.getcwd()
-        os.chdir(agent_path)
-        
+        # Run script from the agent directory (cwd= keeps this thread-safe)
         print(f"Executing: python scripts/generate_simple.py")
-        result = subprocess.run([sys.executable, "scripts/generate_simple.py"], 
-                              capture_output=True, text=True, timeout=300)
-        
-        os.chdir(original_cwd)
+        with trace_span("subprocess", script=str(script_path)):
+            result = subprocess.run([sys.executable, "scripts/generate_simple.py"], 
+                                  cwd=agent_path, capture_output=True, text=True, timeout=300,
+                                  env=dict(os.environ, **trace_env(), **project_env(project_name)))
         
         if result.returncode == 0:
             print(f"Agent {agent_number} completed successfully")
@@ -227,19 +235,38 @@ def get_latest_output(agent_name, project_name, base_path):
     latest_file = max(md_files, key=lambda f: f.stat().st_mtime)
     return latest_file
 
+def publish_agent_output(agent_name, project_name, base_path):
+    """Ref of the agent's current output in the artifact store (None if it has no output)
+    
+    The output published when the agent last completed is used, unless a
+    newer file was written since (e.g. the agent was run by hand).
+    """
+    store = get_artifact_store(base_path)
+    ref = store.get_ref(project_name, agent_name)
+    latest_file = get_latest_output(agent_name, project_name, base_path)
+    if latest_file and (ref is None or ref['name'] != latest_file.name):
+        ref = store.publish(project_name, agent_name, latest_file)
+    return ref
+
 def copy_agent_output(source_agent, target_agents, project_name, base_path, config):
-    """Copy output files to target agent input folders"""
+    """Hand the source agent's output to target agent input folders
+    
+    Inputs are hardlinks to the content-addressed artifact store (copies
+    where hardlinks are not possible); each hand-off is recorded in the
+    store's provenance log.
+    """
     agent_mapping = config['agent_mapping']
     source_agent_name = agent_mapping[str(source_agent)]
+    store = get_artifact_store(base_path)
     
-    # Get latest output from source agent
-    source_file = get_latest_output(source_agent_name, project_name, base_path)
-    if not source_file:
+    # Current output of the source agent
+    ref = publish_agent_output(source_agent_name, project_name, base_path)
+    if not ref:
         print(f"No output file found from Agent {source_agent}")
         return False
     
-    print(f"\nCopying output from Agent {source_agent} to downstream agents...")
-    print(f"Source file: {source_file.name}")
+    print(f"\nHanding off output from Agent {source_agent} to downstream agents...")
+    print(f"Source file: {ref['name']} (sha256 {ref['sha256'][:12]})")
     
     success_count = 0
     for target_agent in target_agents:
@@ -247,19 +274,25 @@ def copy_agent_output(source_agent, target_agents, project_name, base_path, conf
         target_dir = Path(base_path) / target_agent_name / "1_input" / project_name
         
         try:
-            target_dir.mkdir(parents=True, exist_ok=True)
-            target_path = target_dir / source_file.name
-            shutil.copy2(source_file, target_path)
-            print(f"  Copied to Agent {target_agent}: {target_agent_name}")
+            with trace_span("copy", source=ref['name'], sha256=ref['sha256'], target=str(target_dir)) as span:
+                span["result"] = store.handoff(project_name, source_agent_name, ref, target_agent_name, target_dir)
+            print(f"  {span['result'].capitalize()} for Agent {target_agent}: {target_agent_name}")
             success_count += 1
         except Exception as e:
-            print(f"  Failed to copy to Agent {target_agent}: {e}")
+            print(f"  Failed to hand off to Agent {target_agent}: {e}")
     
-    print(f"Copy operation completed: {success_count}/{len(target_agents)} successful")
+    print(f"Hand-off completed: {success_count}/{len(target_agents)} successful")
     return success_count == len(target_agents)
 
-def execute_phase1_pipeline(project_name, base_path, config, execution_sequence, mode):
-    """Run Phase 1 pipeline with state tracking and resume functionality"""
+def execute_phase1_pipeline(project_name, base_path, config, execution_sequence, mode, interactive=True,
+                            pool=None, retries=0, stop_on_failure=False):
+    """Run Phase 1 pipeline with state tracking and resume functionality
+    
+    With interactive=False (batch and headless runs) nothing prompts: a
+    failed agent is retried up to `retries` times, then the remaining agents
+    continue (or, with stop_on_failure, no new agents start). pool is a worker
+    pool shared with other projects' pipelines running at the same time.
+    """
     print(f"\nStarting Phase 1 pipeline execution for: {project_name}")
     print(f"Execution sequence: {' -> '.join(map(str, execution_sequence))}")
     
@@ -268,109 +301,144 @@ def execute_phase1_pipeline(project_name, base_path, config, execution_sequence,
     print(f"\nCurrent state: {len(state['completed_agents'])} agents completed")
     
     agent_mapping = config['agent_mapping']
-    dependencies = config['agent_dependencies']
+    dependencies = normalize_dependencies(config['agent_dependencies'])
+    max_workers = config.get('max_parallel_agents', DEFAULT_MAX_WORKERS)
+    in_process = config.get('in_process_agents', True)
+    
+    # Mode-specific requirements for Keywords Agent
+    if mode == "validation":
+        required_for_keywords = {1, 2, 3}  # Keywords needs all foundation agents
+    else:  # new_brand mode
+        required_for_keywords = {1, 2}  # Keywords only needs message house and brand persona
+    
+    # Keywords Phase 1 (Agent 5) joins the DAG so it can overlap with Agent 4
+    dependencies[5] = sorted(required_for_keywords)
+    scheduled_agents = list(execution_sequence) + [5]
+    
+    def current_input_hash(agent_number):
+        upstream = [get_latest_output(agent_mapping[str(dep)], project_name, base_path)
+                    for dep in dependencies.get(agent_number, [])]
+        # Keywords Bank keeps its Phase 1 evaluations in 5_labeled_json, not examples
+        return input_hash(Path(base_path) / agent_mapping[str(agent_number)], project_name, upstream_files=upstream,
+                          examples=agent_number != 5)
+    
+    # Incremental rebuild: completed agents whose inputs changed run again, with their dependents
+    input_hashes = state.setdefault('input_hashes', {})
+    artifacts = state.setdefault('artifacts', {})
+    if config.get('incremental_rebuilds', True):
+        changed, stale = stale_agents(scheduled_agents, state['completed_agents'], input_hashes,
+                                      current_input_hash, dependencies)
+        for agent_number in stale:
+            reason = "inputs changed" if agent_number in changed else "upstream agent is re-running"
+            print(f"\nAgent {agent_number} {reason} - RE-RUNNING")
+            state['completed_agents'].remove(agent_number)
+        if 5 in stale:
+            state['ready_for_keywords'] = False
+        save_phase1_state(state, base_path)
     
-    for agent_number in execution_sequence:
-        # Skip if already completed
+    for agent_number in scheduled_agents:
         if agent_number in state['completed_agents']:
             print(f"\nAgent {agent_number} already completed - SKIPPING")
-            continue
+    
+    def run_agent(agent_number):
+        started = time.time()
+        with trace_span("agent", agent=agent_mapping[str(agent_number)], project=project_name, phase=1,
+                        depends_on=[agent_mapping[str(dep)] for dep in dependencies.get(agent_number, [])]) as span:
+            span["success"] = run_agent_steps(agent_number)
+        record_agent_run(project_name, base_path, 1, agent_number, started, span["success"])
+        return span["success"]
+    
+    def run_agent_steps(agent_number):
+        if agent_number == 5:
+            print(f"\nRunning Keywords Bank Phase 1...")
             
-        agent_name = agent_mapping[str(agent_number)]
+            # Copy input files from completed foundation agents to Keywords Agent
+            print(f"Copying input files to Keywords Bank Agent...")
+            for source_agent in dependencies[5]:
+                copy_success = copy_agent_output(
+                    source_agent, [5], project_name, base_path, config
+                )
+                if not copy_success:
+                    print(f"Warning: Failed to copy files from Agent {source_agent} to Keywords Agent")
         
-        # Check dependencies
-        required_deps = dependencies.get(str(agent_number), [])
-        missing_deps = [dep for dep in required_deps if dep not in state['completed_agents']]
+        return run_agent_script(agent_number, agent_mapping[str(agent_number)], base_path, project_name,
+                                in_process=in_process)
+    
+    def on_success(agent_number):
+        state['completed_agents'].append(agent_number)
+        ref = publish_agent_output(agent_mapping[str(agent_number)], project_name, base_path)
+        if ref:
+            artifacts[str(agent_number)] = ref['sha256']
+        input_hashes[str(agent_number)] = current_input_hash(agent_number)
         
-        if missing_deps:
-            print(f"Skipping Agent {agent_number} - missing dependencies: {missing_deps}")
-            continue
+        # Remove from failed list if previously failed
+        if agent_number in state['failed_agents']:
+            state['failed_agents'].remove(agent_number)
         
-        # Execute agent
-        success = run_agent_script(agent_number, agent_name, base_path, project_name)
+        # Copy output to downstream agents
+        downstream_agents = [
+            other_agent for other_agent, deps in dependencies.items()
+            if agent_number in deps and other_agent in execution_sequence
+        ]
         
-        if success:
-            state['completed_agents'].append(agent_number)
-            
-            # Remove from failed list if previously failed
-            if agent_number in state['failed_agents']:
-                state['failed_agents'].remove(agent_number)
-            
-            # Copy output to downstream agents
-            downstream_agents = []
-            for other_agent, deps in dependencies.items():
-                if agent_number in deps and int(other_agent) in execution_sequence:
-                    downstream_agents.append(int(other_agent))
-            
-            if downstream_agents:
-                copy_success = copy_agent_output(
-                    agent_number, downstream_agents, project_name, base_path, config
-                )
-                if not copy_success:
-                    print(f"Warning: Copy operation partially failed for Agent {agent_number}")
-            
-            # Save state after each successful agent
-            save_phase1_state(state, base_path)
-            
-        else:
-            if agent_number not in state['failed_agents']:
-                state['failed_agents'].append(agent_number)
-            
-            # Ask user if they want to retry
+        if downstream_agents:
+            copy_success = copy_agent_output(
+                agent_number, downstream_agents, project_name, base_path, config
+            )
+            if not copy_success:
+                print(f"Warning: Hand-off partially failed for Agent {agent_number}")
+        
+        # Save state after each successful agent
+        save_phase1_state(state, base_path)
+        
+        if agent_number == 5:
+            print(f"\nKeywords Phase 1 completed successfully!")
+    
+    def unattended_failure_decision(agent_number, attempt):
+        """Retry policy for runs nobody is watching"""
+        if attempt <= retries:
+            state['failed_agents'].remove(agent_number)
+            print(f"\nAgent {agent_number} failed - retrying ({attempt}/{retries})")
+            return "retry"
+        return "stop" if stop_on_failure else "continue"
+    
+    def on_failure(agent_number, attempt):
+        if agent_number not in state['failed_agents']:
+            state['failed_agents'].append(agent_number)
+        save_phase1_state(state, base_path)
+        
+        if not interactive:
+            return unattended_failure_decision(agent_number, attempt)
+        
+        # Keywords failure is reported after the run; remaining agents finish normally
+        if agent_number == 5:
+            return "continue"
+        
+        # Ask user if they want to retry (once)
+        if attempt == 1:
             retry = input(f"\nAgent {agent_number} failed. Retry? (y/N): ").strip().lower()
             if retry == 'y':
-                # Remove from failed list for retry
-                if agent_number in state['failed_agents']:
-                    state['failed_agents'].remove(agent_number)
-                
-                # Retry once
-                success = run_agent_script(agent_number, agent_name, base_path, project_name)
-                if success:
-                    state['completed_agents'].append(agent_number)
-                else:
-                    state['failed_agents'].append(agent_number)
-            
-            save_phase1_state(state, base_path)
-            
-            if not success:
-                break_execution = input("Continue with remaining agents? (y/N): ").strip().lower()
-                if break_execution != 'y':
-                    break
+                state['failed_agents'].remove(agent_number)
+                return "retry"
+        
+        break_execution = input("Continue with remaining agents? (y/N): ").strip().lower()
+        return "continue" if break_execution == 'y' else "stop"
+    
+    # Run every agent as soon as its dependencies are complete
+    print(f"Running up to {max_workers} independent agents in parallel")
+    run_dag(
+        scheduled_agents, dependencies, run_agent,
+        completed=state['completed_agents'], max_workers=max_workers,
+        on_success=on_success, on_failure=on_failure, pool=pool
+    )
     
     # Check if minimum required agents for Keywords are complete
     completed_agents = set(state['completed_agents'])
-    # Mode-specific requirements for Keywords Agent
-    if mode == "validation":
-        required_for_keywords = {1, 2, 3}  # Keywords needs all foundation agents
-    else:  # new_brand mode
-        required_for_keywords = {1, 2}  # Keywords only needs message house and brand persona
     
     if required_for_keywords.issubset(completed_agents):
-        # Run Keywords Phase 1 if not already done
-        if 5 not in state['completed_agents']:
-            print(f"\nRunning Keywords Bank Phase 1...")
-            
-            # Copy input files from completed foundation agents to Keywords Agent
-            print(f"Copying input files to Keywords Bank Agent...")
-            for source_agent in required_for_keywords:
-                if source_agent in completed_agents:
-                    copy_success = copy_agent_output(
-                        source_agent, [5], project_name, base_path, config
-                    )
-                    if not copy_success:
-                        print(f"Warning: Failed to copy files from Agent {source_agent} to Keywords Agent")
-            
-            keywords_success = run_agent_script(5, "keywords_bank_agent", base_path, project_name)
-            if keywords_success:
-                state['completed_agents'].append(5)
-                save_phase1_state(state, base_path)
-                print(f"\nKeywords Phase 1 completed successfully!")
-            else:
-                print(f"\nKeywords Phase 1 failed. Cannot proceed to evaluation.")
-                if 5 not in state['failed_agents']:
-                    state['failed_agents'].append(5)
-                save_phase1_state(state, base_path)
-                return False
+        if 5 not in completed_agents:
+            print(f"\nKeywords Phase 1 failed. Cannot proceed to evaluation.")
+            return False
         
         # Phase 1 complete - ready for Keywords evaluation
         state['ready_for_keywords'] = True
@@ -381,7 +449,7 @@ def execute_phase1_pipeline(project_name, base_path, config, execution_sequence,
         print(f"{'='*60}")
         print(f"REQUIRED NEXT STEP: Keywords Phase 1 Evaluation")
         print(f"")
-        print(f"1. Run evaluation: python keywords_bank_agent/scripts/evaluate_phase1.py")
+        print(f"1. Run evaluation: python keywords_bank_agent/scripts/evaluate_phase1.py --project {project_name}")
         print(f"2. Score must be >= 7.0 to proceed to Phase 2")  
         print(f"3. Then run: python scripts/run_pipeline_phase2.py")
         print(f"")
@@ -429,10 +497,13 @@ def generate_phase1_report(project_name, base_path, config):
         success_rate = len(state['completed_agents']) / total_agents * 100
         print(f"\nSuccess Rate: {success_rate:.1f}%")
     
+    print_usage_report()
+    print_trace_summary()
+    
     if state['ready_for_keywords']:
         print(f"\nNEXT STEPS:")
-        print(f"1. Run Keywords Bank Agent: python keywords_bank_agent/scripts/generate_simple.py")
-        print(f"2. Evaluate keywords quality: python keywords_bank_agent/scripts/evaluate_phase1.py") 
+        print(f"1. Run Keywords Bank Agent: python keywords_bank_agent/scripts/generate_simple.py --project {project_name}")
+        print(f"2. Evaluate keywords quality: python keywords_bank_agent/scripts/evaluate_phase1.py --project {project_name}") 
         print(f"3. If score >= 7.0, run Phase 2: python scripts/run_pipeline_phase2.py")
     else:
         print(f"\nPHASE 1 INCOMPLETE")
@@ -442,6 +513,11 @@ def main():
     """Main execution function"""
     print("Agent 0b: Pipeline Orchestrator - Phase 1 Starting...")
     
+    # Per-run response cache bypass (read by in-process agents, inherited by subprocesses)
+    if "--no-cache" in sys.argv:
+        os.environ["LLM_CACHE_BYPASS"] = "1"
+        print("Response cache bypassed for this run")
+    
     # Load configuration
     config = load_config()
     base_path = config['base_path']
@@ -475,10 +551,12 @@ def main():
         print(f"\nAll Phase 1 agents already completed!")
     
     # Execute Phase 1 pipeline
+    start_run_trace(base_path, f"phase1_{project_name}", config)
     success = execute_phase1_pipeline(project_name, base_path, config, execution_sequence, mode)
     
     # Generate report
     generate_phase1_report(project_name, base_path, config)
+    finish_run_trace(config)
     
     if success:
         print(f"\nPhase 1 Complete! Ready for Keywords Agent evaluation.")
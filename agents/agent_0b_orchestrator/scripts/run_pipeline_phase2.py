@@ -15,11 +15,23 @@ Requires Phase 1 completion and Keywords evaluation score >= 7.0
 import json
 import os
 import sys
-import shutil
+import sqlite3
 import subprocess
+import time
 from datetime import datetime
 from pathlib import Path
 
+from agent_runner import finish_run_trace, get_entry_point, print_usage_report, run_in_process, start_run_trace
+from artifact_store import get_artifact_store
+from run_trace import print_summary as print_trace_summary, trace_env, trace_span
+from dag_scheduler import DEFAULT_MAX_WORKERS, normalize_dependencies, run_dag
+from input_hashes import input_hash, stale_agents
+from project_context import project_env
+from state_store import get_state_store, load_phase_state, record_agent_run
+
+# Minimum Keywords Phase 1 evaluation score for Phase 2
+APPROVAL_THRESHOLD = 7.0
+
 def load_config():
     """Load configuration from config.json"""
     config_path = Path(__file__).parent.parent / "config.json"
@@ -70,40 +82,15 @@ def select_project(base_path):
         except ValueError:
             print("Please enter a number.")
 
-def get_phase1_state_file(project_name, base_path):
-    """Get the Phase 1 state tracking file path"""
-    state_dir = Path(base_path) / "agent_0b_orchestrator" / "2_system_assets"
-    return state_dir / f"phase1_state_{project_name}.json"
-
-def get_phase2_state_file(project_name, base_path):
-    """Get the Phase 2 state tracking file path"""
-    state_dir = Path(base_path) / "agent_0b_orchestrator" / "2_system_assets"
-    state_dir.mkdir(exist_ok=True)
-    return state_dir / f"phase2_state_{project_name}.json"
-
 def load_phase1_state(project_name, base_path):
-    """Load Phase 1 execution state"""
-    state_file = get_phase1_state_file(project_name, base_path)
-    
-    if state_file.exists():
-        try:
-            with open(state_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            pass
-    
-    return None
+    """Load Phase 1 execution state (None if Phase 1 never ran)"""
+    return load_phase_state(project_name, base_path, 1)
 
 def load_phase2_state(project_name, base_path):
-    """Load Phase 2 execution state"""
-    state_file = get_phase2_state_file(project_name, base_path)
-    
-    if state_file.exists():
-        try:
-            with open(state_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            pass
+    """Load Phase 2 execution state from the pipeline state store"""
+    state = load_phase_state(project_name, base_path, 2)
+    if state is not None:
+        return state
     
     # Default state
     return {
@@ -117,14 +104,12 @@ def load_phase2_state(project_name, base_path):
     }
 
 def save_phase2_state(state, base_path):
-    """Save Phase 2 execution state"""
+    """Save Phase 2 execution state (one transaction)"""
     state["last_updated"] = datetime.now().isoformat()
-    state_file = get_phase2_state_file(state["project_name"], base_path)
     
     try:
-        with open(state_file, 'w', encoding='utf-8') as f:
-            json.dump(state, f, indent=2)
-    except Exception as e:
+        get_state_store(base_path).save_state(state)
+    except sqlite3.Error as e:
         print(f"Warning: Could not save state: {e}")
 
 def validate_phase1_completion(project_name, base_path):
@@ -147,22 +132,38 @@ def validate_phase1_completion(project_name, base_path):
     if not approved:
         print("ERROR: Keywords Phase 1 evaluation not approved.")
         print(f"Current evaluation score: {score:.1f} (requires >= 7.0)")
-        print("Please run: python keywords_bank_agent/scripts/evaluate_phase1.py")
+        print(f"Please run: python keywords_bank_agent/scripts/evaluate_phase1.py --project {project_name}")
         return False
     
     print("Phase 1 validation: PASSED")
     print(f"Keywords Phase 1 approved with score: {score:.1f}")
     return True
 
+def get_keywords_evaluations(project_name, base_path):
+    """Keywords Phase 1 evaluations of this project in keywords_bank_agent/5_labeled_json
+    
+    All projects share the folder: an evaluation belongs to the project it
+    records, or (older evaluations) to the project holding its vocabulary file.
+    """
+    agent_dir = Path(base_path) / "keywords_bank_agent"
+    evaluations = []
+    for json_file in (agent_dir / "5_labeled_json").glob("*.json"):
+        try:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                project = json.load(f).get('project')
+        except:
+            continue
+        if project:
+            if project == project_name:
+                evaluations.append(json_file)
+        elif (agent_dir / "3_unlabeled" / project_name / json_file.name.replace("_labeled.json", ".md")).exists():
+            evaluations.append(json_file)
+    return evaluations
+
 def check_keywords_phase1_approved(project_name, base_path):
     """Check if keywords Phase 1 has been evaluated and approved"""
-    keywords_labeled_dir = Path(base_path) / "keywords_bank_agent" / "5_labeled_json"
-    
-    if not keywords_labeled_dir.exists():
-        return False, 0.0
-    
-    # Look for recent evaluation JSON files
-    json_files = list(keywords_labeled_dir.glob("*.json"))
+    # Look for this project's evaluation JSON files
+    json_files = get_keywords_evaluations(project_name, base_path)
     if not json_files:
         return False, 0.0
     
@@ -173,13 +174,25 @@ def check_keywords_phase1_approved(project_name, base_path):
         with open(latest_eval, 'r', encoding='utf-8') as f:
             eval_data = json.load(f)
         
-        # Check if score is >= 7.0 (approval threshold)
+        # Check if score is >= 7.0 (approval threshold); stricter auto-approval
+        # rules record their own verdict in passed_threshold
         overall_score = eval_data.get('overall_score', 0)
-        return overall_score >= 7.0, overall_score
+        approved = overall_score >= APPROVAL_THRESHOLD and eval_data.get('passed_threshold', True)
+        return approved, overall_score
         
     except:
         return False, 0.0
 
+def get_keywords_phase1_files(project_name, base_path):
+    """Latest Keywords Phase 1 vocabulary and evaluation (what Keywords Phase 2 expands)"""
+    agent_dir = Path(base_path) / "keywords_bank_agent"
+    files = []
+    for candidates in (list((agent_dir / "3_unlabeled" / project_name).glob("keywords_bank_vocabulary_*.md")),
+                       get_keywords_evaluations(project_name, base_path)):
+        if candidates:
+            files.append(max(candidates, key=lambda f: f.stat().st_mtime))
+    return files
+
 def detect_execution_mode(project_name, base_path):
     """Detect execution mode based on available input files"""
     print(f"\nDetecting execution mode for project: {project_name}")
@@ -195,8 +208,12 @@ def detect_execution_mode(project_name, base_path):
         print("Mode: NEW BRAND MODE (Phase 2: 5->7->8->9)")
         return "new_brand", [5, 7, 8, 9]
 
-def run_agent_script(agent_number, agent_name, base_path, project_name):
-    """Execute specific agent's generate_simple.py script"""
+def run_agent_script(agent_number, agent_name, base_path, project_name, in_process=True):
+    """Execute specific agent's generate_simple.py script
+    
+    In-process via the script's run() entry point by default; as a
+    subprocess when in_process is False or the script has no entry point.
+    """
     print(f"\n{'='*50}")
     print(f"Running Agent {agent_number}: {agent_name}")
     print(f"{'='*50}")
@@ -208,16 +225,24 @@ def run_agent_script(agent_number, agent_name, base_path, project_name):
         print(f"Script not found: {script_path}")
         return False
     
+    if in_process:
+        entry_point = get_entry_point(agent_path)
+        if entry_point:
+            print(f"Executing in-process: scripts/generate_simple.py run()")
+            if run_in_process(entry_point, agent_path, project_name):
+                print(f"Agent {agent_number} completed successfully")
+                return True
+            print(f"Agent {agent_number} failed")
+            return False
+        print(f"No run() entry point - falling back to subprocess")
+    
     try:
-        # Change to agent directory and run script
-        original_cwd = os.getcwd()
-        os.chdir(agent_path)
-        
+        # Run script from the agent directory (cwd= keeps this thread-safe)
         print(f"Executing: python scripts/generate_simple.py")
-        result = subprocess.run([sys.executable, "scripts/generate_simple.py"], 
-                              capture_output=True, text=True, timeout=300)
-        
-        os.chdir(original_cwd)
+        with trace_span("subprocess", script=str(script_path)):
+            result = subprocess.run([sys.executable, "scripts/generate_simple.py"], 
+                                  cwd=agent_path, capture_output=True, text=True, timeout=300,
+                                  env=dict(os.environ, **trace_env(), **project_env(project_name)))
         
         if result.returncode == 0:
             print(f"Agent {agent_number} completed successfully")
@@ -235,19 +260,24 @@ def run_agent_script(agent_number, agent_name, base_path, project_name):
         print(f"Error running Agent {agent_number}: {e}")
         return False
 
-def run_keywords_phase2(project_name, base_path):
+def run_keywords_phase2(project_name, base_path, in_process=True):
     """Run keywords Phase 2 generation"""
     try:
         print("\nRunning Keywords Bank Phase 2: Expansion Engine...")
         
-        original_cwd = os.getcwd()
         agent_dir = Path(base_path) / "keywords_bank_agent"
-        os.chdir(agent_dir)
-        
-        result = subprocess.run([sys.executable, "scripts/generate_phase2.py"], 
-                              capture_output=True, text=True, timeout=300)
+        entry_point = get_entry_point(agent_dir, "generate_phase2.py") if in_process else None
+        if entry_point:
+            if run_in_process(entry_point, agent_dir, project_name):
+                print("Keywords Bank Phase 2 completed successfully")
+                return True
+            print("Keywords Bank Phase 2 failed")
+            return False
         
-        os.chdir(original_cwd)
+        with trace_span("subprocess", script="scripts/generate_phase2.py"):
+            result = subprocess.run([sys.executable, "scripts/generate_phase2.py"], 
+                                  cwd=agent_dir, capture_output=True, text=True, timeout=300,
+                                  env=dict(os.environ, **trace_env(), **project_env(project_name)))
         
         if result.returncode == 0:
             print("Keywords Bank Phase 2 completed successfully")
@@ -312,19 +342,44 @@ def get_latest_output(agent_name, project_name, base_path):
     latest_file = max(md_files, key=lambda f: f.stat().st_mtime)
     return latest_file
 
+def publish_agent_output(agent_name, project_name, base_path):
+    """Ref of the agent's current output in the artifact store (None if it has no output)
+    
+    The output published when the agent last completed is used, unless a
+    newer file was written since (e.g. the agent was run by hand).
+    """
+    store = get_artifact_store(base_path)
+    ref = store.get_ref(project_name, agent_name)
+    latest_file = get_latest_output(agent_name, project_name, base_path)
+    if latest_file and (ref is None or ref['name'] != latest_file.name):
+        ref = store.publish(project_name, agent_name, latest_file)
+    return ref
+
 def copy_agent_output(source_agent, target_agents, project_name, base_path, config):
-    """Copy output files to target agent input folders"""
+    """Hand the source agent's output to target agent input folders
+    
+    Inputs are hardlinks to the content-addressed artifact store (copies
+    where hardlinks are not possible); each hand-off is recorded in the
+    store's provenance log.
+    """
     agent_mapping = config['agent_mapping']
     source_agent_name = agent_mapping[str(source_agent)]
+    store = get_artifact_store(base_path)
     
-    # Get latest output from source agent
-    source_file = get_latest_output(source_agent_name, project_name, base_path)
-    if not source_file:
+    # Current output of the source agent
+    ref = publish_agent_output(source_agent_name, project_name, base_path)
+    if not ref:
         print(f"No output file found from Agent {source_agent}")
         return False
     
-    print(f"\nCopying output from Agent {source_agent} to downstream agents...")
-    print(f"Source file: {source_file.name}")
+    # Structured companion of the output (the keywords agent's {name}.jsonl bank), handed off with it
+    companion = Path(ref['source']).with_suffix(".jsonl")
+    companion_ref = None
+    if companion.exists():
+        companion_ref = store.publish(project_name, f"{source_agent_name}.structured", companion)
+    
+    print(f"\nHanding off output from Agent {source_agent} to downstream agents...")
+    print(f"Source file: {ref['name']} (sha256 {ref['sha256'][:12]})")
     
     success_count = 0
     for target_agent in target_agents:
@@ -332,19 +387,28 @@ def copy_agent_output(source_agent, target_agents, project_name, base_path, conf
         target_dir = Path(base_path) / target_agent_name / "1_input" / project_name
         
         try:
-            target_dir.mkdir(parents=True, exist_ok=True)
-            target_path = target_dir / source_file.name
-            shutil.copy2(source_file, target_path)
-            print(f"  Copied to Agent {target_agent}: {target_agent_name}")
+            with trace_span("copy", source=ref['name'], sha256=ref['sha256'], target=str(target_dir)) as span:
+                span["result"] = store.handoff(project_name, source_agent_name, ref, target_agent_name, target_dir)
+                if companion_ref:
+                    store.handoff(project_name, f"{source_agent_name}.structured", companion_ref,
+                                  target_agent_name, target_dir)
+            print(f"  {span['result'].capitalize()} for Agent {target_agent}: {target_agent_name}")
             success_count += 1
         except Exception as e:
-            print(f"  Failed to copy to Agent {target_agent}: {e}")
+            print(f"  Failed to hand off to Agent {target_agent}: {e}")
     
-    print(f"Copy operation completed: {success_count}/{len(target_agents)} successful")
+    print(f"Hand-off completed: {success_count}/{len(target_agents)} successful")
     return success_count == len(target_agents)
 
-def execute_phase2_pipeline(project_name, base_path, config, execution_sequence, mode):
-    """Run Phase 2 pipeline with state tracking and resume functionality"""
+def execute_phase2_pipeline(project_name, base_path, config, execution_sequence, mode, interactive=True,
+                            pool=None, retries=0, stop_on_failure=False):
+    """Run Phase 2 pipeline with state tracking and resume functionality
+    
+    With interactive=False (batch and headless runs) nothing prompts: a
+    failed agent is retried up to `retries` times, then the remaining agents
+    continue (or, with stop_on_failure, no new agents start). pool is a worker
+    pool shared with other projects' pipelines running at the same time.
+    """
     print(f"\nStarting Phase 2 pipeline execution for: {project_name}")
     print(f"Execution sequence: {' -> '.join(map(str, execution_sequence))}")
     
@@ -361,132 +425,156 @@ def execute_phase2_pipeline(project_name, base_path, config, execution_sequence,
     print(f"Total completed agents (Phase 1 + 2): {sorted(list(all_completed_agents))}")
     
     agent_mapping = config['agent_mapping']
-    dependencies = config['agent_dependencies']
+    dependencies = normalize_dependencies(config['agent_dependencies'])
+    max_workers = config.get('max_parallel_agents', DEFAULT_MAX_WORKERS)
+    in_process = config.get('in_process_agents', True)
+    
+    # Mode-aware dependency filtering
+    if mode == "new_brand":
+        # In New Brand Mode, remove Agent 3 dependency for agents 7 and 8
+        for agent_number in [7, 8]:
+            if 3 in dependencies.get(agent_number, []):
+                dependencies[agent_number] = [dep for dep in dependencies[agent_number] if dep != 3]
+                print(f">>> New Brand Mode: Removed Agent 3 dependency for Agent {agent_number}")
+    
+    # Agent 5 only counts as done for Phase 2 once its expansion has run; its
+    # Phase 1 prerequisites were already enforced by validate_phase1_completion
+    dependencies[5] = []
+    scheduled_done = all_completed_agents - {5}
+    if state.get('keywords_phase2_completed', False):
+        scheduled_done.add(5)
     
+    def current_input_hash(agent_number):
+        agent_path = Path(base_path) / agent_mapping[str(agent_number)]
+        if agent_number == 5:
+            return input_hash(agent_path, project_name, "generate_phase2.py",
+                              upstream_files=get_keywords_phase1_files(project_name, base_path), examples=False)
+        upstream = [get_latest_output(agent_mapping[str(dep)], project_name, base_path)
+                    for dep in dependencies.get(agent_number, [])]
+        return input_hash(agent_path, project_name, upstream_files=upstream)
+    
+    # Incremental rebuild: completed agents whose inputs changed (including
+    # re-run Phase 1 outputs) run again, with their dependents
+    input_hashes = state.setdefault('input_hashes', {})
+    artifacts = state.setdefault('artifacts', {})
+    if config.get('incremental_rebuilds', True):
+        changed, stale = stale_agents(execution_sequence, scheduled_done, input_hashes,
+                                      current_input_hash, dependencies)
+        for agent_number in stale:
+            reason = "inputs changed" if agent_number in changed else "upstream agent is re-running"
+            print(f"\nAgent {agent_number} {reason} - RE-RUNNING")
+            scheduled_done.discard(agent_number)
+            if agent_number in state['completed_agents']:
+                state['completed_agents'].remove(agent_number)
+            if agent_number == 5:
+                state['keywords_phase2_completed'] = False
+        save_phase2_state(state, base_path)
+    
+    if 5 in scheduled_done:
+        print(f"\nAgent 5 (Keywords Bank) Phase 2 already completed - SKIPPING")
     for agent_number in execution_sequence:
-        agent_name = agent_mapping[str(agent_number)]
-        
+        if agent_number != 5 and agent_number in state['completed_agents']:
+            print(f"\nAgent {agent_number} already completed - SKIPPING")
+    
+    def run_agent(agent_number):
+        started = time.time()
+        with trace_span("agent", agent=agent_mapping[str(agent_number)], project=project_name, phase=2,
+                        depends_on=[agent_mapping[str(dep)] for dep in dependencies.get(agent_number, [])]) as span:
+            span["success"] = run_agent_steps(agent_number)
+        record_agent_run(project_name, base_path, 2, agent_number, started, span["success"])
+        return span["success"]
+    
+    def run_agent_steps(agent_number):
         # Special handling for Keywords Bank Agent (Agent 5)
         if agent_number == 5:
-            # Check if Phase 2 is already completed
-            if state.get('keywords_phase2_completed', False):
-                print(f"\nAgent 5 (Keywords Bank) Phase 2 already completed - SKIPPING")
-                continue
-            # Check if Phase 1 already approved
             approved, score = check_keywords_phase1_approved(project_name, base_path)
-            if approved and not state['keywords_phase2_completed']:
-                print(f"\nKeywords Phase 1 approved with score {score:.1f}, running Phase 2...")
-                success = run_keywords_phase2(project_name, base_path)
-                if success:
-                    state['completed_agents'].append(agent_number)
-                    state['keywords_approved'] = True
-                    state['keywords_phase2_completed'] = True
-                    
-                    # Copy Keywords Phase 2 output to downstream agents
-                    downstream_agents = []
-                    for other_agent, deps in dependencies.items():
-                        if agent_number in deps and int(other_agent) in execution_sequence:
-                            downstream_agents.append(int(other_agent))
-                    
-                    if downstream_agents:
-                        copy_success = copy_agent_output(
-                            agent_number, downstream_agents, project_name, base_path, config
-                        )
-                        if not copy_success:
-                            print(f"Warning: Copy operation partially failed for Keywords Phase 2")
-                    
-                    save_phase2_state(state, base_path)
-                else:
-                    if agent_number not in state['failed_agents']:
-                        state['failed_agents'].append(agent_number)
-                    save_phase2_state(state, base_path)
-                    break
-                continue
+            if not approved:
+                print(f"\nKeywords Phase 1 not approved (score {score:.1f}) - cannot run Phase 2")
+                return False
+            print(f"\nKeywords Phase 1 approved with score {score:.1f}, running Phase 2...")
+            state['keywords_approved'] = True
+            return run_keywords_phase2(project_name, base_path, in_process=in_process)
         
-        # Generic completion check for other agents (7, 8, 9)
-        if agent_number in state['completed_agents']:
-            print(f"\nAgent {agent_number} already completed - SKIPPING")
-            continue
+        # Copy all required dependencies before executing agent (including Phase 1 outputs)
+        for dep_agent in dependencies.get(agent_number, []):
+            copy_success = copy_agent_output(
+                dep_agent, [agent_number], project_name, base_path, config
+            )
+            if not copy_success:
+                print(f"Warning: Failed to copy files from Agent {dep_agent} to Agent {agent_number}")
         
-        # Check dependencies using merged completed agents list - mode-aware
-        required_deps = dependencies.get(str(agent_number), [])
+        return run_agent_script(agent_number, agent_mapping[str(agent_number)], base_path, project_name,
+                                in_process=in_process)
+    
+    def on_success(agent_number):
+        if agent_number not in state['completed_agents']:
+            state['completed_agents'].append(agent_number)
+        ref = publish_agent_output(agent_mapping[str(agent_number)], project_name, base_path)
+        if ref:
+            artifacts[str(agent_number)] = ref['sha256']
+        input_hashes[str(agent_number)] = current_input_hash(agent_number)
+        if agent_number == 5:
+            state['keywords_approved'] = True
+            state['keywords_phase2_completed'] = True
         
-        # Mode-aware dependency filtering
-        if mode == "new_brand":
-            # In New Brand Mode, remove Agent 3 dependency for agents 7 and 8
-            if agent_number in [7, 8] and 3 in required_deps:
-                required_deps = [dep for dep in required_deps if dep != 3]
-                print(f">>> New Brand Mode: Removed Agent 3 dependency for Agent {agent_number}")
+        # Remove from failed list if previously failed
+        if agent_number in state['failed_agents']:
+            state['failed_agents'].remove(agent_number)
         
-        missing_deps = [dep for dep in required_deps if dep not in all_completed_agents]
+        # Copy output to downstream agents
+        downstream_agents = [
+            other_agent for other_agent, deps in dependencies.items()
+            if agent_number in deps and other_agent in execution_sequence
+        ]
         
-        if missing_deps:
-            print(f"Skipping Agent {agent_number} - missing dependencies: {missing_deps}")
-            continue
+        if downstream_agents:
+            copy_success = copy_agent_output(
+                agent_number, downstream_agents, project_name, base_path, config
+            )
+            if not copy_success:
+                print(f"Warning: Hand-off partially failed for Agent {agent_number}")
         
-        # Copy all required dependencies before executing agent (including Phase 1 outputs)
-        # Use the same filtered dependencies as the missing check above
-        for dep_agent in required_deps:
-            if dep_agent in all_completed_agents:
-                copy_success = copy_agent_output(
-                    dep_agent, [agent_number], project_name, base_path, config
-                )
-                if not copy_success:
-                    print(f"Warning: Failed to copy files from Agent {dep_agent} to Agent {agent_number}")
-            else:
-                print(f"Debug: Dependency Agent {dep_agent} not found in completed agents for Agent {agent_number}")
-                print(f"Available completed agents: {sorted(list(all_completed_agents))}")
+        # Save state after each successful agent
+        save_phase2_state(state, base_path)
+    
+    def unattended_failure_decision(agent_number, attempt):
+        """Retry policy for runs nobody is watching"""
+        if attempt <= retries:
+            state['failed_agents'].remove(agent_number)
+            print(f"\nAgent {agent_number} failed - retrying ({attempt}/{retries})")
+            return "retry"
+        # Keywords expansion failure blocks every content agent
+        return "stop" if stop_on_failure or agent_number == 5 else "continue"
+    
+    def on_failure(agent_number, attempt):
+        if agent_number not in state['failed_agents']:
+            state['failed_agents'].append(agent_number)
+        save_phase2_state(state, base_path)
         
-        # Execute agent
-        success = run_agent_script(agent_number, agent_name, base_path, project_name)
+        if not interactive:
+            return unattended_failure_decision(agent_number, attempt)
         
-        if success:
-            state['completed_agents'].append(agent_number)
-            
-            # Remove from failed list if previously failed
-            if agent_number in state['failed_agents']:
-                state['failed_agents'].remove(agent_number)
-            
-            # Copy output to downstream agents
-            downstream_agents = []
-            for other_agent, deps in dependencies.items():
-                if agent_number in deps and int(other_agent) in execution_sequence:
-                    downstream_agents.append(int(other_agent))
-            
-            if downstream_agents:
-                copy_success = copy_agent_output(
-                    agent_number, downstream_agents, project_name, base_path, config
-                )
-                if not copy_success:
-                    print(f"Warning: Copy operation partially failed for Agent {agent_number}")
-            
-            # Save state after each successful agent
-            save_phase2_state(state, base_path)
-            
-        else:
-            if agent_number not in state['failed_agents']:
-                state['failed_agents'].append(agent_number)
-            
-            # Ask user if they want to retry
+        # Keywords expansion failure blocks every content agent
+        if agent_number == 5:
+            return "stop"
+        
+        # Ask user if they want to retry (once)
+        if attempt == 1:
             retry = input(f"\nAgent {agent_number} failed. Retry? (y/N): ").strip().lower()
             if retry == 'y':
-                # Remove from failed list for retry
-                if agent_number in state['failed_agents']:
-                    state['failed_agents'].remove(agent_number)
-                
-                # Retry once
-                success = run_agent_script(agent_number, agent_name, base_path, project_name)
-                if success:
-                    state['completed_agents'].append(agent_number)
-                else:
-                    state['failed_agents'].append(agent_number)
-            
-            save_phase2_state(state, base_path)
-            
-            if not success:
-                break_execution = input("Continue with remaining agents? (y/N): ").strip().lower()
-                if break_execution != 'y':
-                    break
+                state['failed_agents'].remove(agent_number)
+                return "retry"
+        
+        break_execution = input("Continue with remaining agents? (y/N): ").strip().lower()
+        return "continue" if break_execution == 'y' else "stop"
+    
+    # Run every agent as soon as its dependencies are complete
+    print(f"Running up to {max_workers} independent agents in parallel")
+    run_dag(
+        execution_sequence, dependencies, run_agent,
+        completed=scheduled_done, max_workers=max_workers,
+        on_success=on_success, on_failure=on_failure, pool=pool
+    )
     
     # Check if Phase 2 is complete
     expected_agents = set(execution_sequence)
@@ -543,6 +631,9 @@ def generate_phase2_report(project_name, base_path, config):
         success_rate = len(state['completed_agents']) / total_agents * 100
         print(f"\nSuccess Rate: {success_rate:.1f}%")
     
+    print_usage_report()
+    print_trace_summary()
+    
     # Check if complete pipeline is done
     expected_phase2_agents = {5, 7, 8, 9}
     completed_phase2_agents = set(state['completed_agents'])
@@ -558,6 +649,11 @@ def main():
     """Main execution function"""
     print("Agent 0b: Pipeline Orchestrator - Phase 2 Starting...")
     
+    # Per-run response cache bypass (read by in-process agents, inherited by subprocesses)
+    if "--no-cache" in sys.argv:
+        os.environ["LLM_CACHE_BYPASS"] = "1"
+        print("Response cache bypassed for this run")
+    
     # Load configuration
     config = load_config()
     base_path = config['base_path']
@@ -597,10 +693,12 @@ def main():
         print(f"\nAll Phase 2 agents already completed!")
     
     # Execute Phase 2 pipeline
+    start_run_trace(base_path, f"phase2_{project_name}", config)
     success = execute_phase2_pipeline(project_name, base_path, config, execution_sequence, mode)
     
     # Generate report
     generate_phase2_report(project_name, base_path, config)
+    finish_run_trace(config)
     
     if success:
         print(f"\nPhase 2 Complete! All marketing assets generated.")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Agent 0b: Pipeline Orchestrator - Multi-Project Script
+Runs Phase 1 or Phase 2 for several projects at once from one command
+
+Every project's pipeline runs in its own thread with the usual DAG
+scheduling. The agent runs of all projects share one worker pool
+("max_parallel_agents" threads, or --workers) and the process-wide rate
+limiter, so many small projects keep the workers busy instead of running
+one after another. Each agent is handed its project explicitly (run(project=...)
+in-process, PIPELINE_PROJECT for subprocesses); no config.json is modified,
+so projects never overwrite each other's settings.
+
+It never prompts: failed agents are recorded in the project's phase state
+and skipped.
+
+Usage:
+    python scripts/run_pipeline_projects.py --phase 1 --projects brand_a brand_b
+    python scripts/run_pipeline_projects.py --phase 2 --all --workers 8
+"""
+
+import argparse
+import concurrent.futures
+import os
+import sys
+
+import run_pipeline_phase1 as phase1
+import run_pipeline_phase2 as phase2
+from agent_runner import finish_run_trace, print_usage_report, start_run_trace
+from dag_scheduler import DEFAULT_MAX_WORKERS
+from run_trace import print_summary as print_trace_summary
+
+def run_phase1_project(project_name, base_path, config, pool=None, **options):
+    """Run Phase 1 for one project without prompts; True if Keywords Phase 1 is ready"""
+    mode, execution_sequence = phase1.detect_execution_mode(project_name, base_path)
+    if not mode:
+        return False
+    return phase1.execute_phase1_pipeline(project_name, base_path, config, execution_sequence, mode,
+                                          interactive=False, pool=pool, **options)
+
+def run_phase2_project(project_name, base_path, config, pool=None, **options):
+    """Run Phase 2 for one project without prompts; True if every Phase 2 agent completed"""
+    if not phase2.validate_phase1_completion(project_name, base_path):
+        print(f"Skipping {project_name}: Phase 1 not complete or Keywords not approved")
+        return False
+    mode, execution_sequence = phase2.detect_execution_mode(project_name, base_path)
+    return phase2.execute_phase2_pipeline(project_name, base_path, config, execution_sequence, mode,
+                                          interactive=False, pool=pool, **options)
+
+def run_projects(phase, projects, base_path, config, pool=None):
+    """Run a phase for every project concurrently; returns {project: success}
+
+    With a pool, all projects' agents share its workers; without one each
+    project's pipeline uses its own max_parallel_agents workers.
+    """
+    run_project = run_phase1_project if phase == 1 else run_phase2_project
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(projects)) as project_pool:
+        futures = {project: project_pool.submit(run_project, project, base_path, config, pool)
+                   for project in projects}
+
+    results = {}
+    for project_name, future in futures.items():
+        try:
+            results[project_name] = future.result()
+        except Exception as e:
+            print(f"Error running {project_name}: {e}")
+            results[project_name] = False
+    return results
+
+def resolve_projects(base_path, projects=None, all_projects=False):
+    """Validate the requested projects (or every project with all_projects); exits on unknown names"""
+    available = phase1.get_available_projects(base_path)
+    selected = available if all_projects else projects
+    unknown = [project for project in selected if project not in available]
+    if unknown:
+        print(f"Error: Unknown projects: {', '.join(unknown)}")
+        print(f"Available projects: {', '.join(available) or 'none'}")
+        sys.exit(1)
+    if not selected:
+        print("No projects found. Please run Agent 0a first to create a project.")
+        sys.exit(1)
+    return selected
+
+def print_projects_summary(phase, projects, results, base_path, title="MULTI-PROJECT REPORT"):
+    """One line per project with its completed and failed agents"""
+    load_state = phase1.load_phase1_state if phase == 1 else phase2.load_phase2_state
+
+    print(f"\n{'='*60}")
+    print(f"PHASE {phase} {title}")
+    print(f"{'='*60}")
+    for project_name in projects:
+        state = load_state(project_name, base_path)
+        status = "COMPLETE" if results.get(project_name) else "INCOMPLETE"
+        print(f"  {project_name:<30} {status:<11} completed {sorted(state['completed_agents'])}"
+              f"  failed {sorted(state['failed_agents'])}")
+
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Run a pipeline phase for several projects concurrently")
+    parser.add_argument("--phase", type=int, choices=(1, 2), required=True, help="pipeline phase to run")
+    selection = parser.add_mutually_exclusive_group(required=True)
+    selection.add_argument("--projects", nargs="+", metavar="PROJECT", help="projects to run")
+    selection.add_argument("--all", action="store_true", help="run every available project")
+    parser.add_argument("--workers", type=int, help="agents running at once across all projects "
+                                                    "(default: max_parallel_agents)")
+    parser.add_argument("--no-cache", action="store_true", help="bypass the response cache for this run")
+    args = parser.parse_args()
+
+    print(f"Agent 0b: Pipeline Orchestrator - Phase {args.phase} Multi-Project Starting...")
+
+    # Per-run response cache bypass (read by in-process agents, inherited by subprocesses)
+    if args.no_cache:
+        os.environ["LLM_CACHE_BYPASS"] = "1"
+        print("Response cache bypassed for this run")
+
+    config = phase1.load_config()
+    base_path = config['base_path']
+    projects = resolve_projects(base_path, args.projects, args.all)
+    workers = max(1, args.workers or config.get('max_parallel_agents', DEFAULT_MAX_WORKERS))
+
+    print(f"Projects: {', '.join(projects)}")
+    print(f"Running up to {workers} agents at once across all projects")
+    start_run_trace(base_path, f"projects_phase{args.phase}", config)
+
+    # One worker pool for every project's agents; each project may use all of it
+    config = dict(config, max_parallel_agents=workers)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        results = run_projects(args.phase, projects, base_path, config, pool=pool)
+
+    print_projects_summary(args.phase, projects, results, base_path)
+    print_usage_report()
+    print_trace_summary()
+    finish_run_trace(config)
+    sys.exit(0 if all(results.values()) else 1)
+
+if __name__ == "__main__":
+    main()
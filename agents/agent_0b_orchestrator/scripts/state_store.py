@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Agent 0b: Pipeline Orchestrator - Pipeline State Store
+
+Phase state of every project in one SQLite database (WAL mode),
+agent_0b_orchestrator/2_system_assets/pipeline_state.db:
+
+    phases      one row per project and phase: ready_for_keywords,
+                keywords_approved, keywords_phase2_completed, last_updated
+    agents      one row per project, phase and agent: status (completed,
+                failed, pending), attempts, last run start/duration, input
+                hash and the SHA-256 of its output in the artifact store
+    agent_runs  one row per agent attempt: start, end, duration, success
+
+Every write is a single transaction, so a crash or a concurrent run never
+leaves half a state behind, and WAL lets many project threads (or several
+orchestrator processes) read while one writes. Readers get the same state
+dict the phase scripts always used (completed_agents, failed_agents,
+input_hashes, flags) plus "artifacts", each agent's output SHA-256. A
+project's phaseN_state_{project}.json from older versions is imported the
+first time its state is loaded.
+
+Usage:
+    python scripts/state_store.py                # every project's progress
+    python scripts/state_store.py --blocked      # projects waiting for Keywords approval
+"""
+
+import argparse
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS phases (
+    project TEXT NOT NULL,
+    phase INTEGER NOT NULL,
+    ready_for_keywords INTEGER NOT NULL DEFAULT 0,
+    keywords_approved INTEGER NOT NULL DEFAULT 0,
+    keywords_phase2_completed INTEGER NOT NULL DEFAULT 0,
+    last_updated TEXT,
+    PRIMARY KEY (project, phase)
+);
+CREATE TABLE IF NOT EXISTS agents (
+    project TEXT NOT NULL,
+    phase INTEGER NOT NULL,
+    agent INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_started TEXT,
+    last_duration REAL,
+    input_hash TEXT,
+    artifact_sha256 TEXT,
+    updated TEXT,
+    PRIMARY KEY (project, phase, agent)
+);
+CREATE TABLE IF NOT EXISTS agent_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project TEXT NOT NULL,
+    phase INTEGER NOT NULL,
+    agent INTEGER NOT NULL,
+    started TEXT NOT NULL,
+    finished TEXT NOT NULL,
+    duration REAL NOT NULL,
+    success INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS agents_status ON agents (phase, status);
+CREATE INDEX IF NOT EXISTS agent_runs_agent ON agent_runs (project, phase, agent);
+"""
+
+FLAGS = {
+    1: ("ready_for_keywords",),
+    2: ("keywords_approved", "keywords_phase2_completed"),
+}
+
+# Seconds a writer waits for another writer before failing
+BUSY_TIMEOUT = 30
+
+_initialized = set()
+_init_lock = threading.Lock()
+
+
+class StateStore:
+    """Transactional per-project, per-agent pipeline state"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    @contextmanager
+    def connect(self, write=False):
+        """Connection for one transaction; write=True takes the write lock up front"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=BUSY_TIMEOUT, isolation_level=None)
+        try:
+            conn.row_factory = sqlite3.Row
+            self._initialize(conn)
+            conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def _initialize(self, conn):
+        with _init_lock:
+            if self.path in _initialized:
+                return
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            _initialized.add(self.path)
+
+    def load_state(self, project_name, phase):
+        """The phase state dict of a project, or None if it has never run"""
+        with self.connect() as conn:
+            row = conn.execute("SELECT * FROM phases WHERE project = ? AND phase = ?",
+                               (project_name, phase)).fetchone()
+            if row is None:
+                return None
+            agents = conn.execute("SELECT agent, status, input_hash, artifact_sha256 FROM agents "
+                                  "WHERE project = ? AND phase = ? ORDER BY updated, agent",
+                                  (project_name, phase)).fetchall()
+
+        state = {
+            "project_name": project_name,
+            "phase": phase,
+            "completed_agents": [a["agent"] for a in agents if a["status"] == "completed"],
+            "failed_agents": [a["agent"] for a in agents if a["status"] == "failed"],
+            "last_updated": row["last_updated"],
+            "input_hashes": {str(a["agent"]): a["input_hash"] for a in agents if a["input_hash"]},
+            "artifacts": {str(a["agent"]): a["artifact_sha256"] for a in agents if a["artifact_sha256"]},
+        }
+        for flag in FLAGS[phase]:
+            state[flag] = bool(row[flag])
+        return state
+
+    def save_state(self, state):
+        """Write a phase state dict atomically (agents missing from both lists become pending)"""
+        project_name, phase = state["project_name"], state["phase"]
+        now = datetime.now().isoformat()
+        statuses = {agent: "failed" for agent in state.get("failed_agents", [])}
+        statuses.update({agent: "completed" for agent in state.get("completed_agents", [])})
+        hashes = {int(agent): value for agent, value in state.get("input_hashes", {}).items()}
+        artifacts = {int(agent): value for agent, value in state.get("artifacts", {}).items()}
+
+        with self.connect(write=True) as conn:
+            flags = {flag: int(bool(state.get(flag, False))) for flag in FLAGS[phase]}
+            conn.execute("INSERT INTO phases (project, phase, last_updated) VALUES (?, ?, ?) "
+                         "ON CONFLICT (project, phase) DO UPDATE SET last_updated = excluded.last_updated",
+                         (project_name, phase, state.get("last_updated") or now))
+            conn.execute(f"UPDATE phases SET {', '.join(f'{flag} = ?' for flag in flags)} "
+                         "WHERE project = ? AND phase = ?", (*flags.values(), project_name, phase))
+
+            existing = {row["agent"] for row in conn.execute(
+                "SELECT agent FROM agents WHERE project = ? AND phase = ?", (project_name, phase))}
+            for agent in existing | set(statuses) | set(hashes) | set(artifacts):
+                status = statuses.get(agent, "pending")
+                conn.execute("INSERT INTO agents (project, phase, agent, status, input_hash, artifact_sha256, "
+                             "updated) VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (project, phase, agent) DO UPDATE "
+                             "SET status = excluded.status, input_hash = excluded.input_hash, "
+                             "artifact_sha256 = excluded.artifact_sha256, "
+                             "updated = CASE WHEN agents.status = excluded.status THEN agents.updated "
+                             "ELSE excluded.updated END",
+                             (project_name, phase, agent, status, hashes.get(agent), artifacts.get(agent), now))
+
+    def record_run(self, project_name, phase, agent, started, duration, success):
+        """Record one agent attempt (start as epoch seconds)"""
+        started_at = datetime.fromtimestamp(started).isoformat()
+        finished_at = datetime.fromtimestamp(started + duration).isoformat()
+        with self.connect(write=True) as conn:
+            conn.execute("INSERT INTO agent_runs (project, phase, agent, started, finished, duration, success) "
+                         "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (project_name, phase, agent, started_at, finished_at, round(duration, 3), int(success)))
+            conn.execute("INSERT INTO agents (project, phase, agent, attempts, last_started, last_duration, "
+                         "updated) VALUES (?, ?, ?, 1, ?, ?, ?) "
+                         "ON CONFLICT (project, phase, agent) DO UPDATE SET attempts = agents.attempts + 1, "
+                         "last_started = excluded.last_started, last_duration = excluded.last_duration",
+                         (project_name, phase, agent, started_at, round(duration, 3), finished_at))
+
+    def projects(self):
+        """One row per project and phase with completed/failed agent counts"""
+        with self.connect() as conn:
+            return [dict(row) for row in conn.execute(
+                "SELECT p.project, p.phase, p.ready_for_keywords, p.keywords_approved, "
+                "p.keywords_phase2_completed, p.last_updated, "
+                "SUM(a.status = 'completed') AS completed, SUM(a.status = 'failed') AS failed, "
+                "SUM(a.attempts) AS attempts "
+                "FROM phases p LEFT JOIN agents a ON a.project = p.project AND a.phase = p.phase "
+                "GROUP BY p.project, p.phase ORDER BY p.project, p.phase")]
+
+    def projects_awaiting_keywords(self):
+        """Projects whose Phase 1 is ready for Keywords evaluation but whose Phase 2 has not approved it"""
+        with self.connect() as conn:
+            return [row["project"] for row in conn.execute(
+                "SELECT p1.project FROM phases p1 LEFT JOIN phases p2 "
+                "ON p2.project = p1.project AND p2.phase = 2 "
+                "WHERE p1.phase = 1 AND p1.ready_for_keywords = 1 AND COALESCE(p2.keywords_approved, 0) = 0 "
+                "ORDER BY p1.project")]
+
+    def import_json(self, state_file):
+        """Import a legacy phaseN_state_{project}.json once; returns the imported state or None"""
+        try:
+            with open(state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Could not import legacy state {state_file}: {e}") from e
+        self.save_state(state)
+        print(f"Imported {Path(state_file).name} into {self.path.name}")
+        return self.load_state(state["project_name"], state["phase"])
+
+
+def get_state_store(base_path):
+    return StateStore(Path(base_path) / "agent_0b_orchestrator" / "2_system_assets" / "pipeline_state.db")
+
+
+def load_phase_state(project_name, base_path, phase):
+    """Stored phase state of a project (imported from its legacy JSON file if needed), or None"""
+    store = get_state_store(base_path)
+    state = store.load_state(project_name, phase)
+    if state is None:
+        legacy = store.path.parent / f"phase{phase}_state_{project_name}.json"
+        if legacy.exists():
+            state = store.import_json(legacy)
+    return state
+
+
+def record_agent_run(project_name, base_path, phase, agent, started, success):
+    """Record an agent attempt that started at `started` (epoch seconds) and ends now"""
+    try:
+        get_state_store(base_path).record_run(project_name, phase, agent, started, time.time() - started, success)
+    except sqlite3.Error as e:
+        print(f"Warning: Could not record run of Agent {agent}: {e}")
+
+
+def main():
+    """Print every project's progress, or the projects blocked on Keywords approval"""
+    parser = argparse.ArgumentParser(description="Query the pipeline state store")
+    parser.add_argument("--blocked", action="store_true",
+                        help="projects whose Phase 2 waits for an approved Keywords Phase 1 evaluation")
+    args = parser.parse_args()
+
+    from run_pipeline_phase1 import load_config
+    from run_pipeline_phase2 import check_keywords_phase1_approved
+    base_path = load_config()['base_path']
+    store = get_state_store(base_path)
+
+    if args.blocked:
+        # Approvals given in evaluate_phase1.py are only seen by Phase 2, so check the evaluations too
+        blocked = [project for project in store.projects_awaiting_keywords()
+                   if not check_keywords_phase1_approved(project, base_path)[0]]
+        print("\n".join(blocked) if blocked else "No projects are waiting for Keywords approval")
+        return
+
+    rows = store.projects()
+    if not rows:
+        print("No pipeline state recorded yet")
+        return
+    print(f"{'project':<30} {'phase':>5} {'completed':>9} {'failed':>6} {'attempts':>8}  last updated")
+    for row in rows:
+        print(f"{row['project']:<30} {row['phase']:>5} {row['completed'] or 0:>9} {row['failed'] or 0:>6} "
+              f"{row['attempts'] or 0:>8}  {row['last_updated'] or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ GUI-based evaluation system using 5-criteria framework
 """
 
 import os
+import sys
 import json
 import datetime
 import tkinter as tk
@@ -12,6 +13,9 @@ from tkinter import ttk, messagebox, scrolledtext
 from pathlib import Path
 from typing import Dict, List, Optional
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "shared"))
+from project_context import resolve_project
+
 class KeywordsBankPhase1Evaluator:
     def __init__(self):
         """Initialize the Phase 1 evaluator with GUI."""
@@ -61,14 +65,14 @@ class KeywordsBankPhase1Evaluator:
         self.create_gui()
         
     def _load_current_project(self) -> Optional[str]:
-        """Load current project from config.json."""
+        """Load current project (--project / PIPELINE_PROJECT, else config.json)."""
         config_path = self.base_dir / "config.json"
         try:
             with open(config_path, 'r') as f:
                 config = json.load(f)
-            return config.get("current_project", None)
         except:
-            return None
+            config = {}
+        return resolve_project(config, Path(__file__).resolve().parent.parent)
         
     def create_gui(self):
         """Create the main GUI interface."""
@@ -288,6 +292,7 @@ class KeywordsBankPhase1Evaluator:
         
         evaluation_data = {
             "file_path": str(self.current_file),
+            "project": self.current_project,
             "evaluation_date": datetime.datetime.now().isoformat(),
             "overall_score": score,
             "criteria_scores": {key: criteria['score'].get() for key, criteria in self.criteria.items()},
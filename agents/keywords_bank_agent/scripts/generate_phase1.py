@@ -5,25 +5,33 @@ Generates foundational keyword bank vocabulary for human evaluation
 """
 
 import os
+import sys
 import json
 import datetime
-import urllib.request
-import urllib.parse
-import urllib.error
 from pathlib import Path
 from typing import Dict, List, Optional
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "shared"))
+from llm_client import APIError, extract_text, get_client, system_blocks
+from project_context import resolve_project
+
 class KeywordsBankPhase1Generator:
-    def __init__(self, config_path: str = "config.json"):
-        """Initialize the Phase 1 generator with configuration."""
-        self.config = self._load_config(config_path)
-        # No client needed - using direct HTTP requests
+    def __init__(self, config_path: str = "config.json", project: Optional[str] = None,
+                 config: Optional[Dict] = None):
+        """Initialize the Phase 1 generator with configuration.
+
+        project and config override current_project / config.json when the
+        generator is driven in-process by Agent 0b.
+        """
         self.base_dir = Path(__file__).parent.parent
+        self.config = config if config is not None else self._load_config(config_path)
+        # API calls go through the shared pooled client (see shared/llm_client.py)
         self.timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.current_project = self.config.get("current_project", None)
+        self.current_project = project or resolve_project(self.config, Path(__file__).resolve().parent.parent)
         
     def _load_config(self, config_path: str) -> Dict:
-        """Load configuration from JSON file."""
+        """Load configuration from JSON file (relative paths are inside the agent directory)."""
+        config_path = self.base_dir / config_path
         try:
             with open(config_path, 'r') as f:
                 return json.load(f)
@@ -149,38 +157,23 @@ Generate the complete `keywords_bank_vocabulary_[timestamp].md` file now.
         print("\n>>> Generating vocabulary with Claude...")
         
         try:
-            # Prepare API request
-            url = "https://api.anthropic.com/v1/messages"
-            
-            data = {
-                "model": self.config.get("model", "claude-3-5-sonnet-20241022"),
-                "max_tokens": self.config.get("max_tokens", 4000),
-                "temperature": self.config.get("temperature", 0.7),
-                "system": system_prompt,
-                "messages": [
+            response_data = get_client(self.config).create_message(
+                [
                     {
                         "role": "user",
                         "content": user_prompt
                     }
-                ]
-            }
-            
-            # Convert to JSON
-            json_data = json.dumps(data).encode('utf-8')
-            
-            # Create request
-            req = urllib.request.Request(url)
-            req.add_header('Content-Type', 'application/json')
-            req.add_header('x-api-key', self.config['anthropic_api_key'])
-            req.add_header('anthropic-version', '2023-06-01')
-            
-            # Make the request
-            with urllib.request.urlopen(req, json_data) as response:
-                response_data = json.loads(response.read().decode('utf-8'))
+                ],
+                system=system_blocks(system_prompt),
+                agent="keywords_bank",
+                model=self.config.get("model", "claude-3-5-sonnet-20241022"),
+                max_tokens=self.config.get("max_tokens", 4000),
+                temperature=self.config.get("temperature", 0.7)
+            )
                 
             # Extract the content
-            if 'content' in response_data and len(response_data['content']) > 0:
-                generated_content = response_data['content'][0]['text']
+            generated_content = extract_text(response_data)
+            if generated_content is not None:
                 print(">>> Vocabulary generation completed")
                 return generated_content
             else:
@@ -188,10 +181,9 @@ Generate the complete `keywords_bank_vocabulary_[timestamp].md` file now.
                 print("Response:", response_data)
                 raise ValueError("Unexpected API response format")
                 
-        except urllib.error.HTTPError as e:
-            print(f">>> HTTP Error: {e.code} - {e.reason}")
-            error_body = e.read().decode('utf-8')
-            print(f"Error details: {error_body}")
+        except APIError as e:
+            print(f">>> HTTP Error: {e.status} - {e.reason}")
+            print(f"Error details: {e.body}")
             raise
         except Exception as e:
             print(f">>> Error generating vocabulary: {str(e)}")
@@ -208,7 +200,12 @@ Generate the complete `keywords_bank_vocabulary_[timestamp].md` file now.
             
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        filename = f"keywords_bank_vocabulary_{self.timestamp}.md"
+        # Evaluations of every project share 5_labeled_json/ and are named after this
+        # file, so the project keeps same-second runs of different projects apart
+        if self.current_project:
+            filename = f"keywords_bank_vocabulary_{self.current_project}_{self.timestamp}.md"
+        else:
+            filename = f"keywords_bank_vocabulary_{self.timestamp}.md"
         output_path = output_dir / filename
         
         with open(output_path, 'w', encoding='utf-8') as f:
@@ -239,6 +236,16 @@ Generate the complete `keywords_bank_vocabulary_[timestamp].md` file now.
             print(f"\n>>> Phase 1 generation failed: {str(e)}")
             raise
 
+def run(project: Optional[str] = None, config: Optional[Dict] = None) -> Optional[str]:
+    """Run Phase 1 vocabulary generation for one project (Agent 0b calls this in-process).
+
+    Returns the output path, or None on failure.
+    """
+    try:
+        return KeywordsBankPhase1Generator(project=project, config=config).run()
+    except Exception:
+        return None
+
 if __name__ == "__main__":
     generator = KeywordsBankPhase1Generator()
     generator.run()
\ No newline at end of file
@@ -5,25 +5,37 @@ Generates massive keyword expansion from approved Phase 1 vocabulary
 """
 
 import os
+import sys
 import json
 import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
-import urllib.request
-import urllib.parse
-import urllib.error
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "shared"))
+from keyword_bank import write_keyword_bank
+from llm_client import APIError, extract_text, get_client, system_blocks
+from project_context import resolve_project
+# Sibling vector_expansion must also import when Agent 0b loads this script in-process
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from vector_expansion import VECTORS, VectorExpander
 
 class KeywordsBankPhase2Generator:
-    def __init__(self, config_path: str = "config.json"):
-        """Initialize the Phase 2 generator with configuration."""
-        self.config = self._load_config(config_path)
-        # No client needed - using direct HTTP requests
+    def __init__(self, config_path: str = "config.json", project: Optional[str] = None,
+                 config: Optional[Dict] = None):
+        """Initialize the Phase 2 generator with configuration.
+
+        project and config override current_project / config.json when the
+        generator is driven in-process by Agent 0b.
+        """
         self.base_dir = Path(__file__).parent.parent
+        self.config = config if config is not None else self._load_config(config_path)
+        # API calls go through the shared pooled client (see shared/llm_client.py)
         self.timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.current_project = self.config.get("current_project", None)
+        self.current_project = project or resolve_project(self.config, Path(__file__).resolve().parent.parent)
         
     def _load_config(self, config_path: str) -> Dict:
-        """Load configuration from JSON file."""
+        """Load configuration from JSON file (relative paths are inside the agent directory)."""
+        config_path = self.base_dir / config_path
         try:
             with open(config_path, 'r') as f:
                 return json.load(f)
@@ -68,7 +80,7 @@ class KeywordsBankPhase2Generator:
             try:
                 with open(json_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
-                    if data.get("passed_threshold", False):
+                    if data.get("passed_threshold", False) and self._is_project_evaluation(json_file, data):
                         approved_files.append((json_file, data.get("evaluation_date", "")))
             except Exception as e:
                 print(f">>> Warning: Could not read {json_file}: {e}")
@@ -100,6 +112,16 @@ class KeywordsBankPhase2Generator:
             
         return str(vocab_path)
         
+    def _is_project_evaluation(self, json_file: Path, data: Dict) -> bool:
+        """Whether an evaluation in the shared 5_labeled_json/ belongs to the current project."""
+        if not self.current_project:
+            return True
+        if data.get("project"):
+            return data["project"] == self.current_project
+        # Evaluations saved before the project was recorded: match the vocabulary file
+        vocab_filename = json_file.name.replace("_labeled.json", ".md")
+        return (self.base_dir / "3_unlabeled" / self.current_project / vocab_filename).exists()
+        
     def _load_input_files(self, vocab_path: str) -> Dict[str, str]:
         """Load all input files including approved vocabulary."""
         input_files = {}
@@ -128,8 +150,8 @@ class KeywordsBankPhase2Generator:
                 
         return input_files
         
-    def _create_user_prompt(self, input_files: Dict[str, str]) -> str:
-        """Create the user prompt with approved vocabulary and context."""
+    def _create_input_section(self, input_files: Dict[str, str]) -> str:
+        """Approved vocabulary and context files, the input shared by every expansion request."""
         prompt_parts = []
         
         # Add approved vocabulary (primary input)
@@ -150,6 +172,12 @@ class KeywordsBankPhase2Generator:
             
         prompt_parts.append(context_section)
         
+        return "\n\n".join(prompt_parts)
+        
+    def _create_user_prompt(self, input_files: Dict[str, str]) -> str:
+        """Create the user prompt with approved vocabulary and context."""
+        prompt_parts = [self._create_input_section(input_files)]
+        
         # Add generation instruction
         prompt_parts.append("""
 ## GENERATION INSTRUCTION
@@ -176,8 +204,12 @@ Generate the complete `keywords_bank_expansion_[timestamp].md` file now.
         
         return "\n\n".join(prompt_parts)
         
-    def generate_expansion(self, vocab_path: str) -> str:
-        """Generate the Phase 2 expansion using Claude API."""
+    def generate_expansion(self, vocab_path: str, output_path: Optional[Path] = None) -> str:
+        """Generate the Phase 2 expansion using Claude API.
+
+        With output_path the response is streamed straight into that file
+        (written as .partial, renamed when complete).
+        """
         print("\n>>> Starting Phase 2: Expansion Engine Generation")
         print("=" * 60)
         
@@ -195,38 +227,27 @@ Generate the complete `keywords_bank_expansion_[timestamp].md` file now.
         print("   Target: 150+ keywords across 6 vectors")
         
         try:
-            # Prepare API request
-            url = "https://api.anthropic.com/v1/messages"
-            
-            data = {
-                "model": self.config.get("model", "claude-3-5-sonnet-20241022"),
-                "max_tokens": self.config.get("max_tokens_phase2", 8000),
-                "temperature": self.config.get("temperature", 0.7),
-                "system": system_prompt,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": user_prompt
-                    }
-                ]
-            }
-            
-            # Convert to JSON
-            json_data = json.dumps(data).encode('utf-8')
-            
-            # Create request
-            req = urllib.request.Request(url)
-            req.add_header('Content-Type', 'application/json')
-            req.add_header('x-api-key', self.config['anthropic_api_key'])
-            req.add_header('anthropic-version', '2023-06-01')
-            
-            # Make the request
-            with urllib.request.urlopen(req, json_data) as response:
-                response_data = json.loads(response.read().decode('utf-8'))
+            messages = [
+                {
+                    "role": "user",
+                    "content": user_prompt
+                }
+            ]
+            options = dict(
+                system=system_blocks(system_prompt),
+                agent="keywords_bank",
+                model=self.config.get("model", "claude-3-5-sonnet-20241022"),
+                max_tokens=self.config.get("max_tokens_phase2", 8000),
+                temperature=self.config.get("temperature", 0.7)
+            )
+            if output_path is not None:
+                response_data = get_client(self.config).stream_message(messages, output_path, **options)
+            else:
+                response_data = get_client(self.config).create_message(messages, **options)
                 
             # Extract the content
-            if 'content' in response_data and len(response_data['content']) > 0:
-                generated_content = response_data['content'][0]['text']
+            generated_content = extract_text(response_data)
+            if generated_content is not None:
                 print(">>> Expansion generation completed")
                 return generated_content
             else:
@@ -234,17 +255,44 @@ Generate the complete `keywords_bank_expansion_[timestamp].md` file now.
                 print("Response:", response_data)
                 raise ValueError("Unexpected API response format")
                 
-        except urllib.error.HTTPError as e:
-            print(f">>> HTTP Error: {e.code} - {e.reason}")
-            error_body = e.read().decode('utf-8')
-            print(f"Error details: {error_body}")
+        except APIError as e:
+            print(f">>> HTTP Error: {e.status} - {e.reason}")
+            print(f"Error details: {e.body}")
             raise
         except Exception as e:
             print(f">>> Error generating expansion: {str(e)}")
             raise
             
-    def save_output(self, content: str) -> str:
-        """Save the generated expansion to the unlabeled directory."""
+    def _brand_name(self, vocabulary: str) -> str:
+        """Brand for the expansion title: from the vocabulary title ("...: Brand"), else the project."""
+        for line in vocabulary.splitlines():
+            if line.startswith("# ") and ":" in line:
+                return line.split(":", 1)[1].strip(" *")
+        return self.current_project or "Brand"
+        
+    def generate_vector_expansion(self, vocab_path: str) -> str:
+        """Generate the Phase 2 expansion with one concurrent request per vector (see vector_expansion.py)."""
+        print("\n>>> Starting Phase 2: Expansion Engine Generation (one request per vector)")
+        print("=" * 60)
+        
+        system_prompt = self._load_system_prompt()
+        input_files = self._load_input_files(vocab_path)
+        shared_input = self._create_input_section(input_files)
+        
+        print(f"\n>>> Generating {len(VECTORS)} keyword vectors in parallel with Claude...")
+        try:
+            expansion = VectorExpander(self.config).expand(
+                system_prompt, shared_input, self._brand_name(input_files["approved_vocabulary"])
+            )
+        except APIError as e:
+            print(f">>> HTTP Error: {e.status} - {e.reason}")
+            print(f"Error details: {e.body}")
+            raise
+        print(">>> Expansion generation completed")
+        return expansion
+        
+    def _output_path(self) -> Path:
+        """Path of this run's expansion file in the unlabeled directory."""
         if self.current_project:
             # Use project-specific output directory
             output_dir = self.base_dir / "3_unlabeled" / self.current_project
@@ -255,7 +303,11 @@ Generate the complete `keywords_bank_expansion_[timestamp].md` file now.
         output_dir.mkdir(parents=True, exist_ok=True)
         
         filename = f"keywords_bank_expansion_{self.timestamp}.md"
-        output_path = output_dir / filename
+        return output_dir / filename
+        
+    def save_output(self, content: str) -> str:
+        """Save the generated expansion to the unlabeled directory."""
+        output_path = self._output_path()
         
         with open(output_path, 'w', encoding='utf-8') as f:
             f.write(content)
@@ -271,11 +323,27 @@ Generate the complete `keywords_bank_expansion_[timestamp].md` file now.
             if not vocab_path:
                 return None
                 
-            # Generate expansion
-            expansion = self.generate_expansion(vocab_path)
+            # Generate expansion (one request per vector with "vector_fan_out", otherwise one
+            # request streamed straight into 3_unlabeled unless "stream_output" is false)
+            if self.config.get("vector_fan_out", {}).get("enabled", False):
+                expansion = self.generate_vector_expansion(vocab_path)
+                output_path = self.save_output(expansion)
+            elif self.config.get("stream_output", True):
+                output_path = self._output_path()
+                self.generate_expansion(vocab_path, output_path)
+                output_path = str(output_path)
+                print(f">>> Output saved to: {output_path}")
+            else:
+                expansion = self.generate_expansion(vocab_path)
+                output_path = self.save_output(expansion)
             
-            # Save output
-            output_path = self.save_output(expansion)
+            # Structured bank next to the markdown, for downstream keyword slices
+            try:
+                bank = write_keyword_bank(output_path, vocab_path)
+                print(f">>> Structured keyword bank: {len(bank.records)} unique keywords "
+                      f"-> {Path(output_path).with_suffix('.jsonl').name}")
+            except (OSError, ValueError) as e:
+                print(f">>> Warning: Could not write the structured keyword bank: {e}")
             
             print("\n>>> Phase 2 Generation Complete!")
             print(f">>> Generated file: {output_path}")
@@ -294,6 +362,16 @@ Generate the complete `keywords_bank_expansion_[timestamp].md` file now.
             print(f"\n>>> Phase 2 generation failed: {str(e)}")
             raise
 
+def run(project: Optional[str] = None, config: Optional[Dict] = None) -> Optional[str]:
+    """Run Phase 2 keyword expansion for one project (Agent 0b calls this in-process).
+
+    Returns the output path, or None on failure.
+    """
+    try:
+        return KeywordsBankPhase2Generator(project=project, config=config).run()
+    except Exception:
+        return None
+
 if __name__ == "__main__":
     generator = KeywordsBankPhase2Generator()
     generator.run()
\ No newline at end of file
@@ -7,19 +7,23 @@ Agent 0b will pause the pipeline here for quality control.
 """
 
 import json
-import os
 import sys
-import subprocess
-from datetime import datetime
 from pathlib import Path
 
-def get_project_paths(config_file="config.json"):
-    """Get project-specific paths from configuration"""
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import generate_phase1
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "shared"))
+from project_context import resolve_project
+
+def get_project_paths(config_file="config.json", project=None):
+    """Get project-specific paths (explicit project, else --project / PIPELINE_PROJECT, else current_project from configuration)"""
     config_path = Path(__file__).parent.parent / config_file
     try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-        project = config.get("current_project", None)
+        if project is None:
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+            project = resolve_project(config, Path(__file__).resolve().parent.parent)
         
         if project:
             # New project-based structure
@@ -63,49 +67,27 @@ def check_required_inputs(input_dir):
     
     return available_files
 
-def run_phase1_generation():
-    """Run Phase 1 keywords generation"""
-    try:
-        print("Running Keywords Bank Phase 1: Vocabulary Generation...")
-        
-        # Change to agent directory (required for phase1 script)
-        original_cwd = os.getcwd()
-        agent_dir = Path(__file__).parent.parent
-        os.chdir(agent_dir)
-        
-        # Run Phase 1 script
-        result = subprocess.run([sys.executable, "scripts/generate_phase1.py"], 
-                              capture_output=True, text=True, timeout=300)
-        
-        os.chdir(original_cwd)
-        
-        if result.returncode == 0:
-            print("Keywords Bank Phase 1 completed successfully")
-            # Show last part of output (avoid too much noise)
-            if result.stdout:
-                lines = result.stdout.strip().split('\n')
-                for line in lines[-5:]:  # Show last 5 lines
-                    if line.strip():
-                        print(f"   {line}")
-            return True
-        else:
-            print(f"Keywords Bank Phase 1 failed")
-            print(f"Error: {result.stderr}")
-            return False
-            
-    except subprocess.TimeoutExpired:
-        print("Keywords Bank Phase 1 timed out after 5 minutes")
-        return False
-    except Exception as e:
-        print(f"Error running Keywords Bank Phase 1: {e}")
-        return False
+def run_phase1_generation(project=None, config=None):
+    """Run Phase 1 keywords generation in this process"""
+    print("Running Keywords Bank Phase 1: Vocabulary Generation...")
+    
+    output_path = generate_phase1.run(project=project, config=config)
+    if output_path:
+        print("Keywords Bank Phase 1 completed successfully")
+        return output_path
+    
+    print(f"Keywords Bank Phase 1 failed")
+    return None
 
-def main():
-    """Main execution function"""
+def run(project=None, config=None):
+    """Run Keywords Phase 1 for one project (Agent 0b calls this in-process)
+
+    Returns the vocabulary output path, or None on failure.
+    """
     print("Keywords Bank Generator (Phase 1) Starting...")
     
     # Get project-aware paths
-    paths = get_project_paths()
+    paths = get_project_paths(project=project)
     input_dir = paths["input_dir"]
     output_dir = paths["output_dir"]
     
@@ -115,23 +97,18 @@ def main():
     if not available_files:
         print(f"No input files found in {input_dir}")
         print("Required: Message house, brand personas, and/or customer personas")
-        sys.exit(1)
+        return None
     
     print(f"Found {len(available_files)} input files:")
     for description, file_path in available_files:
         print(f"  - {description}: {file_path.name}")
     
     # Run Phase 1 generation
-    success = run_phase1_generation()
+    output_path = run_phase1_generation(project=project, config=config)
     
-    if success:
-        # Find the generated Phase 1 output
-        vocab_files = list(output_dir.glob("keywords_bank_vocabulary*.md"))
-        
-        if vocab_files:
-            latest_vocab = max(vocab_files, key=lambda f: f.stat().st_mtime)
-            print(f"\nPhase 1 output generated: {latest_vocab.name}")
-            print(f"Location: {output_dir}")
+    if output_path:
+        print(f"\nPhase 1 output generated: {Path(output_path).name}")
+        print(f"Location: {output_dir}")
         
         print(f"""
 PIPELINE PAUSE: Keywords Bank Phase 1 Complete
@@ -151,6 +128,13 @@ WARNING: DO NOT SKIP EVALUATION - This is the quality control gate!
         
     else:
         print("Keywords Bank Phase 1 generation failed")
+        return None
+    
+    return output_path
+
+def main():
+    """Main execution function"""
+    if not run():
         sys.exit(1)
 
 if __name__ == "__main__":
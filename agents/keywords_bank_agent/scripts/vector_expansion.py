@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Keywords Bank Agent - Phase 2: Per-Vector Expansion (No external dependencies)
+
+Fan-out mode for generate_phase2.py. Instead of one 8,000-token call
+producing every vector, each vector of the output structure in
+system_prompt_phase2.md gets its own request, all running concurrently:
+
+1. The system prompt and the approved vocabulary with its context files
+   form the shared system prefix (prompt-cache breakpoint after each), so
+   every vector request re-reads the same cached input.
+2. The user message asks for that vector's section only, with a smaller
+   max_tokens budget.
+3. A vector cut off at max_tokens is retried alone with twice the budget.
+4. The sections are merged, in order, into the usual
+   keywords_bank_expansion_*.md layout.
+
+Wall-clock time is that of the slowest vector instead of the whole bank.
+Config: "vector_fan_out": {"enabled": true, "max_tokens": 2500, "workers": 7, "retries": 1}
+"""
+
+import concurrent.futures
+import re
+
+from llm_client import extract_text, get_client, system_blocks
+
+DEFAULT_VECTOR_MAX_TOKENS = 2500
+DEFAULT_RETRIES = 1
+
+SEO_GROUP = ("## **A. SEO & Search-Focused Keywords**",
+             "*[Optimized for search engines and discovery - feeds into Agent 9: Website Copy]*")
+CREATIVE_GROUP = ("## **B. Creative & Copywriting-Focused Concepts**",
+                  "*[Optimized for persuasion and engagement - feeds into Agents 7 & 8: Testimonials & Social Media]*")
+
+# (letter, title, target, group) in output order, as in system_prompt_phase2.md
+VECTORS = (
+    ("A", "Question-Based Keywords", "20+ variations", SEO_GROUP),
+    ("B", "Modifier-Based Keywords", "30+ variations", SEO_GROUP),
+    ("C", "Intent-Based Keywords", "40+ variations", SEO_GROUP),
+    ("D", "Persona Quote Starters", "25+ variations", CREATIVE_GROUP),
+    ("E", "Social Media Hooks & Hashtags", "20+ variations", CREATIVE_GROUP),
+    ("F", "Feature-to-Benefit Angles", "30+ variations", CREATIVE_GROUP),
+    ("G", "Customer Voice Patterns", "30+ patterns", CREATIVE_GROUP),
+)
+
+VECTOR_INSTRUCTION = """## GENERATION INSTRUCTION
+
+Based on the APPROVED Phase 1 vocabulary above, generate ONLY the section
+"Vector {letter}: {title}" ({target}) of the output structure in the system prompt,
+with all of its sub-categories. This request is one of {count} run in parallel, one per vector,
+so do not write the other vectors, the document title or the group headings.
+
+Start with the line: ### **Vector {letter}: {title}** ({target})
+"""
+
+_VECTOR_HEADING = re.compile(r"^#{1,4}\s*\**\s*Vector\s+([A-Z])\b", re.IGNORECASE)
+_TOP_HEADING = re.compile(r"^#{1,2}\s")
+
+
+def vector_heading(letter, title, target):
+    return f"### **Vector {letter}: {title}** ({target})"
+
+
+def extract_section(text, letter, title, target):
+    """The vector's section from a response, under the canonical heading
+
+    Anything before the vector's heading, and from the next vector or group
+    heading on, is dropped; without a heading the whole response is used.
+    """
+    lines = text.strip().splitlines()
+    headings = [(i, _VECTOR_HEADING.match(line)) for i, line in enumerate(lines)]
+    start = next((i for i, match in headings if match and match.group(1).upper() == letter), None)
+    if start is None:
+        body = lines
+    else:
+        body = lines[start + 1:]
+        for i, line in enumerate(body):
+            if _VECTOR_HEADING.match(line) or _TOP_HEADING.match(line):
+                body = body[:i]
+                break
+    return "\n".join([vector_heading(letter, title, target), *body]).strip()
+
+
+def merge_sections(sections, brand_name):
+    """Vector sections (in VECTORS order) as one keywords_bank_expansion document"""
+    parts = [f"# **Keyword Expansion Engine Output: {brand_name}**"]
+    group = None
+    for (_, _, _, vector_group), section in zip(VECTORS, sections):
+        if vector_group is not group:
+            group = vector_group
+            parts.append("\n".join(group))
+        parts.append(section)
+    return "\n\n".join(parts) + "\n"
+
+
+class VectorExpander:
+    """Runs one expansion request per vector for a generation run"""
+
+    def __init__(self, config):
+        settings = config.get('vector_fan_out', {})
+        self.config = config
+        self.max_tokens = settings.get('max_tokens', DEFAULT_VECTOR_MAX_TOKENS)
+        self.retries = max(0, int(settings.get('retries', DEFAULT_RETRIES)))
+        self.workers = max(1, int(settings.get('workers', len(VECTORS))))
+
+    def _generate_vector(self, system, vector):
+        """Section text of one vector; retried alone with a doubled budget while truncated"""
+        letter, title, target, _ = vector
+        prompt = VECTOR_INSTRUCTION.format(letter=letter, title=title, target=target, count=len(VECTORS))
+        max_tokens = self.max_tokens
+        for attempt in range(self.retries + 1):
+            response_data = get_client(self.config).create_message(
+                [{"role": "user", "content": prompt}],
+                system=system,
+                agent="keywords_bank",
+                model=self.config.get("model", "claude-3-5-sonnet-20241022"),
+                max_tokens=max_tokens,
+                temperature=self.config.get("temperature", 0.7)
+            )
+            text = extract_text(response_data)
+            if text is None:
+                raise ValueError(f"Unexpected API response format for Vector {letter}")
+            if response_data.get("stop_reason") != "max_tokens":
+                break
+            if attempt < self.retries:
+                max_tokens *= 2
+                print(f">>> Vector {letter} truncated - retrying alone with max_tokens={max_tokens}")
+            else:
+                print(f">>> Warning: Vector {letter} still truncated at max_tokens={max_tokens}")
+        print(f">>> Vector {letter} ({title}) generated")
+        return extract_section(text, letter, title, target)
+
+    def expand(self, system_prompt, shared_input, brand_name):
+        """Generate every vector concurrently and return the merged expansion document"""
+        system = system_blocks(system_prompt, shared_input)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(self._generate_vector, system, vector) for vector in VECTORS]
+            sections = [future.result() for future in futures]
+        return merge_sections(sections, brand_name)
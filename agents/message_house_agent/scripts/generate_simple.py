@@ -9,11 +9,18 @@ then uses Claude API to generate a professional message house document.
 import json
 import os
 import sys
-import urllib.request
-import urllib.parse
 from datetime import datetime
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "shared"))
+from example_index import ExampleIndex
+from llm_client import call_claude_api, system_blocks
+from project_context import resolve_project
+from run_trace import trace_span
+
+# Bump the version when render_example() changes so cached fragments are re-rendered
+EXAMPLE_RENDERER = "message_house_example:v1"
+
 def load_config():
     """Load configuration from config.json"""
     config_path = Path(__file__).parent.parent / "config.json"
@@ -40,39 +47,21 @@ def load_file(file_path):
         print(f"Error reading {file_path}: {e}")
         return None
 
-def load_example_from_json():
-    """Load ALL examples from labeled JSON for system prompt (Example Map)"""
-    example_folder = Path(__file__).parent.parent / "5_labeled_json"
-    
-    try:
-        # Get all JSON files in the folder
-        json_files = list(example_folder.glob("*.json"))
+def render_example(example_data):
+    """Render one labeled message house as an Example Map block (None if not high-quality)"""
+    # Only use high-quality examples with actual content
+    overall_score = example_data.get('overall_score', 0)
+    if overall_score >= 8.0 and 'message_house_content' in example_data:
+        content = example_data['message_house_content']
         
-        if not json_files:
-            print("Warning: No example files found in 5_labeled_json folder")
-            return "No examples available."
+        # Get improvement insights from detailed scores
+        insights = []
+        if 'detailed_scores' in example_data:
+            for criteria, details in example_data['detailed_scores'].items():
+                if isinstance(details, dict) and 'comments' in details:
+                    insights.append(f"- {criteria.replace('_', ' ').title()}: {details['comments']}")
         
-        examples_text = []
-        print(f"Loading {len(json_files)} evaluation files for example map...")
-        
-        for json_file in json_files:
-            try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    example_data = json.load(f)
-                
-                # Only use high-quality examples with actual content
-                overall_score = example_data.get('overall_score', 0)
-                if overall_score >= 8.0 and 'message_house_content' in example_data:
-                    content = example_data['message_house_content']
-                    
-                    # Get improvement insights from detailed scores
-                    insights = []
-                    if 'detailed_scores' in example_data:
-                        for criteria, details in example_data['detailed_scores'].items():
-                            if isinstance(details, dict) and 'comments' in details:
-                                insights.append(f"- {criteria.replace('_', ' ').title()}: {details['comments']}")
-                    
-                    example_text = f"""
+        example_text = f"""
 **HIGH-QUALITY EXAMPLE (Score: {overall_score}/10):**
 
 ### **{content['brand_name']}: Official Message House**
@@ -108,16 +97,43 @@ This document is the single source of truth for all marketing, sales, and produc
 **Why this scored {overall_score}/10:**
 {chr(10).join(insights) if insights else "High-quality strategic messaging and positioning"}
 """
+        return example_text
+    return None
+
+def load_example_from_json():
+    """Load the top-scoring examples from labeled JSON for system prompt (Example Map)"""
+    example_folder = Path(__file__).parent.parent / "5_labeled_json"
+    
+    try:
+        # Scores come from the Example Map index - only the selected files are opened
+        index = ExampleIndex(example_folder)
+        total_files = index.count()
+        
+        if not total_files:
+            print("Warning: No example files found in 5_labeled_json folder")
+            return "No examples available."
+        
+        top_examples = index.top_examples('message_house_content', min_score=8.0, limit=3)
+        high_quality_count = index.count('message_house_content', min_score=8.0)
+        examples_text = []
+        print(f"Loading {len(top_examples)} of {total_files} indexed evaluation files for example map...")
+        
+        for entry in top_examples:
+            try:
+                # Rendered text is cached per file until the file changes
+                example_text = index.render(entry['path'], EXAMPLE_RENDERER, render_example)
+                if example_text:
                     examples_text.append(example_text)
                     
             except Exception as e:
-                print(f"Warning: Could not parse {json_file.name}: {e}")
+                print(f"Warning: Could not parse {entry['path'].name}: {e}")
                 continue
         
         if not examples_text:
-            # Fallback to any available file if no high-quality examples found
+            # Fallback to the best available file if no high-quality examples found
             try:
-                with open(json_files[0], 'r', encoding='utf-8') as f:
+                fallback = index.top_examples('message_house_content', limit=1)
+                with open(fallback[0]['path'], 'r', encoding='utf-8') as f:
                     example_data = json.load(f)
                 if 'message_house_content' in example_data:
                     content = example_data['message_house_content']
@@ -139,7 +155,7 @@ This document is the single source of truth for all marketing, sales, and produc
         
         # Combine all high-quality examples (limit to top 3)
         combined_examples = "\n\n" + "="*60 + "\n\n".join(examples_text[:3])
-        print(f"Loaded {len(examples_text)} high-quality examples (8.0+ score) for learning")
+        print(f"Loaded {len(examples_text)} of {high_quality_count} high-quality examples (8.0+ score) for learning")
         
         return combined_examples
         
@@ -147,66 +163,11 @@ This document is the single source of truth for all marketing, sales, and produc
         print(f"Warning: Could not load examples from folder: {e}")
         return "No examples available."
 
-def call_claude_api(prompt, config):
-    """Call Claude API using urllib"""
-    try:
-        # Prepare the request
-        url = "https://api.anthropic.com/v1/messages"
-        
-        data = {
-            "model": config['model'],
-            "max_tokens": config['max_tokens'],
-            "temperature": config['temperature'],
-            "messages": [
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ]
-        }
-        
-        # Convert to JSON
-        json_data = json.dumps(data).encode('utf-8')
-        
-        # Create request
-        req = urllib.request.Request(url)
-        req.add_header('Content-Type', 'application/json')
-        req.add_header('x-api-key', config['anthropic_api_key'])
-        req.add_header('anthropic-version', '2023-06-01')
-        
-        print("Calling Claude API...")
-        
-        # Make the request
-        with urllib.request.urlopen(req, json_data) as response:
-            response_data = json.loads(response.read().decode('utf-8'))
-            
-        # Extract the content
-        if 'content' in response_data and len(response_data['content']) > 0:
-            return response_data['content'][0]['text']
-        else:
-            print("Error: Unexpected API response format")
-            print("Response:", response_data)
-            return None
-            
-    except urllib.error.HTTPError as e:
-        print(f"HTTP Error: {e.code} - {e.reason}")
-        error_body = e.read().decode('utf-8')
-        print(f"Error details: {error_body}")
-        return None
-    except Exception as e:
-        print(f"Error calling Claude API: {e}")
-        return None
-
 def generate_message_house(qa_content, system_prompt, example, config):
     """Generate message house using Claude API"""
-    # Construct the full prompt
+    # The system prompt and example are identical across runs, so they go in
+    # prompt-cached system blocks; only the inputs below change per call
     full_prompt = f"""
-{system_prompt}
-
-{example}
-
----
-
 **INPUT Q&A TO TRANSFORM:**
 
 {qa_content}
@@ -231,7 +192,7 @@ Transform the above Q&A into a complete message house following the EXACT struct
 Generate the message house now following this EXACT structure:
 """
 
-    return call_claude_api(full_prompt, config)
+    return call_claude_api(full_prompt, config, system=system_blocks(system_prompt, example), agent="message_house")
 
 def save_output(content, output_dir):
     """Save generated content to unlabeled folder"""
@@ -251,13 +212,14 @@ def save_output(content, output_dir):
         print(f"Error saving output: {e}")
         return None
 
-def get_project_paths(config_file="config.json"):
-    """Get project-specific paths from configuration"""
+def get_project_paths(config_file="config.json", project=None):
+    """Get project-specific paths (explicit project, else --project / PIPELINE_PROJECT, else current_project from configuration)"""
     config_path = Path(__file__).parent.parent / config_file
     try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-        project = config.get("current_project", None)
+        if project is None:
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+            project = resolve_project(config, Path(__file__).resolve().parent.parent)
         
         if project:
             # New project-based structure
@@ -281,12 +243,15 @@ def get_project_paths(config_file="config.json"):
             "output_dir": Path(__file__).parent.parent / "3_unlabeled"
         }
 
-def main():
-    """Main execution function"""
+def run(project=None, config=None):
+    """Generate a message house for one project (Agent 0b calls this in-process)
+
+    Returns the output path, or None on failure.
+    """
     print("Message House Generator Starting...")
     
     # Get project-aware paths
-    paths = get_project_paths()
+    paths = get_project_paths(project=project)
     input_dir = paths["input_dir"]
     system_assets_dir = paths["system_assets_dir"]
     output_dir = paths["output_dir"]
@@ -299,7 +264,7 @@ def main():
         for d in input_dir.parent.iterdir():
             if d.is_dir():
                 print(f"  - {d.name}")
-        sys.exit(1)
+        return None
     
     # Use the first markdown file found (or most recent)
     input_file = max(input_files, key=lambda f: f.stat().st_mtime)
@@ -310,33 +275,35 @@ def main():
     
     # Load configuration
     print("Loading configuration...")
-    config = load_config()
+    if config is None:
+        config = load_config()
     
     # Load input files
     print("Loading input Q&A...")
     qa_content = load_file(input_file)
     if not qa_content:
-        sys.exit(1)
+        return None
     
     print("Loading system prompt...")
     system_prompt = load_file(system_prompt_file)
     if not system_prompt:
-        sys.exit(1)
+        return None
     
     print("Loading example...")
-    example = load_example_from_json()
+    with trace_span("examples"):
+        example = load_example_from_json()
     
     # Generate message house
     print("Generating message house...")
     generated_content = generate_message_house(qa_content, system_prompt, example, config)
     if not generated_content:
-        sys.exit(1)
+        return None
     
     # Save output
     print("Saving output...")
     output_path = save_output(generated_content, output_dir)
     if not output_path:
-        sys.exit(1)
+        return None
     
     print(f"""
 SUCCESS! Message house generated successfully.
@@ -350,6 +317,13 @@ Next steps:
 2. Evaluate and score it (manual process)
 3. Move to 4_labeled_md/ and 5_labeled_json/ when reviewed
 """)
+    
+    return output_path
+
+def main():
+    """Main execution function"""
+    if not run():
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Example Map Index (No external dependencies)
+
+SQLite index over an agent's 5_labeled_json/ folder. Generators ask it for
+their top-k examples by score and only open those files, instead of parsing
+every evaluation on every run.
+
+- One row per labeled file: document id, agent, project, score, tags, the
+  *_content keys it carries, file mtime and size
+- Evaluators call record_example() right after saving, so new labels are
+  indexed immediately
+- sync() picks up files added, changed or removed by hand. It stats every
+  file (cheap next to opening it) and re-reads only those whose mtime/size
+  changed, so files edited in place are picked up too. Each ExampleIndex
+  runs it once, before its first query; create a new instance (or call
+  sync()) to see later edits
+- render() caches the prompt text rendered from each file (in memory for
+  the process and in the index database across runs) until the file's
+  mtime/size or the renderer version changes
+
+The index lives in 5_labeled_json/.index/ and can be deleted at any time;
+it is rebuilt from the JSON files on the next run.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from pathlib import Path
+
+INDEX_DIRNAME = ".index"
+INDEX_FILENAME = "examples.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS examples (
+    file_name TEXT PRIMARY KEY,
+    document_id TEXT NOT NULL,
+    agent TEXT NOT NULL,
+    project TEXT,
+    score REAL NOT NULL,
+    tags TEXT NOT NULL DEFAULT '[]',
+    content_keys TEXT NOT NULL DEFAULT '[]',
+    evaluation_date TEXT,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS examples_by_score ON examples (score DESC);
+CREATE TABLE IF NOT EXISTS rendered_examples (
+    file_name TEXT NOT NULL,
+    renderer TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (file_name, renderer)
+);
+"""
+
+# Rendered fragments already used by this process: {(path, renderer): ((mtime_ns, size), text)}
+_rendered = {}
+_rendered_lock = threading.Lock()
+
+
+def extract_entry(data, file_name):
+    """Pull the indexed fields out of one labeled evaluation
+
+    Handles both evaluator layouts: flat (overall_score, improvement_tags)
+    and nested (evaluation_metadata, improvement_analysis).
+    """
+    metadata = data.get('evaluation_metadata') or {}
+    score = data.get('overall_score', metadata.get('overall_score', 0))
+    try:
+        score = float(score)
+    except (TypeError, ValueError):
+        score = 0.0
+
+    stem = file_name[:-len(".json")] if file_name.endswith(".json") else file_name
+    document_id = metadata.get('document_id') or stem.removesuffix("_labeled")
+    tags = data.get('improvement_tags') or (data.get('improvement_analysis') or {}).get('tags') or []
+
+    return {
+        "document_id": document_id,
+        "score": score,
+        "tags": json.dumps(list(tags), ensure_ascii=False),
+        "content_keys": json.dumps(sorted(key for key in data if key.endswith("_content"))),
+        "evaluation_date": data.get('evaluation_date') or metadata.get('evaluation_date'),
+    }
+
+
+def _read_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Warning: Could not parse {Path(path).name}: {e}")
+        return None
+    return data if isinstance(data, dict) else None
+
+
+class ExampleIndex:
+    """Score-ordered index of one agent's labeled evaluations"""
+
+    def __init__(self, labeled_dir, agent=None):
+        self.labeled_dir = Path(labeled_dir)
+        self.agent = agent or self.labeled_dir.resolve().parent.name
+        self.path = self.labeled_dir / INDEX_DIRNAME / INDEX_FILENAME
+        self._lock = threading.Lock()
+        self._synced = False
+
+    def _connect(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.executescript(SCHEMA)
+        return conn
+
+    def _upsert(self, conn, file_name, data, stat, project=None):
+        entry = extract_entry(data, file_name)
+        conn.execute(
+            """
+            INSERT INTO examples (file_name, document_id, agent, project, score, tags,
+                                  content_keys, evaluation_date, mtime_ns, size)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (file_name) DO UPDATE SET
+                document_id = excluded.document_id,
+                agent = excluded.agent,
+                project = COALESCE(excluded.project, examples.project),
+                score = excluded.score,
+                tags = excluded.tags,
+                content_keys = excluded.content_keys,
+                evaluation_date = excluded.evaluation_date,
+                mtime_ns = excluded.mtime_ns,
+                size = excluded.size
+            """,
+            (file_name, entry["document_id"], self.agent, project, entry["score"], entry["tags"],
+             entry["content_keys"], entry["evaluation_date"], stat.st_mtime_ns, stat.st_size),
+        )
+
+    def record(self, file_path, data=None, project=None):
+        """Index (or re-index) one labeled file; data saves re-reading what was just written"""
+        file_path = Path(file_path)
+        if data is None:
+            data = _read_json(file_path)
+            if data is None:
+                return
+        stat = file_path.stat()
+        with self._lock, closing(self._connect()) as conn, conn:
+            self._upsert(conn, file_path.name, data, stat, project)
+
+    def sync(self, full=False):
+        """Bring the index up to date with the folder; returns the number of files (re)read
+
+        Files whose mtime and size match the index are not opened, unless
+        full=True re-reads every file.
+        """
+        if not self.labeled_dir.is_dir():
+            return 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, closing(self._connect()) as conn, conn:
+            known = {
+                r["file_name"]: (r["mtime_ns"], r["size"])
+                for r in conn.execute("SELECT file_name, mtime_ns, size FROM examples")
+            }
+            seen = set()
+            updated = 0
+            with os.scandir(self.labeled_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".json") or not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                    seen.add(entry.name)
+                    if not full and known.get(entry.name) == (stat.st_mtime_ns, stat.st_size):
+                        continue
+                    data = _read_json(entry.path)
+                    if data is None:
+                        seen.discard(entry.name)
+                        continue
+                    self._upsert(conn, entry.name, data, stat)
+                    updated += 1
+
+            removed = [(name,) for name in known if name not in seen]
+            conn.executemany("DELETE FROM examples WHERE file_name = ?", removed)
+            conn.executemany("DELETE FROM rendered_examples WHERE file_name = ?", removed)
+        self._synced = True
+        return updated
+
+    def _sync_once(self):
+        """Sync before this instance's first query, so a load that asks several questions scans the folder once"""
+        if not self._synced:
+            self.sync()
+
+    def _where(self, content_key=None, min_score=None, project=None):
+        clauses, params = [], []
+        if content_key:
+            clauses.append("instr(content_keys, ?) > 0")
+            params.append(json.dumps(content_key))
+        if min_score is not None:
+            clauses.append("score >= ?")
+            params.append(min_score)
+        if project:
+            clauses.append("project = ?")
+            params.append(project)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def top_examples(self, content_key=None, min_score=None, limit=3, project=None):
+        """Return up to `limit` entries, best score first, without opening any JSON file
+
+        Each entry is a dict with path, document_id, project, score, tags and
+        evaluation_date. content_key keeps only evaluations that carry it.
+        """
+        self._sync_once()
+        where, params = self._where(content_key, min_score, project)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT * FROM examples" + where +
+                " ORDER BY score DESC, evaluation_date DESC, file_name LIMIT ?",
+                params + [int(limit)],
+            ).fetchall()
+
+        return [
+            {
+                "path": self.labeled_dir / row["file_name"],
+                "document_id": row["document_id"],
+                "project": row["project"],
+                "score": row["score"],
+                "tags": json.loads(row["tags"]),
+                "evaluation_date": row["evaluation_date"],
+            }
+            for row in rows
+        ]
+
+    def count(self, content_key=None, min_score=None, project=None):
+        """Number of indexed evaluations matching the filters"""
+        self._sync_once()
+        where, params = self._where(content_key, min_score, project)
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM examples" + where, params).fetchone()[0]
+
+    def render(self, file_path, renderer, render_fn):
+        """Return render_fn(data) for one labeled file, cached until the file changes
+
+        renderer names the template and should carry a version (for example
+        "message_house_example:v1") so template edits invalidate old text.
+        Returns None, uncached, when render_fn rejects the file.
+        """
+        file_path = Path(file_path)
+        stat = file_path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        memory_key = (str(file_path.resolve()), renderer)
+
+        with _rendered_lock:
+            cached = _rendered.get(memory_key)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT mtime_ns, size, text FROM rendered_examples WHERE file_name = ? AND renderer = ?",
+                (file_path.name, renderer),
+            ).fetchone()
+
+        if row and (row["mtime_ns"], row["size"]) == signature:
+            text = row["text"]
+        else:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                text = render_fn(json.load(f))
+            if text is None:
+                return None
+            with self._lock, closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO rendered_examples (file_name, renderer, mtime_ns, size, text) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (file_path.name, renderer, signature[0], signature[1], text),
+                )
+
+        with _rendered_lock:
+            _rendered[memory_key] = (signature, text)
+        return text
+
+
+def record_example(file_path, data=None, project=None):
+    """Index one labeled file right after an evaluator saved it"""
+    file_path = Path(file_path)
+    ExampleIndex(file_path.parent).record(file_path, data=data, project=project)
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Structured Keyword Bank (No external dependencies)
+
+The keywords agent writes its banks as markdown. This module turns a
+keywords_bank_expansion_*.md file into records that downstream agents can
+query instead of pasting all 150+ keywords into their prompts:
+
+    {"id": 0, "keyword": "How to validate consumer insights faster?",
+     "key": "how to validat consumer insight faster", "vector": "A", "vectors": ["A"],
+     "vector_name": "Question-Based Keywords", "category": "How-to Questions",
+     "intent": "search", "source_theme": "Research Methodologies", "persona": null}
+
+- key: lowercase, punctuation-free, lightly stemmed form used for dedupe
+  ("Rapid Validations" and "rapid validation" are one keyword; hashtags
+  stay separate from phrases). A keyword found in several vectors is kept
+  once, with every vector in "vectors"
+- intent: "search" for the SEO vectors (A-C), "creative" for the others
+- source_theme / persona: the approved vocabulary theme sharing the most
+  stems with the keyword, and its audience when it comes from an audience
+  or persona section (customer voice vectors D and G default to "customer")
+
+The bank is saved next to the markdown as {name}.jsonl: one record per
+line, then one {"type": "index"} line holding the inverted index (stem ->
+record ids, vector -> record ids). load_keyword_bank() reads it, or parses
+the markdown when no .jsonl exists.
+
+    bank = load_keyword_bank(keywords_file)
+    text = bank.render(bank.select(vectors=("D", "F"), query=persona_text, per_vector=15))
+
+Downstream agents use keywords_for_prompt(): with "keyword_slices":
+{"enabled": true} in their config.json (optionally "vectors" and
+"per_vector") only their vectors' keywords most related to their other
+inputs go into the prompt; otherwise the whole markdown does.
+"""
+
+import json
+import os
+import re
+import uuid
+from pathlib import Path
+
+INDEX_VERSION = 1
+DEFAULT_PER_VECTOR = 20
+SEARCH_VECTORS = ("A", "B", "C")
+CUSTOMER_VOICE_VECTORS = ("D", "G")
+
+STOPWORDS = frozenset("""
+a an and are as at be by can do does for from how i in into is it its my of on or our so that the this
+to us we what when where which who why will with you your
+""".split())
+
+_VECTOR_HEADING = re.compile(r"^(#{1,4})\s*\**\s*Vector\s+([A-Z])\b\s*[:.\-]?\s*(.*)$", re.IGNORECASE)
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+_LIST_MARKER = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+")
+_LABEL = re.compile(r"^\*\*(.+?)\*\*\s*:\s*(.*)$|^\*\*(.+?):\*\*\s*(.*)$")
+_QUOTED_OR_PLAIN = re.compile(r'"[^"]+"|“[^”]+”|[^"“”]+')
+_SEPARATORS = re.compile(r"\s*(?:[,;|]|→|->)\s*")
+_CAMEL = re.compile(r"(?<=[a-z])(?=[A-Z])")
+
+
+def stem(token):
+    """Light suffix stripping so plural and tense variants share one form"""
+    if len(token) <= 3 or token.isdigit():
+        return token
+    for suffix, replacement in (("ies", "y"), ("sses", "ss"), ("ing", ""), ("ed", ""), ("es", ""), ("s", "")):
+        if not token.endswith(suffix) or len(token) - len(suffix) < 3:
+            continue
+        if suffix == "s" and token.endswith(("ss", "us", "is")):
+            break
+        if suffix == "es" and not token[:-2].endswith(("s", "x", "z", "ch", "sh")):
+            continue
+        token = token[:-len(suffix)] + replacement
+        break
+    if len(token) > 4 and token.endswith("e"):
+        token = token[:-1]
+    return token
+
+
+def tokens(text):
+    """Lowercase word tokens (camelCase hashtags split into words)"""
+    return re.findall(r"[a-z0-9]+", _CAMEL.sub(" ", text).lower())
+
+
+def stems(text, keep_stopwords=False):
+    return [stem(token) for token in tokens(text) if keep_stopwords or token not in STOPWORDS]
+
+
+def normalize(keyword):
+    """Dedupe key: stemmed tokens, with a leading # kept for hashtags"""
+    key = " ".join(stems(keyword, keep_stopwords=True))
+    return "#" + key if keyword.lstrip().startswith("#") else key
+
+
+def clean_text(text):
+    """Markdown bold/italics, numbering and surrounding quotes removed"""
+    text = _LIST_MARKER.sub("", text).replace("**", "").strip()
+    text = text.strip("*_ ").strip()
+    if len(text) > 1 and text[0] in "\"'“" and text[-1] in "\"'”":
+        text = text[1:-1].strip()
+    return text
+
+
+def split_items(text):
+    """Keywords of a "Label: a, b, c" line (quoted phrases are kept whole)"""
+    items = []
+    for part in _QUOTED_OR_PLAIN.findall(text):
+        if part[0] in '"“':
+            items.append(part[1:-1].strip())
+        else:
+            items.extend(clean_text(item) for item in _SEPARATORS.split(part))
+    return [item for item in items if item]
+
+
+def parse_markdown(text):
+    """[(keyword, vector, vector_name, section, category)] from a vocabulary or expansion file
+
+    section is the nearest level-1/2 heading (group or vocabulary theme),
+    category the nearest deeper heading or "**Label**:" line.
+    """
+    entries = []
+    vector = vector_name = vector_level = None
+    section = category = None
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line or line.startswith(("```", "*[", ">")) or (line.startswith("[") and line.endswith("]")):
+            continue
+
+        match = _VECTOR_HEADING.match(line)
+        if match:
+            vector, vector_level = match.group(2).upper(), len(match.group(1))
+            vector_name = re.sub(r"\s*\(.*?\)\s*$", "", match.group(3).replace("*", "")).strip() or None
+            category = None
+            continue
+
+        match = _HEADING.match(line)
+        if match:
+            level, heading = len(match.group(1)), clean_text(match.group(2))
+            if vector_level is not None and level <= vector_level:
+                vector = vector_name = vector_level = None
+            if level == 1:
+                section = category = None
+            elif level == 2:
+                section, category = re.sub(r"^[\dA-Z]+\.\s*", "", heading), None
+            else:
+                category = re.sub(r"^\d+\.\s*", "", heading)
+            continue
+
+        if re.match(r"^[*_][^*\s]", line) or re.search(r"\[[^\]]*\]", line):
+            # Italic notes and unfilled template placeholders
+            continue
+
+        listed = bool(_LIST_MARKER.match(line))
+        content = _LIST_MARKER.sub("", line).strip()
+        match = _LABEL.match(content)
+        if match:
+            label, rest = (match.group(1), match.group(2)) if match.group(1) else (match.group(3), match.group(4))
+            category = clean_text(label)
+            for item in split_items(rest):
+                entries.append((item, vector, vector_name, section, category))
+            continue
+
+        if listed:
+            keyword = clean_text(content)
+            if keyword:
+                entries.append((keyword, vector, vector_name, section, category))
+    return entries
+
+
+class KeywordBank:
+    """Deduplicated keyword records with an inverted index by stem and by vector"""
+
+    def __init__(self, records, source=None, index=None):
+        self.records = records
+        self.source = source
+        if index is not None:
+            self.token_index, self.vector_index = index["tokens"], index["vectors"]
+            return
+        self.token_index = {}
+        self.vector_index = {}
+        for record in records:
+            for token in set(stems(record["keyword"])):
+                self.token_index.setdefault(token, []).append(record["id"])
+            for vector in record["vectors"]:
+                self.vector_index.setdefault(vector, []).append(record["id"])
+
+    @classmethod
+    def from_markdown(cls, expansion_text, vocabulary_text=None, source=None):
+        """Build a bank from an expansion (themes and personas from the vocabulary, if given)"""
+        themes = _vocabulary_themes(vocabulary_text) if vocabulary_text else []
+        records, by_key = [], {}
+        for keyword, vector, vector_name, section, category in parse_markdown(expansion_text):
+            key = normalize(keyword)
+            if not key.strip("#"):
+                continue
+            if key in by_key:
+                record = by_key[key]
+                if vector and vector not in record["vectors"]:
+                    record["vectors"].append(vector)
+                continue
+            source_theme, persona = _match_theme(keyword, themes)
+            record = {
+                "id": len(records),
+                "keyword": keyword,
+                "key": key,
+                "vector": vector,
+                "vectors": [vector] if vector else [],
+                "vector_name": vector_name,
+                "category": category or (section if not vector else None),
+                "intent": None if not vector else ("search" if vector in SEARCH_VECTORS else "creative"),
+                "source_theme": source_theme,
+                "persona": persona or ("customer" if vector in CUSTOMER_VOICE_VECTORS else None),
+            }
+            records.append(record)
+            by_key[key] = record
+        return cls(records, source)
+
+    def save(self, path):
+        """Write the records and the index as JSON lines (atomic replace)"""
+        path = Path(path)
+        temp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        with open(temp, 'w', encoding='utf-8') as f:
+            for record in self.records:
+                f.write(json.dumps(dict(record, type="keyword"), ensure_ascii=False) + "\n")
+            f.write(json.dumps({"type": "index", "version": INDEX_VERSION, "source": self.source,
+                                "tokens": self.token_index, "vectors": self.vector_index}) + "\n")
+        os.replace(temp, path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """Bank saved by save(); the stored index is used unless it is from another version"""
+        records, index = [], None
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                entry = json.loads(line)
+                if entry.pop("type", "keyword") == "keyword":
+                    records.append(entry)
+                else:
+                    index = entry
+        if index is not None and index.get("version") != INDEX_VERSION:
+            index = None
+        return cls(records, index.get("source") if index else None, index)
+
+    def lookup(self, text):
+        """Ids of records sharing a stem with text, most shared stems first"""
+        counts = {}
+        for token in set(stems(text)):
+            for record_id in self.token_index.get(token, []):
+                counts[record_id] = counts.get(record_id, 0) + 1
+        return sorted(counts, key=lambda record_id: (-counts[record_id], record_id))
+
+    def select(self, vectors=None, query=None, per_vector=None):
+        """Records of the given vectors (all if None), ranked by stems shared with query
+
+        per_vector caps each vector's records; without a query, bank order is kept.
+        """
+        if vectors is None:
+            vectors = sorted(self.vector_index)
+        rank = {record_id: position for position, record_id in enumerate(self.lookup(query))} if query else {}
+        selected, seen = [], set()
+        for vector in vectors:
+            ids = sorted(self.vector_index.get(vector, []), key=lambda record_id: (rank.get(record_id, len(rank)),
+                                                                                   record_id))
+            for record_id in ids[:per_vector]:
+                if record_id not in seen:
+                    seen.add(record_id)
+                    selected.append(self.records[record_id])
+        return selected
+
+    def render(self, records):
+        """Markdown of a slice, grouped by vector and category, for a prompt"""
+        lines, heading, category = [], None, None
+        for record in sorted(records, key=lambda r: (r["vector"] or "", r["id"])):
+            if record["vector"] != heading:
+                heading, category = record["vector"], None
+                lines.append(f"\n### Vector {record['vector']}: {record['vector_name'] or ''}".rstrip())
+            if record["category"] and record["category"] != category:
+                category = record["category"]
+                lines.append(f"**{category}**")
+            lines.append(f"- {record['keyword']}")
+        return "\n".join(lines).strip()
+
+
+def _vocabulary_themes(vocabulary_text):
+    """[(theme, persona or None, stems)] of the vocabulary's sections"""
+    themes = {}
+    for keyword, _, _, section, category in parse_markdown(vocabulary_text):
+        theme = category or section
+        if not theme:
+            continue
+        audience = section and re.search(r"audience|persona", section, re.IGNORECASE)
+        entry = themes.setdefault(theme, (theme, category if audience and category else None, set()))
+        entry[2].update(stems(keyword))
+    return list(themes.values())
+
+
+def _match_theme(keyword, themes):
+    """(source_theme, persona) of the vocabulary theme sharing the most stems with keyword"""
+    keyword_stems = set(stems(keyword))
+    best, best_overlap = (None, None), 0
+    for theme, persona, theme_stems in themes:
+        overlap = len(keyword_stems & theme_stems)
+        if overlap > best_overlap:
+            best, best_overlap = (theme, persona), overlap
+    return best
+
+
+def bank_path(markdown_path):
+    """Where the structured bank of a keywords markdown file is kept"""
+    return Path(markdown_path).with_suffix(".jsonl")
+
+
+def write_keyword_bank(expansion_path, vocabulary_path=None):
+    """Build and save the structured bank next to an expansion file; returns the bank"""
+    expansion_path = Path(expansion_path)
+    vocabulary_text = Path(vocabulary_path).read_text(encoding='utf-8') if vocabulary_path else None
+    bank = KeywordBank.from_markdown(expansion_path.read_text(encoding='utf-8'), vocabulary_text,
+                                     source=expansion_path.name)
+    bank.save(bank_path(expansion_path))
+    return bank
+
+
+def load_keyword_bank(markdown_path):
+    """The structured bank of a keywords markdown file: its .jsonl if present, else parsed from the markdown"""
+    path = bank_path(markdown_path)
+    if path.exists():
+        try:
+            return KeywordBank.load(path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Warning: Could not read {path.name}, parsing {Path(markdown_path).name}: {e}")
+    return KeywordBank.from_markdown(Path(markdown_path).read_text(encoding='utf-8'),
+                                     source=Path(markdown_path).name)
+
+
+def keywords_for_prompt(markdown_path, full_text, config, default_vectors, query=None):
+    """Keywords text for an agent's prompt: full_text, or its slice of the bank with "keyword_slices" enabled"""
+    settings = config.get("keyword_slices", {})
+    if not settings.get("enabled", False):
+        return full_text
+    bank = load_keyword_bank(markdown_path)
+    vectors = settings.get("vectors", default_vectors)
+    records = bank.select(vectors, query, settings.get("per_vector", DEFAULT_PER_VECTOR))
+    if not records:
+        print(f"Warning: No keywords for vectors {', '.join(vectors)} - using the full keywords bank")
+        return full_text
+    print(f"Keywords bank slice: {len(records)} of {len(bank.records)} keywords (vectors {', '.join(vectors)})")
+    return bank.render(records)
@@ -0,0 +1,570 @@
+#!/usr/bin/env python3
+"""
+Shared LLM Client (No external dependencies)
+
+Single code path for every agent's Claude API calls. Connections to the API
+are kept alive in a small pool, so repeated calls from the same process reuse
+an open TLS connection instead of paying a new handshake per request.
+Transient failures (429/529/5xx, dropped connections) are retried with
+backoff according to retry_policy.py, and requests are paced by the
+optional RPM/TPM limiter in rate_limiter.py. stream_message() writes long
+generations to disk as they arrive (streaming.py). After
+enable_message_batches(), calls are collected into Message Batches jobs
+instead (message_batches.py).
+
+Static prompt parts (system prompt, rendered examples) go in system_blocks()
+so the API's prompt cache serves them on repeated calls; every call records
+its cache read / write / uncached input tokens per agent (usage_report()).
+When the orchestrator has opened a run trace (run_trace.py), every call is
+also recorded there with its timing, queue wait, attempts and cost.
+
+Usage from an agent script:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "shared"))
+    from llm_client import call_claude_api
+"""
+
+import http.client
+import json
+import queue
+import socket
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+from response_cache import ResponseCache, cache_key
+from message_batches import get_dispatcher
+from rate_limiter import get_rate_limiter
+from retry_policy import RetryPolicy
+from run_trace import record_llm_call
+from streaming import PartialOutput, read_message_stream
+
+DEFAULT_API_URL = "https://api.anthropic.com"
+MESSAGES_PATH = "/v1/messages"
+ANTHROPIC_VERSION = "2023-06-01"
+DEFAULT_POOL_SIZE = 4
+DEFAULT_TIMEOUT = 300
+# Seconds between progress lines while a response streams
+STREAM_PROGRESS_SECONDS = 10
+# The API accepts at most four cache_control breakpoints per request
+MAX_CACHE_BREAKPOINTS = 4
+USAGE_FIELDS = ("input_tokens", "cache_creation_input_tokens", "cache_read_input_tokens", "output_tokens")
+
+# Errors raised when a kept-alive connection was closed by the server while idle
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+
+class APIError(Exception):
+    """Non-2xx response from the Claude API"""
+
+    def __init__(self, status, reason, body, headers=None):
+        super().__init__(f"HTTP Error: {status} - {reason}")
+        self.status = status
+        self.reason = reason
+        self.body = body
+        self.headers = headers or {}
+
+
+class ConnectionPool:
+    """Bounded pool of persistent HTTP(S) connections to a single host"""
+
+    def __init__(self, base_url=DEFAULT_API_URL, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+        parsed = urllib.parse.urlsplit(base_url)
+        self.scheme = parsed.scheme or "https"
+        self.host = parsed.hostname
+        self.port = parsed.port or (443 if self.scheme == "https" else 80)
+        self.base_path = parsed.path.rstrip('/')
+        self.timeout = timeout
+        self.pool_size = max(1, int(pool_size))
+
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.pool_size)
+        self._proxy = self._detect_proxy()
+
+    def _detect_proxy(self):
+        """Honor HTTP(S)_PROXY the same way urllib.request.urlopen did"""
+        proxy = urllib.request.getproxies().get(self.scheme)
+        if not proxy or urllib.request.proxy_bypass(self.host):
+            return None
+        parsed = urllib.parse.urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+        return parsed.hostname, parsed.port or 80
+
+    def _new_connection(self):
+        """Open a fresh connection (through the proxy tunnel if one is configured)"""
+        connection_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        if self._proxy:
+            conn = connection_class(self._proxy[0], self._proxy[1], timeout=self.timeout)
+            conn.set_tunnel(self.host, self.port)
+        else:
+            conn = connection_class(self.host, self.port, timeout=self.timeout)
+        conn.reused = False
+        return conn
+
+    def acquire(self):
+        """Get an idle connection, or open a new one if the pool has a free slot"""
+        self._slots.acquire()
+        try:
+            conn = self._idle.get_nowait()
+            conn.reused = True
+            return conn
+        except queue.Empty:
+            return self._new_connection()
+
+    def release(self, conn, reusable=True):
+        """Return a connection to the pool, closing it if it can't be reused"""
+        if reusable:
+            self._idle.put(conn)
+        else:
+            conn.close()
+        self._slots.release()
+
+    def close(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class LLMClient:
+    """Thread-safe Claude Messages API client built on a shared ConnectionPool"""
+
+    def __init__(self, config, pool=None):
+        self.config = config
+        self.api_key = config.get('anthropic_api_key')
+        self.pool = pool or ConnectionPool(
+            base_url=config.get('api_base_url', DEFAULT_API_URL),
+            pool_size=config.get('connection_pool_size', DEFAULT_POOL_SIZE),
+            timeout=config.get('request_timeout', DEFAULT_TIMEOUT),
+        )
+        self.cache = ResponseCache.from_config(config)
+        self.retry_policy = RetryPolicy.from_config(config)
+        self.rate_limiter = get_rate_limiter(config)
+
+    def _headers(self):
+        return {
+            'Content-Type': 'application/json',
+            'x-api-key': self.api_key or '',
+            'anthropic-version': ANTHROPIC_VERSION,
+        }
+
+    def _open(self, method, path, payload):
+        """Send a JSON request on a pooled connection; returns (conn, response) with the body unread"""
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        url = self.pool.base_path + path
+
+        while True:
+            conn = self.pool.acquire()
+            try:
+                conn.request(method, url, body=body, headers=self._headers())
+                return conn, conn.getresponse()
+            except STALE_CONNECTION_ERRORS:
+                self.pool.release(conn, reusable=False)
+                if conn.reused:
+                    # Server dropped an idle keep-alive connection - retry once on a fresh one
+                    continue
+                raise
+            except (OSError, socket.timeout, http.client.HTTPException):
+                self.pool.release(conn, reusable=False)
+                raise
+
+    def _read_body(self, conn, response):
+        """Read the whole response body, return the connection to the pool and raise on HTTP errors"""
+        try:
+            raw = response.read()
+        except (OSError, socket.timeout, http.client.HTTPException):
+            self.pool.release(conn, reusable=False)
+            raise
+        self.pool.release(conn, reusable=not response.will_close)
+
+        text = raw.decode('utf-8', errors='replace')
+        if response.status >= 400:
+            raise APIError(response.status, response.reason, text, dict(response.getheaders()))
+        return text
+
+    def post_json(self, path, payload, method="POST"):
+        """Send a JSON request over a pooled connection and return the decoded response"""
+        conn, response = self._open(method, path, payload)
+        text = self._read_body(conn, response)
+        return json.loads(text) if text else {}
+
+    def post_stream(self, path, payload, on_text):
+        """POST a streaming request and return the assembled message, passing text deltas to on_text"""
+        conn, response = self._open("POST", path, payload)
+        if response.status >= 400:
+            self._read_body(conn, response)
+
+        try:
+            message = read_message_stream(iter(response.readline, b''), on_text)
+            # Drain the terminating chunk so the connection can be reused
+            response.read()
+        except Exception:
+            self.pool.release(conn, reusable=False)
+            raise
+        self.pool.release(conn, reusable=not response.will_close)
+        return message
+
+    def iter_jsonl(self, path):
+        """GET a JSON Lines resource and yield each decoded line without holding the whole body"""
+        conn, response = self._open("GET", path, None)
+        if response.status >= 400:
+            self._read_body(conn, response)
+
+        completed = False
+        try:
+            for line in iter(response.readline, b''):
+                if line.strip():
+                    yield json.loads(line)
+            # Mark the response complete so the connection can be reused
+            response.read()
+            completed = True
+        finally:
+            # A consumer that raised or stopped early (GeneratorExit) leaves the body unread
+            self.pool.release(conn, reusable=completed and not response.will_close)
+
+    def _send_message(self, data, on_text=None, call=None):
+        """One /v1/messages request (streamed when on_text is given), admitted by the rate limiter
+
+        call, when given, counts the attempt and records when and how long it waited for the limiter.
+        """
+        waited = time.time()
+        reservation = self.rate_limiter.admit(data) if self.rate_limiter else None
+        if call is not None:
+            call["attempts"] += 1
+            call["waits"].append((waited, time.time() - waited))
+        streamed = {"chars": 0}
+
+        def on_delta(text):
+            streamed["chars"] += len(text)
+            on_text(text)
+
+        try:
+            if on_text is None:
+                response_data = self.post_json(MESSAGES_PATH, data)
+            else:
+                response_data = self.post_stream(MESSAGES_PATH, dict(data, stream=True), on_delta)
+        except BaseException:
+            # 429s, 5xx and timeouts must not keep their output reservation while the API is struggling;
+            # a stream that broke midway keeps the part it produced (about 4 characters per token)
+            if self.rate_limiter:
+                self.rate_limiter.release(reservation, streamed["chars"] // 4)
+            raise
+        if self.rate_limiter:
+            self.rate_limiter.settle(reservation, response_data.get('usage'))
+        return response_data
+
+    def _payload(self, messages, system, model, max_tokens, temperature, extra):
+        data = {
+            "model": model or self.config['model'],
+            "max_tokens": max_tokens or self.config['max_tokens'],
+            "temperature": self.config['temperature'] if temperature is None else temperature,
+            "messages": messages,
+        }
+        if system:
+            data["system"] = system
+        data.update(extra)
+        return data
+
+    def _cached(self, data, use_cache):
+        """Return (cache key or None, cached response or None)"""
+        if not use_cache or self.cache is None:
+            return None, None
+        key = cache_key(data)
+        cached = self.cache.get(key)
+        if cached is not None:
+            print(f"Using cached response ({key[:12]})")
+        return key, cached
+
+    def _submit_batch(self, data, call):
+        """Hand one request to the batch dispatcher (counted as an attempt)"""
+        call["attempts"] += 1
+        return get_dispatcher(self, _batch_settings).submit(data)
+
+    def _trace(self, agent, data, call, response_data=None, **fields):
+        """Record the call in the run trace (no-op without an open trace)"""
+        record_llm_call(agent, data['model'], call["started"], (response_data or {}).get('usage'),
+                        attempts=call["attempts"], waits=call["waits"], **fields)
+
+    def _store(self, key, data, response_data):
+        if key is None:
+            return
+        try:
+            self.cache.put(key, data, response_data)
+        except OSError as e:
+            print(f"Warning: Could not write response cache: {e}")
+
+    def create_message(self, messages, system=None, model=None, max_tokens=None, temperature=None,
+                       use_cache=True, agent=None, **extra):
+        """Call /v1/messages and return the full response dict
+
+        Identical requests are answered from the on-disk response cache unless
+        use_cache is False or the run set LLM_CACHE_BYPASS=1. Transient errors
+        are retried; the error of the last attempt is raised. agent labels the
+        call's token usage in usage_report(). After enable_message_batches()
+        the request joins the next batch job and this call blocks until it ends.
+        """
+        data = self._payload(messages, system, model, max_tokens, temperature, extra)
+        call = {"started": time.time(), "attempts": 0, "waits": []}
+        key, cached = self._cached(data, use_cache)
+        if cached is not None:
+            self._trace(agent, data, call, cached, cache_hit=True)
+            return cached
+
+        batch = _batch_settings is not None
+        try:
+            if batch:
+                response_data = self.retry_policy.call(self._submit_batch, data, call)
+            else:
+                response_data = self.retry_policy.call(self._send_message, data, None, call)
+        except Exception as e:
+            self._trace(agent, data, call, batch=batch, error=e)
+            raise
+        record_usage(agent, response_data.get('usage'))
+        self._trace(agent, data, call, response_data, batch=batch)
+        self._store(key, data, response_data)
+        return response_data
+
+    def stream_message(self, messages, output_path, system=None, model=None, max_tokens=None,
+                       temperature=None, use_cache=True, resume=True, agent=None, **extra):
+        """Stream /v1/messages into output_path and return the full response dict
+
+        Text is appended to "<output_path>.partial" as it arrives and the
+        file is renamed to output_path once the message completes (see
+        streaming.py). When a retry follows a stream that broke midway, the
+        request is resumed from the text received so far (assistant prefill)
+        unless resume is False. On failure the .partial file is kept.
+        In batch mode the file is written once the batch result arrives.
+        """
+        data = self._payload(messages, system, model, max_tokens, temperature, extra)
+        call = {"started": time.time(), "attempts": 0, "waits": []}
+        output = PartialOutput(output_path)
+        key, cached = self._cached(data, use_cache)
+        if cached is not None:
+            output.write(extract_text(cached) or '')
+            output.commit()
+            self._trace(agent, data, call, cached, cache_hit=True)
+            return cached
+
+        if _batch_settings is not None:
+            try:
+                response_data = self.retry_policy.call(self._submit_batch, data, call)
+            except Exception as e:
+                output.abandon()
+                self._trace(agent, data, call, batch=True, error=e)
+                raise
+            output.write(extract_text(response_data) or '')
+            output.commit()
+            record_usage(agent, response_data.get('usage'))
+            self._trace(agent, data, call, response_data, batch=True)
+            self._store(key, data, response_data)
+            return response_data
+
+        started = time.monotonic()
+        # tail: whitespace kept in the file after the resume prefill, not yet repeated by the continuation
+        progress = {"chars": 0, "reported": started, "tail": ""}
+
+        def on_text(text):
+            now = time.monotonic()
+            if progress["chars"] == 0:
+                print(f"First tokens after {now - started:.1f}s, streaming to {output.partial_path.name}")
+            progress["chars"] += len(text)
+            if now - progress["reported"] >= STREAM_PROGRESS_SECONDS:
+                print(f"  ... {progress['chars']} characters received ({now - started:.0f}s)")
+                progress["reported"] = now
+            tail = progress["tail"]
+            if tail:
+                # Skip the whitespace the continuation repeats; the file already holds it
+                matched = 0
+                while matched < min(len(text), len(tail)) and text[matched] == tail[matched]:
+                    matched += 1
+                progress["tail"] = tail[matched:] if matched == len(text) else ""
+                text = text[matched:]
+            if text:
+                output.write(text)
+
+        def attempt():
+            # The API rejects prefill that ends in whitespace, so the request resumes from the
+            # trimmed text while the file keeps the whitespace received so far
+            received = output.text if resume else ""
+            prefix = received.rstrip()
+            output.reset(received if prefix else "")
+            progress["tail"] = received[len(prefix):] if prefix else ""
+            request = data
+            if prefix:
+                print(f"Resuming stream after {len(prefix)} characters")
+                request = dict(data, messages=data['messages'] + [{"role": "assistant", "content": prefix}])
+            return self._send_message(request, on_text, call)
+
+        try:
+            response_data = self.retry_policy.call(attempt)
+        except Exception as e:
+            output.abandon()
+            self._trace(agent, data, call, streamed=True, error=e)
+            if output.text:
+                print(f"Partial output kept at: {output.partial_path}")
+            raise
+
+        # After a resume the last response only holds the continuation
+        text = output.text
+        output.commit()
+        response_data['content'] = [{"type": "text", "text": text}]
+        print(f"Streamed {len(text)} characters in {time.monotonic() - started:.1f}s")
+        record_usage(agent, response_data.get('usage'))
+        self._trace(agent, data, call, response_data, streamed=True)
+        self._store(key, data, response_data)
+        return response_data
+
+    def close(self):
+        self.pool.close()
+
+
+def extract_text(response_data):
+    """Return the first text block of a Messages API response, or None"""
+    if 'content' in response_data and len(response_data['content']) > 0:
+        return response_data['content'][0].get('text')
+    return None
+
+
+def system_blocks(*parts):
+    """System prompt as text blocks with a prompt-cache breakpoint after each part
+
+    Pass the stable parts in order (e.g. system prompt, then rendered
+    examples). Each breakpoint caches the prefix up to it, so a changed
+    example still reuses the cached system prompt. Empty parts are skipped.
+    Prefixes shorter than the model's minimum (about 1024 tokens) are simply
+    not cached.
+    """
+    blocks = [{"type": "text", "text": part} for part in parts if part]
+    for block in blocks[-MAX_CACHE_BREAKPOINTS:]:
+        block["cache_control"] = {"type": "ephemeral"}
+    return blocks
+
+
+_usage = {}
+_usage_lock = threading.Lock()
+
+
+def record_usage(agent, usage):
+    """Add one API response's token usage to the agent's totals and print its prompt-cache split"""
+    if not usage:
+        return
+    agent = agent or "unlabeled"
+    with _usage_lock:
+        totals = _usage.setdefault(agent, dict.fromkeys(("calls",) + USAGE_FIELDS, 0))
+        totals["calls"] += 1
+        for field in USAGE_FIELDS:
+            totals[field] += usage.get(field) or 0
+
+    read = usage.get('cache_read_input_tokens') or 0
+    written = usage.get('cache_creation_input_tokens') or 0
+    if read or written:
+        print(f"Prompt cache: {read} tokens read (hit), {written} written (miss), "
+              f"{usage.get('input_tokens') or 0} uncached input tokens")
+
+
+def usage_report():
+    """Token usage per agent for this process: {agent: {calls, input_tokens, cache_*_input_tokens, output_tokens}}"""
+    with _usage_lock:
+        return {agent: dict(totals) for agent, totals in _usage.items()}
+
+
+def print_usage_report():
+    """Print per-agent token usage and prompt-cache hit rates (nothing if no API calls were made)"""
+    report = usage_report()
+    if not report:
+        return
+    print("\nToken usage by agent:")
+    print(f"  {'Agent':<28} {'Calls':>5} {'Cache read':>11} {'Cache write':>12} {'Uncached':>9} {'Output':>8} {'Hit rate':>8}")
+    for agent, totals in sorted(report.items()):
+        prompt_tokens = totals["input_tokens"] + totals["cache_creation_input_tokens"] + totals["cache_read_input_tokens"]
+        hit_rate = totals["cache_read_input_tokens"] / prompt_tokens if prompt_tokens else 0
+        print(f"  {agent:<28} {totals['calls']:>5} {totals['cache_read_input_tokens']:>11} "
+              f"{totals['cache_creation_input_tokens']:>12} {totals['input_tokens']:>9} "
+              f"{totals['output_tokens']:>8} {hit_rate:>8.0%}")
+
+
+_batch_settings = None
+
+
+def enable_message_batches(settings=None):
+    """Send every uncached API call in this process through the Message Batches API
+
+    settings is the optional "message_batches" config section (see
+    message_batches.py). Calls block until their batch result arrives, so
+    this is only meant for unattended runs.
+    """
+    global _batch_settings
+    _batch_settings = dict(settings or {})
+
+
+_clients = {}
+_pools = {}
+_clients_lock = threading.Lock()
+
+# Per-agent config.json settings a client applies to its calls
+CLIENT_SETTINGS = ("model", "max_tokens", "temperature", "response_cache", "retry", "rate_limit")
+
+
+def get_client(config):
+    """Return the process-wide client for this config
+
+    Clients share one connection pool per endpoint / pool size / timeout,
+    but each distinct set of agent settings (model, max_tokens,
+    temperature, cache, retry and rate limits) gets its own client, so
+    agents running in one process never send each other's settings.
+    """
+    transport = (
+        config.get('api_base_url', DEFAULT_API_URL),
+        config.get('connection_pool_size', DEFAULT_POOL_SIZE),
+        config.get('request_timeout', DEFAULT_TIMEOUT),
+    )
+    settings = json.dumps({name: config.get(name) for name in CLIENT_SETTINGS}, sort_keys=True, default=str)
+    key = (config.get('anthropic_api_key'), transport, settings)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            pool = _pools.get(transport)
+            if pool is None:
+                pool = ConnectionPool(*transport)
+                _pools[transport] = pool
+            client = LLMClient(config, pool)
+            _clients[key] = client
+        return client
+
+
+def call_claude_api(prompt, config, system=None, max_tokens=None, agent=None):
+    """Call Claude API with a single user prompt - STANDARD PATTERN
+
+    system may be a string or system_blocks(...) for prompt caching.
+    Returns the generated text, or None on failure (errors are printed).
+    """
+    try:
+        print("Calling Claude API...")
+        response_data = get_client(config).create_message(
+            [{"role": "user", "content": prompt}],
+            system=system,
+            model=config.get('model'),
+            max_tokens=max_tokens or config.get('max_tokens'),
+            temperature=config.get('temperature'),
+            agent=agent,
+        )
+
+        text = extract_text(response_data)
+        if text is None:
+            print("Error: Unexpected API response format")
+            print("Response:", response_data)
+        return text
+
+    except APIError as e:
+        print(f"HTTP Error: {e.status} - {e.reason}")
+        print(f"Error details: {e.body}")
+        return None
+    except Exception as e:
+        print(f"Error calling Claude API: {e}")
+        return None
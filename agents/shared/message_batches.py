@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Message Batches (No external dependencies)
+
+Batch mode for bulk, unattended pipeline runs
+(agent_0b_orchestrator/scripts/run_pipeline_batch.py). Instead of sending
+each request on its own, LLMClient hands it to a process-wide
+BatchDispatcher and the calling agent thread waits for the result:
+
+- Requests from every agent and project running in the process are
+  collected until none has arrived for `collect_seconds` (or
+  `max_collect_seconds` have passed, or the batch is full) and submitted as
+  one /v1/messages/batches job
+- Each job is polled every `poll_interval` seconds. When it ends, its JSONL
+  results are read and every waiting call returns its message as if it had
+  been answered synchronously, so agents write their outputs unchanged
+- Requests made while a job is running (agents whose dependencies just
+  finished, the reduce step after a map step) go into the next job
+
+Batch requests cost half the synchronous price and have their own rate
+limits, so the client-side limiter is bypassed. A job can take up to 24
+hours to end.
+"""
+
+import concurrent.futures
+import contextlib
+import itertools
+import json
+import threading
+import time
+import urllib.parse
+
+from streaming import STREAM_ERROR_STATUSES
+
+BATCHES_PATH = "/v1/messages/batches"
+DEFAULT_COLLECT_SECONDS = 5.0
+DEFAULT_MAX_COLLECT_SECONDS = 60.0
+DEFAULT_POLL_INTERVAL = 30.0
+# Jobs expire after 24 hours; stop waiting a little later than that
+DEFAULT_MAX_WAIT = 25 * 3600.0
+
+# API limits for a single batch
+MAX_BATCH_REQUESTS = 100000
+MAX_BATCH_BYTES = 256 * 1024 * 1024
+
+
+class BatchRequestError(Exception):
+    """A batch request that did not succeed (shaped like llm_client.APIError)
+
+    status is None for expired and canceled requests, so they are not retried.
+    """
+
+    def __init__(self, status, reason, message, body=""):
+        super().__init__(f"Batch request failed: {reason} - {message}")
+        self.status = status
+        self.reason = reason
+        self.body = body
+        self.headers = {}
+
+
+def result_error(result):
+    """BatchRequestError for an errored, expired or canceled result"""
+    if result.get('type') != 'errored':
+        return BatchRequestError(None, result.get('type', 'unknown'), "request was not processed", json.dumps(result))
+    error = result.get('error', {})
+    # The error object is wrapped in an {"type": "error", "error": {...}} envelope
+    error = error.get('error', error)
+    error_type = error.get('type', 'api_error')
+    return BatchRequestError(STREAM_ERROR_STATUSES.get(error_type, 500), error_type,
+                             error.get('message', ''), json.dumps(result))
+
+
+class BatchDispatcher:
+    """Collects Messages requests from many threads into Message Batches jobs"""
+
+    def __init__(self, client, settings=None):
+        settings = settings or {}
+        self.client = client
+        self.collect_seconds = settings.get('collect_seconds', DEFAULT_COLLECT_SECONDS)
+        self.max_collect_seconds = settings.get('max_collect_seconds', DEFAULT_MAX_COLLECT_SECONDS)
+        self.poll_interval = settings.get('poll_interval', DEFAULT_POLL_INTERVAL)
+        self.max_wait = settings.get('max_wait', DEFAULT_MAX_WAIT)
+        self.max_requests = min(int(settings.get('max_requests', MAX_BATCH_REQUESTS)), MAX_BATCH_REQUESTS)
+
+        # Queued requests: (custom_id, params, size in bytes, future)
+        self._pending = []
+        self._pending_bytes = 0
+        self._first_at = None
+        self._last_at = None
+        self._ids = itertools.count(1)
+        self._condition = threading.Condition()
+        self._collector = None
+        self.stats = {"batches": 0, "requests": 0, "succeeded": 0, "failed": 0}
+
+    def submit(self, params):
+        """Queue one Messages request and block until its batch result arrives; returns the message"""
+        future = concurrent.futures.Future()
+        size = len(json.dumps(params))
+        with self._condition:
+            now = time.monotonic()
+            self._pending.append((f"req-{next(self._ids)}", params, size, future))
+            self._pending_bytes += size
+            self._first_at = self._first_at or now
+            self._last_at = now
+            if self._collector is None:
+                self._collector = threading.Thread(target=self._collect, name="message-batches", daemon=True)
+                self._collector.start()
+            self._condition.notify()
+        return future.result()
+
+    def _ready(self, now):
+        """Seconds until the queue should be submitted (0 = now, None = queue empty)"""
+        if not self._pending:
+            return None
+        if len(self._pending) >= self.max_requests or self._pending_bytes >= MAX_BATCH_BYTES:
+            return 0
+        quiet = self.collect_seconds - (now - self._last_at)
+        waited = self.max_collect_seconds - (now - self._first_at)
+        return max(0, min(quiet, waited))
+
+    def _take(self):
+        """Remove the oldest requests that fit in one batch from the queue"""
+        taken, size = [], 0
+        while self._pending and len(taken) < self.max_requests:
+            request = self._pending[0]
+            if taken and size + request[2] > MAX_BATCH_BYTES:
+                break
+            taken.append(self._pending.pop(0))
+            size += request[2]
+        self._pending_bytes -= size
+        if not self._pending:
+            self._first_at = self._last_at = None
+        return taken
+
+    def _collect(self):
+        """Collector thread: submit a job whenever the queue is ready"""
+        while True:
+            with self._condition:
+                wait = self._ready(time.monotonic())
+                while wait != 0:
+                    self._condition.wait(wait)
+                    wait = self._ready(time.monotonic())
+                requests = self._take()
+            threading.Thread(target=self._run_job, args=(requests,), name="message-batch-job", daemon=True).start()
+
+    def _run_job(self, requests):
+        """Create one batch, wait for it to end and hand every result to its waiting caller"""
+        futures = {custom_id: future for custom_id, _, _, future in requests}
+        retry = self.client.retry_policy
+        try:
+            batch = retry.call(self.client.post_json, BATCHES_PATH, {
+                "requests": [{"custom_id": custom_id, "params": params} for custom_id, params, _, _ in requests]
+            })
+            with self._condition:
+                self.stats["batches"] += 1
+                self.stats["requests"] += len(requests)
+            print(f"Submitted message batch {batch['id']} with {len(requests)} requests")
+
+            batch = self._wait(batch)
+            retry.call(self._read_results, batch, futures)
+        except Exception as e:
+            print(f"Message batch failed: {e}")
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        missing = [future for future in futures.values() if not future.done()]
+        for future in missing:
+            future.set_exception(BatchRequestError(500, "api_error", "no result returned for this request"))
+        with self._condition:
+            self.stats["failed"] += len(missing)
+
+    def _wait(self, batch):
+        """Poll a batch until its processing_status is "ended"; returns the final batch object"""
+        started = time.monotonic()
+        last_counts = None
+        while batch.get('processing_status') != 'ended':
+            if time.monotonic() - started > self.max_wait:
+                raise RuntimeError(f"Message batch {batch['id']} did not end within {self.max_wait:.0f}s")
+            time.sleep(self.poll_interval)
+            try:
+                batch = self.client.retry_policy.call(
+                    self.client.post_json, f"{BATCHES_PATH}/{batch['id']}", None, "GET"
+                )
+            except Exception as e:
+                print(f"Warning: Could not poll message batch {batch['id']}: {e}")
+                continue
+
+            counts = batch.get('request_counts', {})
+            if counts != last_counts:
+                print(f"Message batch {batch['id']}: {batch.get('processing_status')} - "
+                      + ", ".join(f"{value} {name}" for name, value in counts.items() if value))
+                last_counts = counts
+        return batch
+
+    def _results_path(self, batch):
+        """Request path for the batch's results_url (same host as the API)"""
+        results_url = batch.get('results_url') or f"{BATCHES_PATH}/{batch['id']}/results"
+        parsed = urllib.parse.urlsplit(results_url)
+        path = parsed.path + (f"?{parsed.query}" if parsed.query else "")
+        base_path = self.client.pool.base_path
+        if base_path and path.startswith(base_path):
+            path = path[len(base_path):]
+        return path
+
+    def _read_results(self, batch, futures):
+        """Resolve the futures of every result line (safe to repeat after a dropped download)"""
+        succeeded = failed = 0
+        # Closed right away if a malformed line raises, so its pooled connection is given back
+        with contextlib.closing(self.client.iter_jsonl(self._results_path(batch))) as lines:
+            for line in lines:
+                future = futures.get(line.get('custom_id'))
+                if future is None or future.done():
+                    continue
+                result = line.get('result', {})
+                if result.get('type') == 'succeeded':
+                    future.set_result(result['message'])
+                    succeeded += 1
+                else:
+                    future.set_exception(result_error(result))
+                    failed += 1
+        with self._condition:
+            self.stats["succeeded"] += succeeded
+            self.stats["failed"] += failed
+        print(f"Message batch {batch['id']} ended: {succeeded} succeeded, {failed} failed")
+
+
+_dispatchers = {}
+_dispatchers_lock = threading.Lock()
+
+
+def get_dispatcher(client, settings):
+    """Return the process-wide dispatcher for the client's API key and endpoint"""
+    key = (client.api_key, client.pool.scheme, client.pool.host, client.pool.port, client.pool.base_path)
+    with _dispatchers_lock:
+        dispatcher = _dispatchers.get(key)
+        if dispatcher is None:
+            dispatcher = BatchDispatcher(client, settings)
+            _dispatchers[key] = dispatcher
+        return dispatcher
+
+
+def batch_report():
+    """Totals over every dispatcher in the process: {batches, requests, succeeded, failed}"""
+    totals = {"batches": 0, "requests": 0, "succeeded": 0, "failed": 0}
+    with _dispatchers_lock:
+        for dispatcher in _dispatchers.values():
+            for name in totals:
+                totals[name] += dispatcher.stats[name]
+    return totals
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Project Context (No external dependencies)
+
+Which project a standalone agent or evaluator script works on. Agent 0b
+passes the project explicitly: as the project argument of run() for
+in-process agents, and in the PIPELINE_PROJECT environment variable for
+agent subprocesses. Scripts started by hand take it from the command line:
+
+    python scripts/generate_simple.py --project brand_a
+    python scripts/evaluate.py --project brand_a
+
+so several projects can run at once from one checkout. An agent's
+"current_project" config.json setting (written by older versions of Agent
+0a) is only used when neither is given. Without any of them, a script whose
+agent already has project folders in 1_input/ stops with an error instead
+of quietly using the un-projected legacy folders.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+PROJECT_ENV = "PIPELINE_PROJECT"
+PROJECT_ARGUMENT = "--project"
+
+
+def requested_project(argv=None):
+    """Project named by --project NAME / --project=NAME or PIPELINE_PROJECT, else None"""
+    argv = sys.argv[1:] if argv is None else argv
+    for i, arg in enumerate(argv):
+        if arg == PROJECT_ARGUMENT and i + 1 < len(argv):
+            return argv[i + 1]
+        if arg.startswith(PROJECT_ARGUMENT + "="):
+            return arg.split("=", 1)[1]
+    return os.environ.get(PROJECT_ENV) or None
+
+
+def project_env(project_name):
+    """Environment entries that hand project_name to an agent subprocess"""
+    return {PROJECT_ENV: project_name}
+
+
+def resolve_project(config, agent_dir):
+    """Project for a script Agent 0b did not hand one: requested_project(), else current_project
+
+    Returns None for single-project (legacy) layouts; exits when the agent
+    has 1_input/{project} folders but no project was named.
+    """
+    project = requested_project() or config.get("current_project")
+    if project:
+        return project
+    input_dir = Path(agent_dir) / "1_input"
+    projects = []
+    if input_dir.is_dir():
+        projects = sorted(path.name for path in input_dir.iterdir() if path.is_dir() and not path.name.startswith("."))
+    if projects:
+        print(f"Error: No project selected. Run with {PROJECT_ARGUMENT} NAME "
+              f"(projects: {', '.join(projects)})")
+        sys.exit(1)
+    return None
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Client-Side Rate Limiter (No external dependencies)
+
+Token buckets for the organization's API limits, applied before every
+Claude request so concurrent agents queue smoothly instead of bursting into
+429s and backing off:
+
+- requests per minute (RPM)
+- input tokens per minute (ITPM): estimated from the assembled request, then
+  corrected with the response's usage.input_tokens
+- output tokens per minute (OTPM): max_tokens is reserved at admission and
+  the unused part refunded from usage.output_tokens, the same way the API
+  accounts for it; a request that fails (429, 5xx, timeout) gets its output
+  reservation back and is charged its estimated input only, except that a
+  stream broken midway stays charged for the output it already produced
+
+Buckets refill continuously at limit/60 per second and hold at most
+burst_seconds worth of tokens, which spreads requests out. Bucket state is
+kept in memory (shared by every thread in the process) or, with "shared":
+true, in a SQLite file that several orchestrator processes update
+transactionally, so they all draw on one budget.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+
+DEFAULT_STATE_FILE = Path(__file__).resolve().parent / "rate_limit" / "buckets.sqlite"
+DEFAULT_BURST_SECONDS = 10
+# Longest single sleep while waiting, so waiting threads re-check the shared state regularly
+MAX_WAIT_STEP = 2.0
+
+LIMIT_KEYS = {
+    "requests": "requests_per_minute",
+    "input_tokens": "input_tokens_per_minute",
+    "output_tokens": "output_tokens_per_minute",
+}
+
+
+def estimate_input_tokens(payload):
+    """Rough input token count of a Messages request (about 4 characters per token)"""
+    text = json.dumps(payload.get('system', '')) + json.dumps(payload.get('messages', []))
+    return len(text) // 4 + 1
+
+
+class MemoryBucketStore:
+    """Bucket state for one process: {name: (tokens, updated_at)}"""
+
+    def __init__(self):
+        self.state = {}
+        self._lock = threading.Lock()
+
+    def transact(self, fn):
+        """Apply fn(state) -> result atomically; fn mutates state in place"""
+        with self._lock:
+            return fn(self.state)
+
+
+class SQLiteBucketStore:
+    """Bucket state shared by every process that opens the same SQLite file"""
+
+    SCHEMA = "CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+
+    def __init__(self, path=DEFAULT_STATE_FILE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        with closing(sqlite3.connect(self.path, timeout=30)) as conn:
+            conn.execute(self.SCHEMA)
+            conn.commit()
+
+    def transact(self, fn):
+        """Apply fn(state) -> result inside one write transaction (BEGIN IMMEDIATE)"""
+        with self._lock, closing(sqlite3.connect(self.path, timeout=30, isolation_level=None)) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                state = {name: (tokens, updated) for name, tokens, updated in conn.execute("SELECT * FROM buckets")}
+                before = dict(state)
+                result = fn(state)
+                conn.executemany(
+                    "INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)",
+                    [(name, tokens, updated) for name, (tokens, updated) in state.items() if before.get(name) != (tokens, updated)],
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return result
+
+
+class RateLimiter:
+    """RPM / ITPM / OTPM token buckets in front of the Messages API"""
+
+    def __init__(self, limits, store=None, burst_seconds=DEFAULT_BURST_SECONDS):
+        # {bucket name: (refill per second, capacity)}
+        self.buckets = {
+            name: (per_minute / 60.0, max(1.0, per_minute / 60.0 * burst_seconds))
+            for name, per_minute in limits.items() if per_minute
+        }
+        self.store = store or MemoryBucketStore()
+
+    def _refill(self, state, now):
+        for name, (rate, capacity) in self.buckets.items():
+            tokens, updated = state.get(name, (capacity, now))
+            state[name] = (min(capacity, tokens + rate * max(0.0, now - updated)), now)
+
+    def _try_take(self, costs):
+        """Store transaction: take every cost or nothing; returns seconds to wait (0 = admitted)"""
+        def take(state):
+            now = time.time()
+            self._refill(state, now)
+            wait = 0.0
+            for name, cost in costs.items():
+                rate, capacity = self.buckets[name]
+                # A request larger than the whole bucket is admitted once the bucket is full
+                needed = min(cost, capacity)
+                tokens = state[name][0]
+                if tokens < needed:
+                    wait = max(wait, (needed - tokens) / rate)
+            if wait == 0:
+                for name, cost in costs.items():
+                    state[name] = (state[name][0] - cost, now)
+            return wait
+        return self.store.transact(take)
+
+    def admit(self, payload):
+        """Block until the request fits every bucket; returns the reservation to settle()"""
+        costs = {
+            "requests": 1,
+            "input_tokens": estimate_input_tokens(payload),
+            "output_tokens": payload.get('max_tokens') or 0,
+        }
+        costs = {name: cost for name, cost in costs.items() if name in self.buckets}
+        waited = 0.0
+        while True:
+            wait = self._try_take(costs)
+            if wait == 0:
+                if waited >= 1:
+                    print(f"Rate limiter held request for {waited:.1f}s")
+                return costs
+            step = min(wait, MAX_WAIT_STEP)
+            time.sleep(step)
+            waited += step
+
+    def settle(self, reservation, usage):
+        """Replace the estimates in a reservation with the response's actual usage"""
+        if not usage:
+            return
+        actual = {
+            "input_tokens": (usage.get('input_tokens') or 0) + (usage.get('cache_creation_input_tokens') or 0),
+            "output_tokens": usage.get('output_tokens') or 0,
+        }
+        self._refund({name: reservation[name] - actual[name] for name in actual if name in reservation})
+
+    def release(self, reservation, output_tokens=0):
+        """Refund the unused output reservation of a request that failed; its request and input stay charged
+
+        output_tokens is what the request produced before failing (text
+        received from a broken stream).
+        """
+        if reservation and "output_tokens" in reservation:
+            reserved = reservation["output_tokens"]
+            self._refund({"output_tokens": reserved - min(output_tokens, reserved)})
+
+    def _refund(self, adjustments):
+        """Store transaction: add each amount back to its bucket (negative amounts charge more)"""
+        def refund(state):
+            now = time.time()
+            self._refill(state, now)
+            for name, amount in adjustments.items():
+                capacity = self.buckets[name][1]
+                state[name] = (min(capacity, state[name][0] + amount), now)
+        self.store.transact(refund)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(config):
+    """Return the process-wide limiter for the "rate_limit" config section, or None if no limits are set"""
+    settings = config.get('rate_limit', {})
+    limits = {name: settings.get(key) for name, key in LIMIT_KEYS.items()}
+    if not settings.get('enabled', True) or not any(limits.values()):
+        return None
+
+    state_file = None
+    if settings.get('shared') or settings.get('state_file'):
+        state_file = str(settings.get('state_file') or DEFAULT_STATE_FILE)
+    burst_seconds = settings.get('burst_seconds', DEFAULT_BURST_SECONDS)
+
+    key = (tuple(sorted(limits.items())), state_file, burst_seconds)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            store = SQLiteBucketStore(state_file) if state_file else MemoryBucketStore()
+            limiter = RateLimiter(limits, store, burst_seconds)
+            _limiters[key] = limiter
+        return limiter
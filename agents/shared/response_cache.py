@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Response Cache (No external dependencies)
+
+Stores Claude API responses on disk keyed by a SHA-256 of the request
+(model, temperature, max_tokens, system, messages and any other generation
+options). Re-running a pipeline
+after a downstream failure replays identical calls from disk instead of
+paying for them again.
+
+- LRU eviction by total size (file mtime is bumped on every hit)
+- Entries older than the TTL are ignored and removed
+- Per-run bypass: set LLM_CACHE_BYPASS=1 to skip lookups (fresh responses
+  still overwrite the cached ones)
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / "response_cache"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+BYPASS_ENV_VAR = "LLM_CACHE_BYPASS"
+
+# Request fields that don't change the generated response
+IGNORED_FIELDS = ("stream", "metadata")
+
+
+def cache_key(payload):
+    """SHA-256 over the canonical JSON of the response-determining request fields"""
+    keyed = {field: value for field, value in payload.items() if field not in IGNORED_FIELDS}
+    canonical = json.dumps(keyed, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def bypass_requested():
+    """True when the current run asked to skip cache lookups"""
+    return os.environ.get(BYPASS_ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+class ResponseCache:
+    """Directory of {sha256}.json response files with size-bounded LRU eviction"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES,
+                 ttl_seconds=DEFAULT_TTL_SECONDS, bypass=False):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = int(max_bytes)
+        self.ttl_seconds = ttl_seconds
+        self.bypass = bypass or bypass_requested()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a cache from the optional "response_cache" config section, or None if disabled"""
+        settings = config.get('response_cache', {})
+        if not settings.get('enabled', True):
+            return None
+        return cls(
+            cache_dir=settings.get('dir') or DEFAULT_CACHE_DIR,
+            max_bytes=settings.get('max_bytes', DEFAULT_MAX_BYTES),
+            ttl_seconds=settings.get('ttl_seconds', DEFAULT_TTL_SECONDS),
+            bypass=settings.get('bypass', False),
+        )
+
+    def _path(self, key):
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key):
+        """Return the cached response for key, or None on miss / expiry / bypass"""
+        if self.bypass:
+            return None
+
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError):
+            self._remove(path)
+            return None
+
+        if self.ttl_seconds and time.time() - entry.get('created', 0) > self.ttl_seconds:
+            self._remove(path)
+            return None
+
+        # Bump mtime so LRU eviction keeps recently used entries
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return entry.get('response')
+
+    def put(self, key, payload, response):
+        """Store a response atomically, then evict least-recently-used entries over max_bytes"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "key": key,
+            "created": time.time(),
+            "request": {field: payload.get(field) for field in ("model", "temperature", "max_tokens")},
+            "response": response,
+        }
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            self._remove(Path(tmp_path))
+            raise
+
+        self.evict()
+
+    def evict(self):
+        """Drop least-recently-used entries until the cache fits max_bytes
+
+        Expired entries are removed lazily by get(); since nothing touches them
+        they are also the first to go here.
+        """
+        with self._lock:
+            entries = []
+            total = 0
+            for path in self.cache_dir.glob("*.json"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+
+    def clear(self):
+        """Remove every cached response"""
+        for path in self.cache_dir.glob("*.json"):
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Retry Policy for Claude API Calls (No external dependencies)
+
+Transient failures (429 rate limits, 529 overloaded, 5xx, dropped
+connections and timeouts) are retried inside the shared client instead of
+failing the agent and re-running it from the orchestrator.
+
+- Exponential backoff with full jitter: sleep uniform(0, min(max_delay,
+  initial_delay * 2^retry))
+- A server Retry-After header (seconds or HTTP date) replaces the computed
+  delay; x-should-retry: true/false overrides the status-code decision
+- Per-call deadline: no retry is scheduled to start after it
+- Retry budget shared by every call of the client: each request earns
+  `budget_ratio` retries (plus a small reserve), so a sustained outage does
+  not multiply traffic by max_attempts
+"""
+
+import email.utils
+import http.client
+import random
+import socket
+import threading
+import time
+
+RETRYABLE_STATUSES = (408, 409, 429, 500, 502, 503, 504, 529)
+# Network failures: refused/reset connections, timeouts, malformed responses
+RETRYABLE_ERRORS = (OSError, socket.timeout, http.client.HTTPException)
+
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_INITIAL_DELAY = 1.0
+DEFAULT_MAX_DELAY = 60.0
+DEFAULT_DEADLINE = 900.0
+DEFAULT_BUDGET_RATIO = 0.2
+DEFAULT_BUDGET_RESERVE = 10
+
+
+def header(headers, name):
+    """Case-insensitive header lookup on a plain dict"""
+    name = name.lower()
+    for key, value in (headers or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def parse_retry_after(headers):
+    """Seconds requested by a Retry-After header, or None"""
+    value = header(headers, 'retry-after')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryBudget:
+    """Token bucket of retries: every request deposits `ratio`, every retry withdraws 1"""
+
+    def __init__(self, ratio=DEFAULT_BUDGET_RATIO, reserve=DEFAULT_BUDGET_RESERVE):
+        self.ratio = ratio
+        self.capacity = reserve
+        self.tokens = float(reserve)
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + self.ratio)
+
+    def try_spend(self):
+        with self._lock:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class RetryPolicy:
+    """Decides whether and when a failed API call is attempted again"""
+
+    def __init__(self, max_attempts=DEFAULT_MAX_ATTEMPTS, initial_delay=DEFAULT_INITIAL_DELAY,
+                 max_delay=DEFAULT_MAX_DELAY, deadline=DEFAULT_DEADLINE,
+                 budget_ratio=DEFAULT_BUDGET_RATIO, budget_reserve=DEFAULT_BUDGET_RESERVE):
+        self.max_attempts = max(1, int(max_attempts))
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.budget = RetryBudget(budget_ratio, budget_reserve)
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a policy from the optional "retry" config section ({"enabled": false} disables retries)"""
+        settings = config.get('retry', {})
+        if not settings.get('enabled', True):
+            return cls(max_attempts=1)
+        return cls(
+            max_attempts=settings.get('max_attempts', DEFAULT_MAX_ATTEMPTS),
+            initial_delay=settings.get('initial_delay', DEFAULT_INITIAL_DELAY),
+            max_delay=settings.get('max_delay', DEFAULT_MAX_DELAY),
+            deadline=settings.get('deadline', DEFAULT_DEADLINE),
+            budget_ratio=settings.get('budget_ratio', DEFAULT_BUDGET_RATIO),
+            budget_reserve=settings.get('budget_reserve', DEFAULT_BUDGET_RESERVE),
+        )
+
+    def is_retryable(self, error):
+        """True for transient API errors and network failures"""
+        status = getattr(error, 'status', None)
+        if status is None:
+            return isinstance(error, RETRYABLE_ERRORS)
+
+        should_retry = header(getattr(error, 'headers', None), 'x-should-retry')
+        if should_retry in ('true', 'false'):
+            return should_retry == 'true'
+        return status in RETRYABLE_STATUSES
+
+    def backoff(self, retry, error=None):
+        """Seconds to wait before retry number `retry` (1-based)"""
+        retry_after = parse_retry_after(getattr(error, 'headers', None))
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.max_delay, self.initial_delay * (2 ** (retry - 1))))
+
+    def call(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs), retrying transient failures; re-raises the last error"""
+        started = time.monotonic()
+        self.budget.record_request()
+        attempt = 1
+        while True:
+            try:
+                return fn(*args, **kwargs)
+            except Exception as error:
+                if attempt >= self.max_attempts or not self.is_retryable(error):
+                    raise
+
+                delay = self.backoff(attempt, error)
+                remaining = self.deadline - (time.monotonic() - started) if self.deadline else None
+                if remaining is not None and delay >= remaining:
+                    print(f"Not retrying: next attempt would pass the {self.deadline:.0f}s call deadline")
+                    raise
+                if not self.budget.try_spend():
+                    print("Not retrying: retry budget exhausted")
+                    raise
+
+                print(f"API call failed ({error}) - retrying in {delay:.1f}s "
+                      f"(attempt {attempt + 1}/{self.max_attempts})")
+                time.sleep(delay)
+                attempt += 1
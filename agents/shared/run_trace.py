@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Run Trace (No external dependencies)
+
+Structured record of where a pipeline run spends its time, tokens and
+money. The orchestrator opens one trace per run (start_trace()). From then
+on, every LLM call made through llm_client.py and every stage wrapped in
+trace_span() appends one JSON line to
+agent_0b_orchestrator/2_system_assets/traces/{label}_{timestamp}.jsonl:
+
+- Stages: agent runs, agent imports, subprocess runs, file copies and
+  example loading, with start/end timestamps, duration and outcome
+- LLM calls: start/end, time held by the rate limiter (queue wait),
+  attempts, response cache hits, batch mode, input/output/cache tokens from
+  the response usage, and an estimated cost
+
+Records inherit the agent, project and phase of the enclosing stage on the
+same thread. Agents started as subprocesses append to the same file
+(trace_env() hands them the trace). Without an open trace (agents run
+standalone) recording does nothing. print_summary() totals the run's file;
+trace_export.py turns it into a Chrome trace / OTLP spans.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+# USD per million tokens (input, output) for the first model-name fragment that matches.
+# Override or extend with the orchestrator config "pricing": {"model fragment": {"input": x, "output": y}}
+MODEL_PRICES = (
+    ("opus-4-5", 5.00, 25.00),
+    ("opus", 15.00, 75.00),
+    ("sonnet", 3.00, 15.00),
+    ("haiku-4-5", 1.00, 5.00),
+    ("3-5-haiku", 0.80, 4.00),
+    ("haiku", 0.25, 1.25),
+)
+CACHE_WRITE_MULTIPLIER = 1.25
+CACHE_READ_MULTIPLIER = 0.1
+BATCH_DISCOUNT = 0.5
+
+# Stage fields that label every record made inside the stage
+CONTEXT_FIELDS = ("agent", "project", "phase")
+# Environment variable that passes the open trace to agent subprocesses
+TRACE_ENV = "RUN_TRACE"
+
+_lock = threading.Lock()
+_local = threading.local()
+_trace = None
+
+
+def model_prices(model, overrides=None):
+    """(input, output) USD per million tokens for a model, or None if unknown"""
+    model = model or ''
+    for fragment, prices in (overrides or {}).items():
+        if fragment in model:
+            return prices['input'], prices['output']
+    for fragment, input_price, output_price in MODEL_PRICES:
+        if fragment in model:
+            return input_price, output_price
+    return None
+
+
+def estimate_cost(model, usage, batch=False, overrides=None):
+    """Estimated USD cost of one response's usage (None for unknown models)"""
+    prices = model_prices(model, overrides)
+    if prices is None or not usage:
+        return None
+    input_price, output_price = prices
+    cost = (
+        (usage.get('input_tokens') or 0) * input_price
+        + (usage.get('cache_creation_input_tokens') or 0) * input_price * CACHE_WRITE_MULTIPLIER
+        + (usage.get('cache_read_input_tokens') or 0) * input_price * CACHE_READ_MULTIPLIER
+        + (usage.get('output_tokens') or 0) * output_price
+    ) / 1_000_000
+    return round(cost * (BATCH_DISCOUNT if batch else 1), 6)
+
+
+def _open_trace(path, run_id, pricing):
+    global _trace
+    with _lock:
+        if _trace is not None:
+            _trace["file"].close()
+        _trace = {
+            "path": Path(path),
+            "file": open(path, 'a', encoding='utf-8'),
+            "run_id": run_id,
+            "pricing": pricing or {},
+        }
+
+
+def start_trace(directory, label, pricing=None):
+    """Open a new trace file for this run; returns its path"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{label}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    _open_trace(path, uuid.uuid4().hex, pricing)
+    return path
+
+
+def trace_env():
+    """Environment for an agent subprocess so it records into this trace (empty without one)"""
+    if _trace is None:
+        return {}
+    return {TRACE_ENV: json.dumps({"path": str(_trace["path"]), "run_id": _trace["run_id"],
+                                   "pricing": _trace["pricing"], "context": _context(),
+                                   "parent_id": _parent_id()})}
+
+
+def _resume_from_env():
+    """Join the parent's trace when started as an agent subprocess"""
+    try:
+        trace = json.loads(os.environ.get(TRACE_ENV) or 'null')
+        if trace:
+            _open_trace(trace["path"], trace["run_id"], trace["pricing"])
+            _local.context = trace["context"]
+            _local.parent_id = trace.get("parent_id")
+    except (ValueError, KeyError, OSError) as e:
+        print(f"Warning: Could not open run trace: {e}")
+
+
+def end_trace():
+    """Close the trace file (summary() still reads it)"""
+    with _lock:
+        if _trace is not None and not _trace["file"].closed:
+            _trace["file"].close()
+
+
+def trace_path():
+    return _trace["path"] if _trace else None
+
+
+def _context():
+    return getattr(_local, 'context', {})
+
+
+def _parent_id():
+    """Id of the innermost open span on this thread"""
+    return getattr(_local, 'parent_id', None)
+
+
+def _ids():
+    """(span_id, parent_id, pid, thread) for a new record"""
+    return {"span_id": uuid.uuid4().hex[:16], "parent_id": _parent_id(), "pid": os.getpid(),
+            "thread": threading.current_thread().name}
+
+
+def _write(record):
+    with _lock:
+        if _trace is None or _trace["file"].closed:
+            return
+        record = {"run_id": _trace["run_id"], **record}
+        _trace["file"].write(json.dumps(record, default=str) + "\n")
+        _trace["file"].flush()
+
+
+@contextmanager
+def trace_span(name, **fields):
+    """Record one pipeline stage around the with-block
+
+    Yields a dict the block can add fields to (e.g. span["success"] = ok).
+    agent / project / phase fields also label every record made inside the
+    block on this thread.
+    """
+    span = {}
+    if _trace is None:
+        yield span
+        return
+
+    parent = _context()
+    ids = _ids()
+    _local.context = {**parent, **{key: fields[key] for key in CONTEXT_FIELDS if key in fields}}
+    _local.parent_id = ids["span_id"]
+    started = time.time()
+    try:
+        yield span
+    except BaseException as e:
+        span["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _local.context = parent
+        _local.parent_id = ids["parent_id"]
+        ended = time.time()
+        _write({"type": "stage", "name": name, **parent, **fields, **span, **ids,
+                "start": started, "end": ended, "duration": round(ended - started, 4)})
+
+
+def record_llm_call(label, model, started, usage=None, attempts=1, waits=(), cache_hit=False,
+                    batch=False, streamed=False, error=None):
+    """Record one create_message / stream_message call
+
+    started is a time.time() value; waits lists (start, seconds) of each
+    attempt's wait for the rate limiter.
+    """
+    if _trace is None:
+        return
+    ended = time.time()
+    usage = usage or {}
+    record = {
+        "type": "llm_call",
+        "name": "llm_call",
+        **_context(),
+        "label": label,
+        "model": model,
+        **_ids(),
+        "start": started,
+        "end": ended,
+        "duration": round(ended - started, 4),
+        "queue_wait": round(sum(seconds for _, seconds in waits), 4),
+        # Only waits long enough to show up on a timeline
+        "waits": [[start, round(seconds, 4)] for start, seconds in waits if seconds >= 0.001],
+        "attempts": attempts,
+        "retries": max(0, attempts - 1),
+        "cache_hit": cache_hit,
+        "batch": batch,
+        "streamed": streamed,
+        "input_tokens": usage.get('input_tokens') or 0,
+        "output_tokens": usage.get('output_tokens') or 0,
+        "cache_creation_input_tokens": usage.get('cache_creation_input_tokens') or 0,
+        "cache_read_input_tokens": usage.get('cache_read_input_tokens') or 0,
+        # Responses served from the local response cache cost nothing
+        "cost": 0.0 if cache_hit else estimate_cost(model, usage, batch, _trace["pricing"]),
+    }
+    if error is not None:
+        record["error"] = f"{type(error).__name__}: {error}"
+    _write(record)
+
+
+def summary():
+    """Totals of the current run: {"agents": {agent: {...}}, "stages": {name: {count, seconds}}}"""
+    records = []
+    if _trace is not None:
+        with open(_trace["path"], 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get("run_id") == _trace["run_id"]:
+                    records.append(record)
+
+    agents, stages = {}, {}
+    for record in records:
+        name = record.get("agent") or record.get("label") or "unlabeled"
+        if record["type"] == "llm_call":
+            totals = agents.setdefault(name, _empty_agent())
+            totals["calls"] += 1
+            totals["api_seconds"] += record["duration"]
+            totals["queue_wait"] += record["queue_wait"]
+            totals["retries"] += record["retries"]
+            totals["errors"] += 1 if "error" in record else 0
+            for field in ("input_tokens", "output_tokens", "cache_read_input_tokens", "cache_creation_input_tokens"):
+                totals[field] += record[field]
+            totals["cost"] += record["cost"] or 0.0
+            totals["unpriced"] += 1 if record["cost"] is None else 0
+        elif record["name"] == "agent":
+            totals = agents.setdefault(name, _empty_agent())
+            totals["wall_seconds"] += record["duration"]
+        else:
+            stage = stages.setdefault(record["name"], {"count": 0, "seconds": 0.0})
+            stage["count"] += 1
+            stage["seconds"] += record["duration"]
+    return {"agents": agents, "stages": stages}
+
+
+def _empty_agent():
+    return {"wall_seconds": 0.0, "calls": 0, "api_seconds": 0.0, "queue_wait": 0.0, "retries": 0, "errors": 0,
+            "input_tokens": 0, "output_tokens": 0, "cache_read_input_tokens": 0,
+            "cache_creation_input_tokens": 0, "cost": 0.0, "unpriced": 0}
+
+
+def print_summary():
+    """Print per-agent time, tokens and cost and per-stage time for the current run"""
+    totals = summary()
+    if not totals["agents"] and not totals["stages"]:
+        return
+
+    print("\nRun trace summary:")
+    print(f"  {'Agent':<32} {'Wall s':>7} {'API s':>7} {'Queue s':>7} {'Calls':>5} {'Retry':>5} "
+          f"{'Input':>8} {'Output':>7} {'Cached':>8} {'Cost $':>8}")
+    for name, agent in sorted(totals["agents"].items()):
+        cost = f"{agent['cost']:.4f}" + ("*" if agent["unpriced"] else "")
+        print(f"  {name:<32} {agent['wall_seconds']:>7.1f} {agent['api_seconds']:>7.1f} {agent['queue_wait']:>7.1f} "
+              f"{agent['calls']:>5} {agent['retries']:>5} {agent['input_tokens'] + agent['cache_creation_input_tokens']:>8} "
+              f"{agent['output_tokens']:>7} {agent['cache_read_input_tokens']:>8} {cost:>8}")
+    total_cost = sum(agent["cost"] for agent in totals["agents"].values())
+    print(f"  Estimated total cost: ${total_cost:.4f}"
+          + (" (* some calls used a model without a known price)" if any(a["unpriced"] for a in totals["agents"].values()) else ""))
+
+    if totals["stages"]:
+        print("  Stages: " + ", ".join(
+            f"{name} {stage['seconds']:.2f}s ({stage['count']}x)" for name, stage in sorted(totals["stages"].items())
+        ))
+    if trace_path():
+        print(f"  Trace: {trace_path()}")
+
+
+_resume_from_env()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Streaming Responses (No external dependencies)
+
+Server-sent events support for LLMClient.stream_message(). Long generations
+(Phase 2 keyword expansion, website copy) are written to disk as the text
+arrives instead of after the whole body:
+
+- Text is appended to "<output>.partial" in the agent's 3_unlabeled/{project}
+  folder and flushed per chunk, so progress can be watched and a failed run
+  leaves its partial output behind for inspection
+- On message_stop the file is renamed into place atomically (os.replace),
+  so downstream agents never pick up a half-written output
+- The socket timeout applies between chunks, not to the whole generation
+"""
+
+import json
+import os
+from pathlib import Path
+
+PARTIAL_SUFFIX = ".partial"
+
+# Mid-stream "error" events mapped to the HTTP status the same error has before streaming starts
+STREAM_ERROR_STATUSES = {
+    "invalid_request_error": 400,
+    "authentication_error": 401,
+    "permission_error": 403,
+    "not_found_error": 404,
+    "request_too_large": 413,
+    "rate_limit_error": 429,
+    "api_error": 500,
+    "overloaded_error": 529,
+}
+
+
+class StreamError(Exception):
+    """An "error" event received after the stream started (shaped like llm_client.APIError)"""
+
+    def __init__(self, error_type, message, body):
+        super().__init__(f"Stream error: {error_type} - {message}")
+        self.status = STREAM_ERROR_STATUSES.get(error_type, 500)
+        self.reason = error_type
+        self.body = body
+        self.headers = {}
+
+
+def iter_sse_events(lines):
+    """Yield (event, data) pairs from an iterable of raw SSE lines (bytes)"""
+    event, data = None, []
+    for raw in lines:
+        line = raw.decode('utf-8').rstrip('\r\n')
+        if not line:
+            if data:
+                yield event, "\n".join(data)
+            event, data = None, []
+        elif line.startswith(':'):
+            continue
+        elif line.startswith('event:'):
+            event = line[len('event:'):].strip()
+        elif line.startswith('data:'):
+            value = line[len('data:'):]
+            data.append(value[1:] if value.startswith(' ') else value)
+    if data:
+        yield event, "\n".join(data)
+
+
+def read_message_stream(lines, on_text):
+    """Assemble a Messages API response from its event stream, passing each text delta to on_text
+
+    Returns the message in the same shape as a non-streaming response.
+    Raises StreamError on an error event and ConnectionError if the stream
+    ends before message_stop (both are retryable).
+    """
+    message = None
+    for event, data in iter_sse_events(lines):
+        payload = json.loads(data)
+        kind = payload.get('type', event)
+
+        if kind == 'message_start':
+            message = payload['message']
+            message.setdefault('content', [])
+        elif kind == 'content_block_start':
+            message['content'].append(payload['content_block'])
+        elif kind == 'content_block_delta':
+            delta = payload['delta']
+            block = message['content'][payload.get('index', len(message['content']) - 1)]
+            if delta.get('type') == 'text_delta':
+                block['text'] = block.get('text', '') + delta['text']
+                on_text(delta['text'])
+        elif kind == 'message_delta':
+            message.update({key: value for key, value in payload.get('delta', {}).items() if value is not None})
+            message.setdefault('usage', {}).update(payload.get('usage', {}))
+        elif kind == 'message_stop':
+            return message
+        elif kind == 'error':
+            error = payload.get('error', {})
+            raise StreamError(error.get('type', 'api_error'), error.get('message', ''), data)
+
+    raise ConnectionError("Stream ended before message_stop")
+
+
+class PartialOutput:
+    """Output file written incrementally as <name>.partial and renamed into place when complete"""
+
+    def __init__(self, output_path):
+        self.path = Path(output_path)
+        self.partial_path = self.path.with_name(self.path.name + PARTIAL_SUFFIX)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._parts = []
+        self._file = open(self.partial_path, 'w', encoding='utf-8')
+
+    @property
+    def text(self):
+        return "".join(self._parts)
+
+    def write(self, text):
+        self._file.write(text)
+        self._file.flush()
+        self._parts.append(text)
+
+    def reset(self, text=""):
+        """Rewrite the partial file to start from `text` (used when a stream is restarted)"""
+        self._file.seek(0)
+        self._file.truncate()
+        self._parts = []
+        if text:
+            self.write(text)
+
+    def commit(self):
+        """Finish the file and atomically move it to its final name"""
+        self._file.close()
+        os.replace(self.partial_path, self.path)
+        return self.path
+
+    def abandon(self):
+        """Close without renaming; the .partial file stays for inspection"""
+        self._file.close()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Trace Export (No external dependencies)
+
+Turns a run trace written by run_trace.py into views of the run's
+concurrency:
+
+- Chrome Trace Event JSON (write_chrome_trace()), which opens in Perfetto
+  (https://ui.perfetto.dev) or chrome://tracing. Each worker thread is a
+  track showing its agent runs, imports, file copies, example loading and
+  LLM calls, with rate-limiter waits nested inside the calls. A counter
+  track shows how many LLM calls were in flight, and flow arrows link the
+  agents on the critical path
+- OTLP/HTTP JSON spans (send_otlp()) for a local OpenTelemetry collector,
+  e.g. http://localhost:4318/v1/traces
+- critical_path(): the chain of dependent agent runs that ended last, i.e.
+  the agents whose time set the run's wall-clock time
+
+The orchestrator exports every run when it ends. Older traces can be
+exported by hand:
+
+    python shared/trace_export.py agent_0b_orchestrator/2_system_assets/traces/<trace>.jsonl
+    python shared/trace_export.py <trace>.jsonl --otlp http://localhost:4318/v1/traces
+"""
+
+import argparse
+import json
+import sys
+import urllib.error
+import urllib.request
+import uuid
+from pathlib import Path
+
+DEFAULT_OTLP_ENDPOINT = "http://localhost:4318/v1/traces"
+SERVICE_NAME = "gtm-pipeline"
+
+# Record fields that are timing or identity, not span attributes
+STRUCTURAL_FIELDS = {"type", "name", "start", "end", "duration", "span_id", "parent_id", "pid", "thread",
+                     "run_id", "waits"}
+
+
+def load_trace(path):
+    """Records of a run trace file (lines that are not valid JSON are skipped)"""
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+def span_name(record):
+    """Display name: the agent for agent runs, the call's agent for LLM calls"""
+    if record["name"] == "agent":
+        return record.get("agent", "agent")
+    if record["type"] == "llm_call":
+        return f"llm_call {record.get('label') or record.get('agent') or ''}".strip()
+    return record["name"]
+
+
+def attributes(record):
+    return {key: value for key, value in record.items() if key not in STRUCTURAL_FIELDS and value is not None}
+
+
+def critical_path(records):
+    """Agent run records on the critical path, first to last
+
+    Starting from the agent run that ended last, repeatedly steps to the
+    dependency (from the run's depends_on) that finished last before it
+    started. Runs of different projects are never linked.
+    """
+    runs = {}
+    for record in records:
+        if record["type"] == "stage" and record["name"] == "agent":
+            runs[(record.get("project"), record.get("agent"))] = record
+    if not runs:
+        return []
+
+    path = [max(runs.values(), key=lambda run: run["end"])]
+    while True:
+        current = path[-1]
+        dependencies = [
+            runs[(current.get("project"), name)] for name in current.get("depends_on", [])
+            if (current.get("project"), name) in runs
+        ]
+        finished = [run for run in dependencies if run["end"] <= current["start"] + 0.001]
+        if not finished:
+            break
+        path.append(max(finished, key=lambda run: run["end"]))
+    return list(reversed(path))
+
+
+def print_critical_path(records):
+    path = critical_path(records)
+    if not path:
+        return
+    wall = max(record["end"] for record in records) - min(record["start"] for record in records)
+    busy = sum(run["duration"] for run in path)
+    print(f"Critical path ({busy:.1f}s of {wall:.1f}s wall-clock): "
+          + " -> ".join(f"{run.get('agent')} {run['duration']:.1f}s" for run in path))
+
+
+def chrome_trace(records):
+    """Chrome Trace Event document for a run's records"""
+    if not records:
+        return {"traceEvents": []}
+    t0 = min(record["start"] for record in records)
+    micros = lambda seconds: round((seconds - t0) * 1_000_000)
+
+    events, tids = [], {}
+
+    def tid(record):
+        key = (record.get("pid", 0), record.get("thread", "main"))
+        if key not in tids:
+            tids[key] = len(tids) + 1
+            events.append({"name": "thread_name", "ph": "M", "pid": key[0], "tid": tids[key],
+                           "args": {"name": key[1]}})
+        return tids[key]
+
+    critical = {id(run) for run in critical_path(records)}
+    orchestrator_pids = {record.get("pid") for record in records if record["name"] == "agent"}
+    for pid in sorted({record.get("pid", 0) for record in records}):
+        name = "orchestrator" if pid in orchestrator_pids else "agent subprocess"
+        events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"{name} ({pid})"}})
+
+    in_flight = []
+    for record in sorted(records, key=lambda record: (record["start"], -record["duration"])):
+        pid, thread = record.get("pid", 0), tid(record)
+        if record["type"] == "llm_call":
+            category = "llm"
+            in_flight += [(record["start"], 1), (record["end"], -1)]
+        elif record["name"] == "agent":
+            category = "agent,critical_path" if id(record) in critical else "agent"
+        else:
+            category = record["name"]
+        events.append({"name": span_name(record), "cat": category, "ph": "X", "pid": pid, "tid": thread,
+                       "ts": micros(record["start"]), "dur": max(1, round(record["duration"] * 1_000_000)),
+                       "args": attributes(record)})
+        for start, seconds in record.get("waits", []):
+            events.append({"name": "rate limiter wait", "cat": "queue", "ph": "X", "pid": pid, "tid": thread,
+                           "ts": micros(start), "dur": max(1, round(seconds * 1_000_000))})
+
+    if in_flight:
+        counter_pid = min(orchestrator_pids or {records[0].get("pid", 0)})
+        level = 0
+        for at, change in sorted(in_flight):
+            level += change
+            events.append({"name": "LLM calls in flight", "ph": "C", "pid": counter_pid,
+                           "ts": micros(at), "args": {"calls": level}})
+
+    # Flow arrows from each critical-path agent to the next one
+    path = critical_path(records)
+    for number, (before, after) in enumerate(zip(path, path[1:]), 1):
+        events.append({"name": "critical path", "cat": "critical_path", "ph": "s", "id": number,
+                       "pid": before.get("pid", 0), "tid": tid(before), "ts": micros(before["end"]) - 1})
+        events.append({"name": "critical path", "cat": "critical_path", "ph": "f", "bp": "e", "id": number,
+                       "pid": after.get("pid", 0), "tid": tid(after), "ts": micros(after["start"])})
+
+    return {"traceEvents": events, "displayTimeUnit": "ms",
+            "otherData": {"run_id": records[0].get("run_id"), "start": t0}}
+
+
+def write_chrome_trace(records, path):
+    """Write the Chrome trace JSON for records to path; returns the path"""
+    path = Path(path)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(chrome_trace(records), f, default=str)
+    return path
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, str):
+        return {"stringValue": value}
+    return {"stringValue": json.dumps(value, default=str)}
+
+
+def _otlp_span(trace_id, span_id, parent_id, name, kind, start, end, attrs, error=None):
+    span = {
+        "traceId": trace_id,
+        "spanId": span_id,
+        "name": name,
+        "kind": kind,
+        "startTimeUnixNano": str(int(start * 1_000_000_000)),
+        "endTimeUnixNano": str(int(end * 1_000_000_000)),
+        "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in attrs.items()],
+        "status": {"code": 2, "message": error} if error else {"code": 1},
+    }
+    if parent_id:
+        span["parentSpanId"] = parent_id
+    return span
+
+
+def otlp_payload(records):
+    """OTLP/HTTP JSON ExportTraceServiceRequest for a run's records"""
+    spans = []
+    for record in records:
+        trace_id = record.get("run_id") or uuid.uuid4().hex
+        # LLM calls are client spans; pipeline stages are internal
+        kind = 3 if record["type"] == "llm_call" else 1
+        spans.append(_otlp_span(trace_id, record["span_id"], record.get("parent_id"), span_name(record), kind,
+                                record["start"], record["end"], attributes(record), record.get("error")))
+        for start, seconds in record.get("waits", []):
+            spans.append(_otlp_span(trace_id, uuid.uuid4().hex[:16], record["span_id"], "rate limiter wait", 1,
+                                    start, start + seconds, {}))
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+        "scopeSpans": [{"scope": {"name": "run_trace"}, "spans": spans}],
+    }]}
+
+
+def send_otlp(records, endpoint=DEFAULT_OTLP_ENDPOINT, timeout=10):
+    """POST the run's spans to an OTLP/HTTP collector; True on success"""
+    payload = otlp_payload(records)
+    request = urllib.request.Request(endpoint, data=json.dumps(payload).encode('utf-8'),
+                                     headers={"Content-Type": "application/json"}, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+    except (urllib.error.URLError, OSError) as e:
+        print(f"Warning: Could not send spans to {endpoint}: {e}")
+        return False
+    print(f"Sent {len(payload['resourceSpans'][0]['scopeSpans'][0]['spans'])} spans to {endpoint}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a run trace as Chrome trace JSON and/or OTLP spans")
+    parser.add_argument("trace", help="run trace .jsonl file")
+    parser.add_argument("--chrome", metavar="PATH", help="Chrome trace output (default: <trace>.chrome.json)")
+    parser.add_argument("--otlp", nargs="?", const=DEFAULT_OTLP_ENDPOINT, metavar="URL",
+                        help=f"also send spans to an OTLP/HTTP collector (default {DEFAULT_OTLP_ENDPOINT})")
+    args = parser.parse_args()
+
+    records = load_trace(args.trace)
+    if not records:
+        print(f"Error: No records in {args.trace}")
+        sys.exit(1)
+
+    chrome_path = write_chrome_trace(records, args.chrome or Path(args.trace).with_suffix(".chrome.json"))
+    print(f"Chrome trace: {chrome_path} (open in https://ui.perfetto.dev)")
+    print_critical_path(records)
+    if args.otlp and not send_otlp(records, args.otlp):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,12 +8,16 @@ and saving labeled results to 5_labeled_json/
 
 import json
 import os
+import sys
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk, scrolledtext
 from datetime import datetime
 from pathlib import Path
 import traceback
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "shared"))
+from project_context import resolve_project
+
 class TwitterEvaluator:
     def __init__(self):
         # Set up paths
@@ -57,14 +61,14 @@ class TwitterEvaluator:
         self.setup_ui()
     
     def _load_current_project(self):
-        """Load current project from config.json."""
+        """Load current project (--project / PIPELINE_PROJECT, else config.json)."""
         config_path = self.project_dir / "config.json"
         try:
             with open(config_path, 'r') as f:
                 config = json.load(f)
-            return config.get("current_project", None)
         except:
-            return None
+            config = {}
+        return resolve_project(config, Path(__file__).resolve().parent.parent)
     
     def setup_ui(self):
         self.root = tk.Tk()
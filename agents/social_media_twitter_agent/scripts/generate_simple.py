@@ -9,18 +9,30 @@ import json
 import os
 import sys
 import glob
-import urllib.request
-import urllib.parse
 from pathlib import Path
 from datetime import datetime
 
-def get_project_paths(config_file="config.json"):
-    """Get project-specific paths from configuration"""
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "shared"))
+from example_index import ExampleIndex
+from keyword_bank import keywords_for_prompt
+from llm_client import call_claude_api, system_blocks
+from project_context import resolve_project
+from run_trace import trace_span
+
+# Bump the version when render_example() changes so cached fragments are re-rendered
+EXAMPLE_RENDERER = "social_media_twitter_example:v1"
+
+# Keywords bank vectors for tweets: social hooks & hashtags, quote starters, benefit angles
+KEYWORD_VECTORS = ("E", "D", "F")
+
+def get_project_paths(config_file="config.json", project=None):
+    """Get project-specific paths (explicit project, else --project / PIPELINE_PROJECT, else current_project from configuration)"""
     config_path = Path(__file__).parent.parent / config_file
     try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-        project = config.get("current_project", None)
+        if project is None:
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+            project = resolve_project(config, Path(__file__).resolve().parent.parent)
         
         if project:
             return {
@@ -94,17 +106,12 @@ def load_input_content(file_mapping):
     
     return content
 
-def load_example_from_json():
-    """Load the example from labeled JSON for system prompt"""
-    example_path = Path(__file__).parent.parent / "5_labeled_json" / "twitter_example_001.json"
-    try:
-        with open(example_path, 'r', encoding='utf-8') as f:
-            example_data = json.load(f)
-        
-        # Extract the Twitter content for the prompt
-        content = example_data['twitter_content']
-        
-        example_text = f"""
+def render_example(example_data):
+    """Render the labeled Twitter example as prompt text"""
+    # Extract the Twitter content for the prompt
+    content = example_data['twitter_content']
+    
+    example_text = f"""
 **EXAMPLE OF 8.2/10 QUALITY TWITTER CONTENT:**
 
 # **Twitter Content Strategy**
@@ -157,72 +164,24 @@ def load_example_from_json():
 
 {content['optimization_notes']}
 """
-        return example_text
-        
-    except Exception as e:
-        print(f"Warning: Could not load example from JSON: {e}")
-        return "No example available."
+    return example_text
 
-def call_claude_api(prompt, config):
-    """Call Claude API using urllib"""
+def load_example_from_json():
+    """Load the example from labeled JSON for system prompt"""
+    example_path = Path(__file__).parent.parent / "5_labeled_json" / "twitter_example_001.json"
     try:
-        # Prepare the request
-        url = "https://api.anthropic.com/v1/messages"
-        
-        data = {
-            "model": config['model'],
-            "max_tokens": config['max_tokens'],
-            "temperature": config['temperature'],
-            "messages": [
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ]
-        }
+        # Rendered text is cached until the example file changes
+        return ExampleIndex(example_path.parent).render(example_path, EXAMPLE_RENDERER, render_example)
         
-        # Convert to JSON
-        json_data = json.dumps(data).encode('utf-8')
-        
-        # Create request
-        req = urllib.request.Request(url)
-        req.add_header('Content-Type', 'application/json')
-        req.add_header('x-api-key', config['anthropic_api_key'])
-        req.add_header('anthropic-version', '2023-06-01')
-        
-        print("Calling Claude API...")
-        
-        # Make the request
-        with urllib.request.urlopen(req, json_data) as response:
-            response_data = json.loads(response.read().decode('utf-8'))
-            
-        # Extract the content
-        if 'content' in response_data and len(response_data['content']) > 0:
-            return response_data['content'][0]['text']
-        else:
-            print("Error: Unexpected API response format")
-            print("Response:", response_data)
-            return None
-            
-    except urllib.error.HTTPError as e:
-        print(f"HTTP Error: {e.code} - {e.reason}")
-        error_body = e.read().decode('utf-8')
-        print(f"Error details: {error_body}")
-        return None
     except Exception as e:
-        print(f"Error calling Claude API: {e}")
-        return None
+        print(f"Warning: Could not load example from JSON: {e}")
+        return "No example available."
 
 def generate_twitter_content(input_content, system_prompt, example, config):
     """Generate Twitter content using Claude API"""
-    # Construct the full prompt
+    # The system prompt and example are identical across runs, so they go in
+    # prompt-cached system blocks; only the inputs below change per call
     full_prompt = f"""
-{system_prompt}
-
-{example}
-
----
-
 **INPUT CONTENT TO TRANSFORM:**
 
 MESSAGE HOUSE:
@@ -248,16 +207,17 @@ Transform the above input content into Twitter content following the exact struc
 Generate the Twitter content now:
 """
 
-    return call_claude_api(full_prompt, config)
+    return call_claude_api(full_prompt, config, system=system_blocks(system_prompt, example), agent="social_media_twitter")
 
-def main():
-    """
-    Main execution function with project-aware paths
+def run(project=None, config=None):
+    """Generate Twitter content for one project (Agent 0b calls this in-process)
+
+    Returns the output path, or None on failure.
     """
     print("Twitter Content Generator Starting...")
     
     # Get project-aware paths
-    paths = get_project_paths()
+    paths = get_project_paths(project=project)
     input_dir = paths["input_dir"]
     output_dir = paths["output_dir"]
     system_assets_dir = paths["system_assets_dir"]
@@ -268,7 +228,7 @@ def main():
     # Check if input directory exists
     if not input_dir.exists():
         print(f"[FAIL] Input directory not found: {input_dir}")
-        return
+        return None
     
     # Find and map input files
     print("\nDetecting input files...")
@@ -281,7 +241,7 @@ def main():
     if missing_core:
         print(f"\n[FAIL] Missing required files: {missing_core}")
         print("Please ensure all required input files are in the 1_input/ directory")
-        return
+        return None
     
     # Handle New Brand Mode: use brand_side_persona for customer_side_persona if not available
     if 'customer_side_persona.md' not in file_mapping:
@@ -301,7 +261,7 @@ def main():
         print(f"[OK] Loaded system prompt ({len(system_prompt)} chars)")
     except Exception as e:
         print(f"[FAIL] Error loading system prompt: {e}")
-        return
+        return None
     
     # Show successful file mapping
     print("\nFile mapping successful:")
@@ -312,17 +272,25 @@ def main():
     
     # Load configuration for API call
     print("\nLoading configuration...")
-    config_path = Path(__file__).parent.parent / "config.json"
-    try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-    except Exception as e:
-        print(f"[FAIL] Error loading config: {e}")
-        return
+    if config is None:
+        config_path = Path(__file__).parent.parent / "config.json"
+        try:
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+        except Exception as e:
+            print(f"[FAIL] Error loading config: {e}")
+            return None
+    
+    if 'keywords_bank.md' in input_content:
+        input_content['keywords_bank.md'] = keywords_for_prompt(
+            file_mapping['keywords_bank.md'], input_content['keywords_bank.md'], config, KEYWORD_VECTORS,
+            query=input_content.get('brand_side_persona.md')
+        )
     
     # Load example
     print("Loading example...")
-    example = load_example_from_json()
+    with trace_span("examples"):
+        example = load_example_from_json()
     
     # Generate Twitter content using Claude API
     print("\nGenerating Twitter content...")
@@ -331,7 +299,7 @@ def main():
     
     if not generated_content:
         print("[FAIL] Content generation failed")
-        return
+        return None
     
     # Save output
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -349,13 +317,20 @@ def main():
         
     except Exception as e:
         print(f"[FAIL] Error saving content: {e}")
-        return
+        return None
     
     print(f"""
 === Generation Complete ===
 Review the output in: {output_path}
 Use scripts/evaluate.py to score and provide feedback
 """)
+    
+    return output_path
+
+def main():
+    """Main execution function"""
+    if not run():
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
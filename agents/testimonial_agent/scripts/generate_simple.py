@@ -9,11 +9,22 @@ then uses Claude API to generate authentic marketing testimonials.
 import json
 import os
 import sys
-import urllib.request
-import urllib.parse
 from datetime import datetime
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "shared"))
+from example_index import ExampleIndex
+from keyword_bank import keywords_for_prompt
+from llm_client import call_claude_api, system_blocks
+from project_context import resolve_project
+from run_trace import trace_span
+
+# Bump the version when render_example() changes so cached fragments are re-rendered
+EXAMPLE_RENDERER = "testimonial_example:v1"
+
+# Keywords bank vectors for testimonials: quote starters, benefit angles, customer voice
+KEYWORD_VECTORS = ("D", "F", "G")
+
 def load_config():
     """Load configuration from config.json"""
     config_path = Path(__file__).parent.parent / "config.json"
@@ -59,56 +70,65 @@ def find_input_files(input_dir):
     
     return input_files
 
+def render_example(example_data):
+    """Render one labeled testimonial set as an Example Map block (None if not high-quality)"""
+    # Only use high-quality examples with actual content
+    overall_score = example_data.get('overall_score', 0)
+    if overall_score >= 8.0 and 'testimonials_content' in example_data:
+        content = example_data['testimonials_content']
+        
+        # Get improvement insights from detailed scores
+        insights = []
+        if 'detailed_scores' in example_data:
+            for criteria, details in example_data['detailed_scores'].items():
+                if isinstance(details, dict) and 'comments' in details:
+                    insights.append(f"- {criteria.replace('_', ' ').title()}: {details['comments']}")
+        
+        example_text = f"""
+**HIGH-QUALITY EXAMPLE (Score: {overall_score}/10):**
+
+{content}
+
+**Why this scored {overall_score}/10:**
+{chr(10).join(insights) if insights else "High-quality testimonials with perfect strategic messaging and authentic customer voice"}
+"""
+        return example_text
+    return None
+
 def load_example_from_json():
-    """Load ALL examples from labeled JSON for system prompt (Example Map)"""
+    """Load the top-scoring examples from labeled JSON for system prompt (Example Map)"""
     example_folder = Path(__file__).parent.parent / "5_labeled_json"
     
     try:
-        # Get all JSON files in the folder
-        json_files = list(example_folder.glob("*.json"))
+        # Scores come from the Example Map index - only the selected files are opened
+        index = ExampleIndex(example_folder)
+        total_files = index.count()
         
-        if not json_files:
+        if not total_files:
             print("Warning: No example files found in 5_labeled_json folder")
             return "No examples available."
         
+        top_examples = index.top_examples('testimonials_content', min_score=8.0, limit=3)
+        high_quality_count = index.count('testimonials_content', min_score=8.0)
         examples_text = []
-        print(f"Loading {len(json_files)} evaluation files for example map...")
+        print(f"Loading {len(top_examples)} of {total_files} indexed evaluation files for example map...")
         
-        for json_file in json_files:
+        for entry in top_examples:
             try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    example_data = json.load(f)
-                
-                # Only use high-quality examples with actual content
-                overall_score = example_data.get('overall_score', 0)
-                if overall_score >= 8.0 and 'testimonials_content' in example_data:
-                    content = example_data['testimonials_content']
-                    
-                    # Get improvement insights from detailed scores
-                    insights = []
-                    if 'detailed_scores' in example_data:
-                        for criteria, details in example_data['detailed_scores'].items():
-                            if isinstance(details, dict) and 'comments' in details:
-                                insights.append(f"- {criteria.replace('_', ' ').title()}: {details['comments']}")
-                    
-                    example_text = f"""
-**HIGH-QUALITY EXAMPLE (Score: {overall_score}/10):**
-
-{content}
-
-**Why this scored {overall_score}/10:**
-{chr(10).join(insights) if insights else "High-quality testimonials with perfect strategic messaging and authentic customer voice"}
-"""
+                # Rendered text is cached per file until the file changes
+                example_text = index.render(entry['path'], EXAMPLE_RENDERER, render_example)
+                if example_text:
                     examples_text.append(example_text)
                     
             except Exception as e:
-                print(f"Warning: Could not parse {json_file.name}: {e}")
+                print(f"Warning: Could not parse {entry['path'].name}: {e}")
                 continue
         
         if not examples_text:
-            # Fallback to any available file if no high-quality examples found
+            # Fallback to the best available file if no high-quality examples found
             try:
-                with open(json_files[0], 'r', encoding='utf-8') as f:
+                fallback = index.top_examples('testimonials_content', limit=1)
+                with open(fallback[0]['path'], 'r', encoding='utf-8') as f:
                     example_data = json.load(f)
                 if 'testimonials_content' in example_data:
                     content = example_data['testimonials_content']
@@ -126,7 +146,7 @@ This example demonstrates the perfect blending of strategic messaging with authe
         
         # Combine all high-quality examples (limit to top 3)
         combined_examples = "\n\n" + "="*60 + "\n\n".join(examples_text[:3])
-        print(f"Loaded {len(examples_text)} high-quality examples (8.0+ score) for learning")
+        print(f"Loaded {len(examples_text)} of {high_quality_count} high-quality examples (8.0+ score) for learning")
         
         return combined_examples
         
@@ -134,66 +154,11 @@ This example demonstrates the perfect blending of strategic messaging with authe
         print(f"Warning: Could not load examples from folder: {e}")
         return "No examples available."
 
-def call_claude_api(prompt, config):
-    """Call Claude API using urllib"""
-    try:
-        # Prepare the request
-        url = "https://api.anthropic.com/v1/messages"
-        
-        data = {
-            "model": config['model'],
-            "max_tokens": config['max_tokens'],
-            "temperature": config['temperature'],
-            "messages": [
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ]
-        }
-        
-        # Convert to JSON
-        json_data = json.dumps(data).encode('utf-8')
-        
-        # Create request
-        req = urllib.request.Request(url)
-        req.add_header('Content-Type', 'application/json')
-        req.add_header('x-api-key', config['api_key'])
-        req.add_header('anthropic-version', '2023-06-01')
-        
-        print("Calling Claude API...")
-        
-        # Make the request
-        with urllib.request.urlopen(req, json_data) as response:
-            response_data = json.loads(response.read().decode('utf-8'))
-            
-        # Extract the content
-        if 'content' in response_data and len(response_data['content']) > 0:
-            return response_data['content'][0]['text']
-        else:
-            print("Error: Unexpected API response format")
-            print("Response:", response_data)
-            return None
-            
-    except urllib.error.HTTPError as e:
-        print(f"HTTP Error: {e.code} - {e.reason}")
-        error_body = e.read().decode('utf-8')
-        print(f"Error details: {error_body}")
-        return None
-    except Exception as e:
-        print(f"Error calling Claude API: {e}")
-        return None
-
 def generate_testimonials(brand_persona, customer_persona, keywords_bank, system_prompt, example, config):
     """Generate testimonials using Claude API"""
-    # Construct the full prompt
+    # The system prompt and example are identical across runs, so they go in
+    # prompt-cached system blocks; only the inputs below change per call
     full_prompt = f"""
-{system_prompt}
-
-{example}
-
----
-
 **INPUT ASSETS TO BLEND:**
 
 **BRAND PERSONA (Strategic Messaging):**
@@ -219,7 +184,7 @@ Generate multiple testimonial formats (short, medium, long-form) with diverse cu
 Generate the testimonials now:
 """
 
-    return call_claude_api(full_prompt, config)
+    return call_claude_api(full_prompt, config, system=system_blocks(system_prompt, example), agent="testimonial")
 
 def save_output(content, output_dir):
     """Save generated content to unlabeled folder"""
@@ -239,13 +204,14 @@ def save_output(content, output_dir):
         print(f"Error saving output: {e}")
         return None
 
-def get_project_paths(config_file="config.json"):
-    """Get project-specific paths from configuration"""
+def get_project_paths(config_file="config.json", project=None):
+    """Get project-specific paths (explicit project, else --project / PIPELINE_PROJECT, else current_project from configuration)"""
     config_path = Path(__file__).parent.parent / config_file
     try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-        project = config.get("current_project", None)
+        if project is None:
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+            project = resolve_project(config, Path(__file__).resolve().parent.parent)
         
         if project:
             return {
@@ -266,12 +232,15 @@ def get_project_paths(config_file="config.json"):
             "output_dir": Path(__file__).parent.parent / "3_unlabeled"
         }
 
-def main():
-    """Main execution function"""
+def run(project=None, config=None):
+    """Generate testimonials for one project (Agent 0b calls this in-process)
+
+    Returns the output path, or None on failure.
+    """
     print("Testimonial Generator Starting...")
     
     # Get project-aware paths
-    paths = get_project_paths()
+    paths = get_project_paths(project=project)
     input_dir = paths["input_dir"]
     system_assets_dir = paths["system_assets_dir"]
     output_dir = paths["output_dir"]
@@ -285,12 +254,12 @@ def main():
     if 'keywords_bank' not in input_files:
         print("Error: Missing keywords_bank file. Please ensure Agent 5 has completed.")
         print("Expected: keywords_bank_expansion_*.md (from Agent 5)")
-        sys.exit(1)
+        return None
     
     if 'brand_persona' not in input_files:
         print("Error: Missing brand_persona file. Please ensure Agent 2 has completed.")
         print("Expected: userstories_*.md (from Agent 2)")
-        sys.exit(1)
+        return None
     
     # Handle New Brand Mode: use brand_persona for customer_persona if not available
     if 'customer_persona' not in input_files:
@@ -304,31 +273,35 @@ def main():
     
     # Load configuration
     print("Loading configuration...")
-    config = load_config()
+    if config is None:
+        config = load_config()
     
     # Load input files
     print("Loading brand persona...")
     brand_persona = load_file(input_files['brand_persona'])
     if not brand_persona:
-        sys.exit(1)
+        return None
     
     print("Loading customer persona...")
     customer_persona = load_file(input_files['customer_persona'])
     if not customer_persona:
-        sys.exit(1)
+        return None
     
     print("Loading keywords bank...")
     keywords_bank = load_file(input_files['keywords_bank'])
     if not keywords_bank:
-        sys.exit(1)
+        return None
+    keywords_bank = keywords_for_prompt(input_files['keywords_bank'], keywords_bank, config, KEYWORD_VECTORS,
+                                        query=customer_persona)
     
     print("Loading system prompt...")
     system_prompt = load_file(system_prompt_file)
     if not system_prompt:
-        sys.exit(1)
+        return None
     
     print("Loading example...")
-    example = load_example_from_json()
+    with trace_span("examples"):
+        example = load_example_from_json()
     
     # Generate testimonials
     print("Generating testimonials...")
@@ -337,13 +310,13 @@ def main():
         system_prompt, example, config
     )
     if not generated_content:
-        sys.exit(1)
+        return None
     
     # Save output
     print("Saving output...")
     output_path = save_output(generated_content, output_dir)
     if not output_path:
-        sys.exit(1)
+        return None
     
     print(f"""
 SUCCESS! Testimonials generated successfully.
@@ -361,6 +334,13 @@ Next steps:
 2. Evaluate and score them using scripts/evaluate.py
 3. Use high-scoring testimonials in marketing campaigns
 """)
+    
+    return output_path
+
+def main():
+    """Main execution function"""
+    if not run():
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
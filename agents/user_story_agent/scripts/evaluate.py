@@ -8,12 +8,17 @@ and saving labeled results to 5_labeled_json/
 
 import json
 import os
+import sys
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk, scrolledtext
 from datetime import datetime
 from pathlib import Path
 import traceback
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "shared"))
+from example_index import record_example
+from project_context import resolve_project
+
 class UserStoryEvaluator:
     def __init__(self):
         # Set up paths
@@ -57,14 +62,14 @@ class UserStoryEvaluator:
         self.setup_ui()
     
     def _load_current_project(self):
-        """Load current project from config.json."""
+        """Load current project (--project / PIPELINE_PROJECT, else config.json)."""
         config_path = self.project_dir / "config.json"
         try:
             with open(config_path, 'r') as f:
                 config = json.load(f)
-            return config.get("current_project", None)
         except:
-            return None
+            config = {}
+        return resolve_project(config, Path(__file__).resolve().parent.parent)
     
     def setup_ui(self):
         self.root = tk.Tk()
@@ -365,6 +370,12 @@ class UserStoryEvaluator:
             with open(file_path, 'w', encoding='utf-8') as f:
                 json.dump(evaluation_data, f, indent=2, ensure_ascii=False)
             
+            # Keep the Example Map index current (generators read scores from it)
+            try:
+                record_example(file_path, evaluation_data, project=self.current_project)
+            except Exception as e:
+                print(f"Warning: Could not update example index: {e}")
+            
             messagebox.showinfo("Success", f"Evaluation saved to {filename}")
             
         except Exception as e:
@@ -9,12 +9,30 @@ then uses Claude API to generate detailed user personas based on real customer e
 import json
 import os
 import sys
-import urllib.request
-import urllib.parse
 import csv
+import random
 from datetime import datetime
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "shared"))
+from project_context import resolve_project
+# Sibling review_* modules must also import when Agent 0b loads this script in-process
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from llm_client import call_claude_api, system_blocks
+from run_trace import trace_span
+from review_dedupe import DEFAULT_MAX_DISTINCT, DEFAULT_THRESHOLD, NearDuplicateIndex
+from review_selection import select_representatives
+from review_summaries import ReviewSummarizer
+
+# Reviews kept per sentiment bucket (config.json "review_sample_sizes" overrides)
+DEFAULT_SAMPLE_SIZES = {'positive': 15, 'negative': 15, 'mixed': 10}
+# Fixed seed so the same CSVs always produce the same prompt (and response cache hits)
+DEFAULT_SAMPLE_SEED = 42
+# Clustered selection (config.json "review_selection": "clustered" | "sample"):
+# reviews sampled per bucket as clustering candidates, and prompt tokens per bucket
+DEFAULT_CANDIDATE_POOL = 1000
+DEFAULT_TOKEN_BUDGETS = {'positive': 3000, 'negative': 3000, 'mixed': 2000}
+
 def load_config():
     """Load configuration from config.json"""
     config_path = Path(__file__).parent.parent / "config.json"
@@ -41,60 +59,154 @@ def load_file(file_path):
         print(f"Error reading {file_path}: {e}")
         return None
 
-def load_csv_reviews(file_path):
-    """Load and parse CSV review file"""
+class ReviewReservoir:
+    """Uniform fixed-size sample of a review stream (reservoir sampling)"""
+    
+    def __init__(self, capacity, rng):
+        self.capacity = capacity
+        self.rng = rng
+        self.items = []
+        self.seen = 0
+    
+    def add(self, review):
+        """Offer one review; keeps each review seen so far with equal probability"""
+        self.seen += 1
+        if len(self.items) < self.capacity:
+            self.items.append((self.seen, review))
+        else:
+            slot = self.rng.randrange(self.seen)
+            if slot < self.capacity:
+                self.items[slot] = (self.seen, review)
+    
+    def sample(self):
+        """Sampled reviews in their original file order"""
+        return [review for _, review in sorted(self.items, key=lambda item: item[0])]
+
+def iter_csv_reviews(file_path):
+    """Yield CSV review rows one at a time (never holds the whole file)"""
     try:
-        reviews = []
         with open(file_path, 'r', encoding='utf-8', newline='') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                reviews.append(row)
-        return reviews
+            for row in csv.DictReader(f):
+                yield row
     except FileNotFoundError:
         print(f"Error: CSV file not found: {file_path}")
-        return []
     except Exception as e:
         print(f"Error reading CSV {file_path}: {e}")
-        return []
-
-def load_all_reviews(input_dir):
-    """Load all CSV review files from input directory"""
-    all_reviews = {
-        'positive': [],
-        'negative': [],
-        'mixed': []
-    }
-    
-    csv_files = list(input_dir.glob("*.csv"))
+
+def classify_review(review, file_hint=None):
+    """Sentiment bucket for one review: the filename hint if any, else its Stars rating"""
+    if file_hint:
+        return file_hint
+    try:
+        stars = int(review.get('Stars', 0))
+    except (ValueError, TypeError):
+        return 'mixed'
+    if stars >= 4:
+        return 'positive'
+    elif stars <= 2:
+        return 'negative'
+    return 'mixed'
+
+def iter_labeled_reviews(input_dir):
+    """Yield (csv file name, sentiment bucket, review) for every review, file by file"""
+    csv_files = sorted(input_dir.glob("*.csv"))
     if not csv_files:
         print(f"No CSV files found in {input_dir}")
-        return all_reviews
     
     for csv_file in csv_files:
         print(f"Loading reviews from: {csv_file.name}")
-        reviews = load_csv_reviews(csv_file)
         
         # Categorize reviews by filename or star rating
+        file_hint = None
         if 'positive' in csv_file.name.lower():
-            all_reviews['positive'].extend(reviews)
+            file_hint = 'positive'
         elif 'negative' in csv_file.name.lower():
-            all_reviews['negative'].extend(reviews)
-        else:
-            # Categorize by star rating if filename doesn't indicate sentiment
-            for review in reviews:
-                try:
-                    stars = int(review.get('Stars', 0))
-                    if stars >= 4:
-                        all_reviews['positive'].append(review)
-                    elif stars <= 2:
-                        all_reviews['negative'].append(review)
-                    else:
-                        all_reviews['mixed'].append(review)
-                except (ValueError, TypeError):
-                    all_reviews['mixed'].append(review)
+            file_hint = 'negative'
+        
+        for review in iter_csv_reviews(csv_file):
+            yield csv_file.name, classify_review(review, file_hint), review
+
+def load_all_reviews(input_dir, sample_sizes=None, seed=DEFAULT_SAMPLE_SEED, dedupe_threshold=DEFAULT_THRESHOLD,
+                     dedupe_max_distinct=DEFAULT_MAX_DISTINCT):
+    """Stream all CSV review files into bounded per-sentiment samples
     
+    Each bucket keeps a uniform reservoir sample plus a count of every review
+    seen. Near-duplicates (see review_dedupe.py) are folded into the first
+    matching review before sampling; sampled reviews carry "_duplicates", the
+    number of reviews folded into them. dedupe_threshold=None turns this off;
+    each bucket's index holds at most dedupe_max_distinct representatives.
+    """
+    sample_sizes = sample_sizes or DEFAULT_SAMPLE_SIZES
+    rng = random.Random(seed)
+    buckets = ('positive', 'negative', 'mixed')
+    reservoirs = {
+        bucket: ReviewReservoir(sample_sizes.get(bucket, DEFAULT_SAMPLE_SIZES[bucket]), rng)
+        for bucket in buckets
+    }
+    dedupers = {
+        bucket: NearDuplicateIndex(dedupe_threshold, dedupe_max_distinct) for bucket in buckets
+    } if dedupe_threshold else {}
+    totals = {bucket: 0 for bucket in buckets}
+    
+    for _, bucket, review in iter_labeled_reviews(input_dir):
+        totals[bucket] += 1
+        if dedupers:
+            review_id, is_new = dedupers[bucket].add(review.get('Review Content') or '', review)
+            if not is_new:
+                continue
+            review['_dedupe_id'] = review_id
+        reservoirs[bucket].add(review)
+    
+    all_reviews = {bucket: reservoir.sample() for bucket, reservoir in reservoirs.items()}
+    for bucket, deduper in dedupers.items():
+        # Largest duplicate clusters first (they are the best-attested reviews), then the sample
+        capacity = reservoirs[bucket].capacity
+        top = deduper.top_clusters(capacity)
+        top_ids = {review_id for review_id, _, _ in top}
+        promoted = [dict(example, _dedupe_id=review_id) for review_id, _, example in top]
+        sampled = [review for review in all_reviews[bucket] if review.get('_dedupe_id') not in top_ids]
+        sampled = sampled[:max(0, capacity - len(promoted))]
+        
+        # "_represents": rows of this bucket each kept review stands for (weights clustering)
+        promoted_rows = sum(copies for _, copies, _ in top)
+        sampled_weight = (totals[bucket] - promoted_rows) / len(sampled) if sampled else 0
+        for review in promoted + sampled:
+            review['_duplicates'] = deduper.duplicate_count(review.pop('_dedupe_id', None))
+            review['_represents'] = sampled_weight
+        for review in promoted:
+            review['_represents'] = 1 + review['_duplicates']
+        all_reviews[bucket] = promoted + sampled
+    
+    all_reviews['counts'] = totals
+    all_reviews['unique_counts'] = {bucket: reservoir.seen for bucket, reservoir in reservoirs.items()}
+    all_reviews['duplicate_clusters'] = {bucket: deduper.clusters() for bucket, deduper in dedupers.items()}
     return all_reviews
 
+def select_review_sets(reviews_data, sample_sizes, token_budgets, seed=DEFAULT_SAMPLE_SEED):
+    """Replace each bucket's candidate pool with its cluster medoids (see review_selection.py)"""
+    selected = {key: value for key, value in reviews_data.items() if key not in ('positive', 'negative', 'mixed')}
+    for bucket in ('positive', 'negative', 'mixed'):
+        selected[bucket] = select_representatives(
+            reviews_data[bucket],
+            sample_sizes.get(bucket, DEFAULT_SAMPLE_SIZES[bucket]),
+            token_budgets.get(bucket, DEFAULT_TOKEN_BUDGETS[bucket]),
+            seed=seed,
+        )
+    return selected
+
+def format_review_entry(i, review, bucket):
+    """Format one review for the prompt"""
+    entry = f"**Review {i}:**\n"
+    entry += f"- Username: {review.get('Username', 'Anonymous')}\n"
+    entry += f"- Stars: {review.get('Stars', 'N/A')}\n"
+    entry += f"- Location: {review.get('Area', 'Unknown')}\n"
+    if review.get('_cluster_share'):
+        entry += f"- Represents: ~{review['_cluster_share']:.0%} of {bucket} reviews\n"
+    if review.get('_duplicates'):
+        entry += f"- Near-duplicates: {review['_duplicates']} other reviews say almost exactly this\n"
+    entry += f"- Content: \"{review.get('Review Content', '')}\"\n\n"
+    return entry
+
 def format_reviews_for_prompt(reviews_data):
     """Format review data for Claude prompt"""
     formatted_content = "**CUSTOMER REVIEW DATA:**\n\n"
@@ -103,46 +215,47 @@ def format_reviews_for_prompt(reviews_data):
     if reviews_data['positive']:
         formatted_content += "### **POSITIVE REVIEWS (4-5 Stars):**\n\n"
         for i, review in enumerate(reviews_data['positive'][:15], 1):  # Limit to avoid token limits
-            formatted_content += f"**Review {i}:**\n"
-            formatted_content += f"- Username: {review.get('Username', 'Anonymous')}\n"
-            formatted_content += f"- Stars: {review.get('Stars', 'N/A')}\n"
-            formatted_content += f"- Location: {review.get('Area', 'Unknown')}\n"
-            formatted_content += f"- Content: \"{review.get('Review Content', '')}\"\n\n"
+            formatted_content += format_review_entry(i, review, 'positive')
     
     # Negative Reviews Section
     if reviews_data['negative']:
         formatted_content += "### **NEGATIVE REVIEWS (1-3 Stars):**\n\n"
         for i, review in enumerate(reviews_data['negative'][:15], 1):  # Limit to avoid token limits
-            formatted_content += f"**Review {i}:**\n"
-            formatted_content += f"- Username: {review.get('Username', 'Anonymous')}\n"
-            formatted_content += f"- Stars: {review.get('Stars', 'N/A')}\n"
-            formatted_content += f"- Location: {review.get('Area', 'Unknown')}\n"
-            formatted_content += f"- Content: \"{review.get('Review Content', '')}\"\n\n"
+            formatted_content += format_review_entry(i, review, 'negative')
     
     # Mixed Reviews Section (if any)
     if reviews_data['mixed']:
         formatted_content += "### **MIXED REVIEWS (3 Stars):**\n\n"
         for i, review in enumerate(reviews_data['mixed'][:10], 1):  # Limit to avoid token limits
-            formatted_content += f"**Review {i}:**\n"
-            formatted_content += f"- Username: {review.get('Username', 'Anonymous')}\n"
-            formatted_content += f"- Stars: {review.get('Stars', 'N/A')}\n"
-            formatted_content += f"- Location: {review.get('Area', 'Unknown')}\n"
-            formatted_content += f"- Content: \"{review.get('Review Content', '')}\"\n\n"
-    
-    # Summary Statistics
-    total_positive = len(reviews_data['positive'])
-    total_negative = len(reviews_data['negative'])
-    total_mixed = len(reviews_data['mixed'])
+            formatted_content += format_review_entry(i, review, 'mixed')
+    
+    # Summary Statistics (full counts - the lists above are samples)
+    counts = reviews_data.get('counts') or {bucket: len(reviews_data[bucket]) for bucket in ('positive', 'negative', 'mixed')}
+    total_positive = counts['positive']
+    total_negative = counts['negative']
+    total_mixed = counts['mixed']
     total_reviews = total_positive + total_negative + total_mixed
     
     formatted_content += f"### **REVIEW SUMMARY:**\n"
     formatted_content += f"- Total Reviews: {total_reviews}\n"
     formatted_content += f"- Positive (4-5 stars): {total_positive}\n"
     formatted_content += f"- Negative (1-2 stars): {total_negative}\n"
-    formatted_content += f"- Mixed (3 stars): {total_mixed}\n\n"
+    formatted_content += f"- Mixed (3 stars): {total_mixed}\n"
+    unique_counts = reviews_data.get('unique_counts')
+    if unique_counts and sum(unique_counts.values()) < total_reviews:
+        formatted_content += f"- Distinct Reviews (near-duplicates folded): {sum(unique_counts.values())}\n"
+    formatted_content += "\n"
     
     return formatted_content
 
+def format_corpus_summary(summary, review_count):
+    """Format the map-reduce summary of the full review set for the prompt"""
+    formatted_content = f"### **CORPUS-WIDE REVIEW ANALYSIS ({review_count} reviews summarized):**\n\n"
+    formatted_content += "Use this analysis to decide which customer segments exist and how large they are; "
+    formatted_content += "use the individual reviews above for authentic customer voice.\n\n"
+    formatted_content += f"{summary}\n\n"
+    return formatted_content
+
 def load_example_from_json():
     """Load the example from labeled JSON for system prompt"""
     example_path = Path(__file__).parent.parent / "5_labeled_json"
@@ -176,66 +289,11 @@ This example demonstrates the quality, depth, and emotional authenticity we're t
         print(f"Warning: Could not load example from JSON: {e}")
         return "No example available."
 
-def call_claude_api(prompt, config):
-    """Call Claude API using urllib"""
-    try:
-        # Prepare the request
-        url = "https://api.anthropic.com/v1/messages"
-        
-        data = {
-            "model": config['model'],
-            "max_tokens": config['max_tokens'],
-            "temperature": config['temperature'],
-            "messages": [
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ]
-        }
-        
-        # Convert to JSON
-        json_data = json.dumps(data).encode('utf-8')
-        
-        # Create request
-        req = urllib.request.Request(url)
-        req.add_header('Content-Type', 'application/json')
-        req.add_header('x-api-key', config['anthropic_api_key'])
-        req.add_header('anthropic-version', '2023-06-01')
-        
-        print("Calling Claude API...")
-        
-        # Make the request
-        with urllib.request.urlopen(req, json_data) as response:
-            response_data = json.loads(response.read().decode('utf-8'))
-            
-        # Extract the content
-        if 'content' in response_data and len(response_data['content']) > 0:
-            return response_data['content'][0]['text']
-        else:
-            print("Error: Unexpected API response format")
-            print("Response:", response_data)
-            return None
-            
-    except urllib.error.HTTPError as e:
-        print(f"HTTP Error: {e.code} - {e.reason}")
-        error_body = e.read().decode('utf-8')
-        print(f"Error details: {error_body}")
-        return None
-    except Exception as e:
-        print(f"Error calling Claude API: {e}")
-        return None
-
 def generate_user_stories(reviews_content, system_prompt, example, config):
     """Generate user stories using Claude API"""
-    # Construct the full prompt
+    # The system prompt and example are identical across runs, so they go in
+    # prompt-cached system blocks; only the inputs below change per call
     full_prompt = f"""
-{system_prompt}
-
-{example}
-
----
-
 {reviews_content}
 
 ---
@@ -246,7 +304,7 @@ Transform the above customer review data into detailed user personas following t
 Generate the user personas now:
 """
 
-    return call_claude_api(full_prompt, config)
+    return call_claude_api(full_prompt, config, system=system_blocks(system_prompt, example), agent="user_story_real_reviews")
 
 def save_output(content, output_dir):
     """Save generated content to unlabeled folder"""
@@ -266,13 +324,14 @@ def save_output(content, output_dir):
         print(f"Error saving output: {e}")
         return None
 
-def get_project_paths(config_file="config.json"):
-    """Get project-specific paths from configuration"""
+def get_project_paths(config_file="config.json", project=None):
+    """Get project-specific paths (explicit project, else --project / PIPELINE_PROJECT, else current_project from configuration)"""
     config_path = Path(__file__).parent.parent / config_file
     try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-        project = config.get("current_project", None)
+        if project is None:
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+            project = resolve_project(config, Path(__file__).resolve().parent.parent)
         
         if project:
             # New project-based structure
@@ -296,12 +355,15 @@ def get_project_paths(config_file="config.json"):
             "output_dir": Path(__file__).parent.parent / "3_unlabeled"
         }
 
-def main():
-    """Main execution function"""
+def run(project=None, config=None):
+    """Generate customer-side user stories from review CSVs for one project (Agent 0b calls this in-process)
+
+    Returns the output path, or None on failure.
+    """
     print("User Story Real Reviews Generator Starting...")
     
     # Get project-aware paths
-    paths = get_project_paths()
+    paths = get_project_paths(project=project)
     input_dir = paths["input_dir"]
     system_assets_dir = paths["system_assets_dir"]
     output_dir = paths["output_dir"]
@@ -313,7 +375,7 @@ def main():
     if not csv_files:
         print(f"Error: No .csv files found in {input_dir}")
         print("Please place customer review CSV files in 1_input/")
-        sys.exit(1)
+        return None
     
     print(f"Found {len(csv_files)} CSV file(s):")
     for file in csv_files:
@@ -321,44 +383,81 @@ def main():
     
     # Load configuration
     print("Loading configuration...")
-    config = load_config()
+    if config is None:
+        config = load_config()
     
     # Load reviews
     print("Loading customer reviews...")
-    reviews_data = load_all_reviews(input_dir)
+    sample_sizes = {**DEFAULT_SAMPLE_SIZES, **config.get('review_sample_sizes', {})}
+    seed = config.get('review_sample_seed', DEFAULT_SAMPLE_SEED)
+    dedupe_threshold = config.get('review_dedupe_threshold', DEFAULT_THRESHOLD) if config.get('review_dedupe', True) else None
+    dedupe_max_distinct = config.get('review_dedupe_max_distinct', DEFAULT_MAX_DISTINCT)
+    clustered = config.get('review_selection', 'clustered') == 'clustered'
+    if clustered:
+        # Sample a larger candidate pool, then keep one medoid per review cluster
+        pool_size = config.get('review_candidate_pool', DEFAULT_CANDIDATE_POOL)
+        pool_sizes = {bucket: max(pool_size, size) for bucket, size in sample_sizes.items()}
+        reviews_data = load_all_reviews(input_dir, pool_sizes, seed, dedupe_threshold, dedupe_max_distinct)
+    else:
+        reviews_data = load_all_reviews(input_dir, sample_sizes, seed, dedupe_threshold, dedupe_max_distinct)
+    counts = reviews_data['counts']
     
-    total_reviews = len(reviews_data['positive']) + len(reviews_data['negative']) + len(reviews_data['mixed'])
+    total_reviews = sum(counts.values())
     if total_reviews == 0:
         print("Error: No valid reviews found in CSV files")
-        sys.exit(1)
+        return None
     
     print(f"Loaded {total_reviews} total reviews:")
-    print(f"  - Positive: {len(reviews_data['positive'])}")
-    print(f"  - Negative: {len(reviews_data['negative'])}")
-    print(f"  - Mixed: {len(reviews_data['mixed'])}")
+    print(f"  - Positive: {counts['positive']} (sampled {len(reviews_data['positive'])})")
+    print(f"  - Negative: {counts['negative']} (sampled {len(reviews_data['negative'])})")
+    print(f"  - Mixed: {counts['mixed']} (sampled {len(reviews_data['mixed'])})")
+    
+    unique_counts = reviews_data['unique_counts']
+    for bucket, clusters in reviews_data['duplicate_clusters'].items():
+        folded = counts[bucket] - unique_counts[bucket]
+        if not folded:
+            continue
+        print(f"Near-duplicates: {folded} {bucket} reviews folded into {unique_counts[bucket]} distinct reviews")
+        for copies, snippet in clusters:
+            print(f"  - {copies}x \"{snippet}\"")
+    
+    if clustered:
+        token_budgets = {**DEFAULT_TOKEN_BUDGETS, **config.get('review_token_budgets', {})}
+        reviews_data = select_review_sets(reviews_data, sample_sizes, token_budgets, seed)
+        print("Selected representative reviews: " + ", ".join(
+            f"{len(reviews_data[bucket])} {bucket}" for bucket in ('positive', 'negative', 'mixed')))
     
     # Format reviews for prompt
     reviews_content = format_reviews_for_prompt(reviews_data)
     
+    if config.get('review_map_reduce', {}).get('enabled', False):
+        print("Summarizing the full review set (map-reduce)...")
+        corpus_summary = ReviewSummarizer(config).summarize(iter_labeled_reviews(input_dir))
+        if corpus_summary:
+            reviews_content += format_corpus_summary(*corpus_summary)
+        else:
+            print("Warning: Map-reduce summary failed - continuing with the selected reviews only")
+    
     print("Loading system prompt...")
     system_prompt = load_file(system_prompt_file)
     if not system_prompt:
-        sys.exit(1)
+        return None
     
     print("Loading example...")
-    example = load_example_from_json()
+    with trace_span("examples"):
+        example = load_example_from_json()
     
     # Generate user stories
     print("Generating user stories from reviews...")
     generated_content = generate_user_stories(reviews_content, system_prompt, example, config)
     if not generated_content:
-        sys.exit(1)
+        return None
     
     # Save output
     print("Saving output...")
     output_path = save_output(generated_content, output_dir)
     if not output_path:
-        sys.exit(1)
+        return None
     
     print(f"""
 SUCCESS! User stories generated from customer reviews.
@@ -372,6 +471,13 @@ Next steps:
 2. Evaluate and score them using scripts/evaluate.py
 3. Move to 5_labeled_json/ when reviewed for system learning
 """)
+    
+    return output_path
+
+def main():
+    """Main execution function"""
+    if not run():
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Review Detection (No external dependencies)
+
+Streaming MinHash + LSH pass used by load_all_reviews(). Templated 5-star
+text, reposts and the same review posted under several product variants are
+folded into one representative that carries a duplicate count, so they no
+longer compete for prompt slots.
+
+- Shingles: word 3-grams of the lowercased review text
+- MinHash: one-permutation hashing (each shingle hashed once with CRC-32,
+  then binned) with rotation densification, so a signature costs
+  O(review length)
+- LSH: 16 bands x 4 rows; band hits are confirmed by estimated Jaccard
+  similarity against the representative (default threshold 0.8)
+
+One pass over the CSVs, roughly linear in the number of reviews. Each
+indexed distinct review costs about 1.8 KB (signature plus 16 band entries),
+so the index stops growing at max_distinct representatives (default 10,000,
+about 18 MB): later reviews are still folded into the indexed ones, but new
+distinct reviews past the cap pass through unindexed, keeping memory
+constant however large the export. One row of each duplicate cluster is
+kept, so the loader can put the largest clusters in front of the random
+sample.
+"""
+
+import re
+import zlib
+from array import array
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_MAX_DISTINCT = 10000
+SNIPPET_LENGTH = 80
+
+EMPTY_BIN = (1 << 32) - 1
+WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+def shingles(text):
+    """Set of word n-grams (the whole text for reviews shorter than one shingle)"""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) <= SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(text):
+    """NUM_PERM-slot MinHash signature, or None for reviews without words"""
+    terms = shingles(text)
+    if not terms:
+        return None
+
+    signature = [EMPTY_BIN] * NUM_PERM
+    for term in terms:
+        h = zlib.crc32(term.encode('utf-8'))
+        slot, value = h % NUM_PERM, h // NUM_PERM
+        if value < signature[slot]:
+            signature[slot] = value
+
+    # Densify: an empty slot borrows the next filled slot's value, offset by the distance
+    if EMPTY_BIN in signature:
+        original = list(signature)
+        for slot in range(NUM_PERM):
+            distance = 0
+            while original[(slot + distance) % NUM_PERM] == EMPTY_BIN:
+                distance += 1
+            signature[slot] = original[(slot + distance) % NUM_PERM] + distance
+    return array('I', signature)
+
+
+def estimated_similarity(first, second):
+    """Fraction of matching MinHash slots (estimates Jaccard similarity)"""
+    return sum(a == b for a, b in zip(first, second)) / NUM_PERM
+
+
+class NearDuplicateIndex:
+    """Assigns each review to the first earlier review it nearly duplicates"""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, max_distinct=DEFAULT_MAX_DISTINCT):
+        self.threshold = threshold
+        self.max_distinct = max_distinct
+        self.signatures = []
+        self.duplicates = array('I')
+        self.examples = {}
+        self.bands = [{} for _ in range(BANDS)]
+
+    def add(self, text, review=None):
+        """Return (representative id, is_new); id is None for reviews without words
+
+        review is the row being added; the first duplicate row of each cluster
+        is kept as the cluster's example (see top_clusters()). Once the index
+        holds max_distinct representatives, new distinct reviews get id None.
+        """
+        signature = minhash_signature(text)
+        if signature is None:
+            return None, True
+
+        keys = [hash(tuple(signature[b * ROWS:(b + 1) * ROWS])) for b in range(BANDS)]
+        checked = set()
+        for band, key in zip(self.bands, keys):
+            candidate = band.get(key)
+            if candidate is None or candidate in checked:
+                continue
+            checked.add(candidate)
+            if estimated_similarity(signature, self.signatures[candidate]) >= self.threshold:
+                self.duplicates[candidate] += 1
+                if candidate not in self.examples:
+                    self.examples[candidate] = review if review is not None else {'Review Content': text}
+                return candidate, False
+
+        review_id = len(self.signatures)
+        if self.max_distinct is not None and review_id >= self.max_distinct:
+            return None, True
+        self.signatures.append(signature)
+        self.duplicates.append(0)
+        for band, key in zip(self.bands, keys):
+            band.setdefault(key, review_id)
+        return review_id, True
+
+    def duplicate_count(self, review_id):
+        """Number of later reviews folded into this one"""
+        return 0 if review_id is None else self.duplicates[review_id]
+
+    def top_clusters(self, limit):
+        """Largest duplicate clusters as (representative id, copies, example review)"""
+        largest = sorted(self.examples, key=lambda review_id: self.duplicates[review_id], reverse=True)
+        return [(review_id, self.duplicates[review_id] + 1, self.examples[review_id]) for review_id in largest[:limit]]
+
+    def clusters(self, limit=5):
+        """Largest duplicate clusters as (copies including the representative, snippet)"""
+        return [
+            (copies, " ".join((example.get('Review Content') or '').split())[:SNIPPET_LENGTH])
+            for _, copies, example in self.top_clusters(limit)
+        ]
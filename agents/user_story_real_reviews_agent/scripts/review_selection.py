@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Representative Review Selection (No external dependencies)
+
+Picks the reviews that reach the persona prompt by content instead of file
+order. Each sentiment bucket's candidate pool (the reservoir sample from
+load_all_reviews) is:
+
+1. Vectorized as TF-IDF over hashed word unigrams + bigrams (sparse dicts)
+2. Clustered with seeded spherical k-means (k = number of prompt slots)
+3. Reduced to one medoid per cluster - the member closest to its centroid -
+   largest clusters first, until the bucket's token budget is spent
+
+So the prompt covers as many distinct customer segments as the budget
+allows, and each selected review carries the share of reviews it stands for
+(near-duplicates folded by review_dedupe.py count towards their cluster).
+Pure Python: a 1,000-review pool clusters in well under a second.
+"""
+
+import math
+import random
+import re
+import zlib
+
+HASH_DIM = 1 << 18
+KMEANS_ITERATIONS = 12
+# Prompt lines around each review (username, stars, location labels)
+REVIEW_OVERHEAD_TOKENS = 25
+
+WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+def estimate_tokens(text):
+    """Rough token count for budgeting (about 4 characters per token)"""
+    return len(text) // 4 + 1
+
+
+def hashed_features(text):
+    """Term counts over hashed unigrams and bigrams (stable across runs, unlike hash())"""
+    words = WORD_PATTERN.findall(text.lower())
+    terms = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    counts = {}
+    for term in terms:
+        index = zlib.crc32(term.encode('utf-8')) % HASH_DIM
+        counts[index] = counts.get(index, 0) + 1
+    return counts
+
+
+def tfidf_vectors(texts):
+    """L2-normalized sparse TF-IDF vectors ({feature: weight}) for a list of texts"""
+    term_counts = [hashed_features(text) for text in texts]
+    document_frequency = {}
+    for counts in term_counts:
+        for index in counts:
+            document_frequency[index] = document_frequency.get(index, 0) + 1
+
+    total = len(texts)
+    vectors = []
+    for counts in term_counts:
+        vector = {
+            index: (1 + math.log(count)) * (math.log((1 + total) / (1 + document_frequency[index])) + 1)
+            for index, count in counts.items()
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        vectors.append({index: weight / norm for index, weight in vector.items()} if norm else {})
+    return vectors
+
+
+def dot(sparse, dense):
+    """Dot product of a sparse vector with a (sparse or dense) dict"""
+    return sum(weight * dense.get(index, 0.0) for index, weight in sparse.items())
+
+
+def normalized_centroid(members, member_weights=None):
+    """Unit-length (weighted) mean direction of a list of sparse vectors"""
+    centroid = {}
+    for vector, scale in zip(members, member_weights or [1] * len(members)):
+        for index, weight in vector.items():
+            centroid[index] = centroid.get(index, 0.0) + weight * scale
+    norm = math.sqrt(sum(weight * weight for weight in centroid.values()))
+    return {index: weight / norm for index, weight in centroid.items()} if norm else {}
+
+
+def spherical_kmeans(vectors, k, seed=42, iterations=KMEANS_ITERATIONS, weights=None):
+    """Cluster unit vectors by cosine similarity; returns a cluster label per vector
+
+    Seeds with k-means++ (deterministic for a given seed) and stops early once
+    assignments no longer change. weights make a vector count as that many
+    identical points, in seeding and in the centroids.
+    """
+    count = len(vectors)
+    k = max(1, min(k, count))
+    weights = weights or [1] * count
+    rng = random.Random(seed)
+
+    # k-means++ seeding on cosine distance
+    first = rng.choices(range(count), weights=weights)[0]
+    centroids = [vectors[first]]
+    closest = [1.0 - dot(vector, centroids[0]) for vector in vectors]
+    while len(centroids) < k:
+        total = sum(distance * weight for distance, weight in zip(closest, weights))
+        if total <= 0:
+            break
+        target = rng.random() * total
+        for i, distance in enumerate(closest):
+            target -= distance * weights[i]
+            if target <= 0:
+                break
+        centroids.append(vectors[i])
+        closest = [min(current, 1.0 - dot(vector, vectors[i])) for current, vector in zip(closest, vectors)]
+
+    labels = [-1] * count
+    for _ in range(iterations):
+        changed = False
+        for i, vector in enumerate(vectors):
+            best = max(range(len(centroids)), key=lambda c: dot(vector, centroids[c]))
+            if best != labels[i]:
+                labels[i] = best
+                changed = True
+        if not changed:
+            break
+
+        members = [[] for _ in centroids]
+        member_weights = [[] for _ in centroids]
+        for label, vector, weight in zip(labels, vectors, weights):
+            members[label].append(vector)
+            member_weights[label].append(weight)
+        centroids = [normalized_centroid(group, group_weights) if group else centroid
+                     for group, group_weights, centroid in zip(members, member_weights, centroids)]
+
+    return labels
+
+
+def select_representatives(reviews, max_reviews, token_budget, seed=42, text_field='Review Content'):
+    """Pick up to max_reviews medoid reviews, one per cluster, within token_budget
+
+    Clusters are visited largest first. Each contributes the member closest
+    to its centroid that still fits the remaining budget. Every returned
+    review gets a "_cluster_share" entry: the fraction of the pool its cluster
+    holds. Members are weighted by "_represents" (rows of the bucket a
+    sampled review stands for, set by the loader) or else by 1 + "_duplicates"
+    (near-duplicates folded into it, see review_dedupe.py). Returned in
+    cluster-size order.
+    """
+    if not reviews or max_reviews <= 0:
+        return []
+
+    texts = [review.get(text_field, '') or '' for review in reviews]
+    weights = [review.get('_represents') or 1 + review.get('_duplicates', 0) for review in reviews]
+    total_weight = sum(weights)
+    vectors = tfidf_vectors(texts)
+    labels = spherical_kmeans(vectors, max_reviews, seed=seed, weights=weights)
+
+    clusters = {}
+    for i, label in enumerate(labels):
+        clusters.setdefault(label, []).append(i)
+
+    selected = []
+    remaining = token_budget
+    for members in sorted(clusters.values(), key=lambda group: sum(weights[i] for i in group), reverse=True):
+        if len(selected) >= max_reviews:
+            break
+        centroid = normalized_centroid([vectors[i] for i in members], [weights[i] for i in members])
+        for i in sorted(members, key=lambda m: dot(vectors[m], centroid), reverse=True):
+            cost = estimate_tokens(texts[i]) + REVIEW_OVERHEAD_TOKENS
+            if cost <= remaining:
+                review = dict(reviews[i])
+                review['_cluster_share'] = sum(weights[m] for m in members) / total_weight
+                selected.append(review)
+                remaining -= cost
+                break
+
+    return selected
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Map-Reduce Review Summaries (No external dependencies)
+
+Lets persona generation draw on every review, not only the few dozen that
+fit in the prompt:
+
+1. Map: the full review set is cut into token-bounded chunks (chunks never
+   span two CSV files, so a new export only adds chunks). Each chunk is
+   summarized by Claude on a bounded worker pool.
+2. Reduce: summaries are merged in token-bounded groups, repeatedly, until
+   a single corpus-wide summary remains. That summary goes into the final
+   persona prompt next to the representative reviews.
+
+Every map and reduce result is stored under the SHA-256 of its prompt
+version, model and input text ({agent}/.cache/review_summaries/). Re-runs
+only summarize chunks whose text changed. LLM_CACHE_BYPASS=1 (--no-cache)
+skips lookups, and fresh summaries overwrite the stored ones.
+"""
+
+import concurrent.futures
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from response_cache import bypass_requested
+from llm_client import call_claude_api
+from review_selection import estimate_tokens
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "review_summaries"
+DEFAULT_CHUNK_TOKENS = 6000
+DEFAULT_REDUCE_TOKENS = 12000
+DEFAULT_SUMMARY_MAX_TOKENS = 1500
+DEFAULT_WORKERS = 4
+# Longest single review kept in a chunk (characters)
+MAX_REVIEW_CHARS = 2000
+
+# Bump when the prompts below change so stored summaries are not reused
+MAP_VERSION = "review_map:v1"
+REDUCE_VERSION = "review_reduce:v1"
+
+MAP_PROMPT = """You are analyzing one batch of customer reviews for a product. Summarize the batch for a persona researcher.
+
+Report, with the approximate number of reviews behind each point:
+- Customer segments (who these buyers are: life situation, occupation, age and income cues, locations)
+- Jobs to be done and purchase motivations
+- Pain points and complaints
+- Benefits and delights
+- 3-5 short verbatim quotes that capture the customer voice (keep the exact wording)
+
+Be concise and factual. Do not invent details that are not in the reviews.
+
+REVIEWS ({count} reviews):
+{reviews}"""
+
+REDUCE_PROMPT = """Below are summaries of separate batches of customer reviews for the same product, {count} reviews in total.
+
+Merge them into one summary with the same sections (customer segments, jobs to be done and motivations, pain points, benefits, verbatim quotes). Add up the review counts for points that appear in several batches, order each section by how many reviews support it, and keep the most vivid verbatim quotes.
+
+BATCH SUMMARIES:
+{summaries}"""
+
+
+def format_review_line(review, bucket):
+    """One compact review line for a map chunk"""
+    content = " ".join((review.get('Review Content') or '').split())[:MAX_REVIEW_CHARS]
+    return f"- [{bucket}, {review.get('Stars', 'N/A')} stars, {review.get('Area', 'Unknown')}] {content}"
+
+
+def iter_chunks(labeled_reviews, max_tokens=DEFAULT_CHUNK_TOKENS):
+    """Group (source, bucket, review) tuples into token-bounded chunks
+
+    Yields (text, review_count). A chunk is closed whenever the source (CSV
+    file) changes, so appending a file leaves earlier chunks untouched.
+    """
+    lines, tokens, source = [], 0, None
+    for review_source, bucket, review in labeled_reviews:
+        line = format_review_line(review, bucket)
+        cost = estimate_tokens(line)
+        if lines and (review_source != source or tokens + cost > max_tokens):
+            yield "\n".join(lines), len(lines)
+            lines, tokens = [], 0
+        source = review_source
+        lines.append(line)
+        tokens += cost
+    if lines:
+        yield "\n".join(lines), len(lines)
+
+
+class SummaryCache:
+    """Directory of {sha256}.json summaries keyed by prompt version, model and input"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, bypass=False):
+        self.cache_dir = Path(cache_dir)
+        self.bypass = bypass or bypass_requested()
+
+    @staticmethod
+    def key(version, model, text):
+        return hashlib.sha256(f"{version}\n{model}\n{text}".encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        if self.bypass:
+            return None
+        try:
+            with open(self.cache_dir / f"{key}.json", 'r', encoding='utf-8') as f:
+                return json.load(f).get('summary')
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def put(self, key, summary, review_count):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"summary": summary, "review_count": review_count}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_dir / f"{key}.json")
+        except Exception:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+
+class ReviewSummarizer:
+    """Runs the map and reduce calls for one generation run"""
+
+    def __init__(self, config, cache=None):
+        settings = config.get('review_map_reduce', {})
+        self.config = config
+        self.model = config.get('model')
+        self.chunk_tokens = settings.get('chunk_tokens', DEFAULT_CHUNK_TOKENS)
+        self.reduce_tokens = settings.get('reduce_tokens', DEFAULT_REDUCE_TOKENS)
+        self.max_tokens = settings.get('summary_max_tokens', DEFAULT_SUMMARY_MAX_TOKENS)
+        self.workers = max(1, int(settings.get('workers', DEFAULT_WORKERS)))
+        self.cache = cache or SummaryCache(settings.get('cache_dir') or DEFAULT_CACHE_DIR)
+        self.calls = 0
+        self.cache_hits = 0
+
+    def _summarize(self, version, prompt, text, review_count):
+        """Return (summary, review_count) for one chunk or group, from the cache when possible"""
+        key = SummaryCache.key(version, self.model, text)
+        summary = self.cache.get(key)
+        if summary is not None:
+            self.cache_hits += 1
+            return summary, review_count
+
+        self.calls += 1
+        summary = call_claude_api(prompt, self.config, max_tokens=self.max_tokens, agent="user_story_real_reviews")
+        if summary:
+            try:
+                self.cache.put(key, summary, review_count)
+            except OSError as e:
+                print(f"Warning: Could not write summary cache: {e}")
+        return summary, review_count
+
+    def _run_pool(self, jobs):
+        """Run (version, prompt, text, count) jobs with at most `workers` in flight, keeping order
+
+        Jobs are consumed lazily, so only a window of chunks is held in memory.
+        """
+        results = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as pool:
+            running = {}
+            for index, job in enumerate(jobs):
+                running[pool.submit(self._summarize, *job)] = index
+                if len(running) >= self.workers * 2:
+                    done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        results[running.pop(future)] = future.result()
+            for future in concurrent.futures.as_completed(running):
+                results[running[future]] = future.result()
+        return [results[index] for index in sorted(results)]
+
+    def map(self, labeled_reviews):
+        """Summarize every chunk; returns [(summary, review_count)] for the chunks that succeeded"""
+        jobs = (
+            (MAP_VERSION, MAP_PROMPT.format(count=count, reviews=text), text, count)
+            for text, count in iter_chunks(labeled_reviews, self.chunk_tokens)
+        )
+        results = self._run_pool(jobs)
+        failed = sum(1 for summary, _ in results if not summary)
+        if failed:
+            print(f"Warning: {failed} of {len(results)} review chunks could not be summarized")
+        return [(summary, count) for summary, count in results if summary]
+
+    def reduce(self, summaries):
+        """Merge chunk summaries group by group until one remains; returns (summary, review_count)"""
+        while len(summaries) > 1:
+            groups, group, tokens = [], [], 0
+            for summary, count in summaries:
+                cost = estimate_tokens(summary)
+                if group and tokens + cost > self.reduce_tokens:
+                    groups.append(group)
+                    group, tokens = [], 0
+                group.append((summary, count))
+                tokens += cost
+            groups.append(group)
+            if len(groups) == len(summaries):
+                # Every summary is over the group budget on its own - merge pairwise
+                groups = [summaries[i:i + 2] for i in range(0, len(summaries), 2)]
+
+            jobs = []
+            for group in groups:
+                count = sum(c for _, c in group)
+                text = "\n\n---\n\n".join(summary for summary, _ in group)
+                jobs.append((REDUCE_VERSION, REDUCE_PROMPT.format(count=count, summaries=text), text, count))
+            merged = [result for result in self._run_pool(jobs) if result[0]]
+            if not merged:
+                return None
+            summaries = merged
+
+        return summaries[0] if summaries else None
+
+    def summarize(self, labeled_reviews):
+        """Map then reduce; returns (corpus summary, reviews covered) or None"""
+        summaries = self.map(labeled_reviews)
+        print(f"Review chunks summarized: {len(summaries)} "
+              f"({self.calls} API calls, {self.cache_hits} from summary cache)")
+        return self.reduce(summaries)
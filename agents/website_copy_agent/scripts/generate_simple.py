@@ -8,9 +8,17 @@ using Claude API based on brand strategy inputs.
 
 import json
 import os
+import sys
 from pathlib import Path
 from datetime import datetime
-import anthropic
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "shared"))
+from keyword_bank import keywords_for_prompt
+from llm_client import extract_text, get_client, system_blocks
+from project_context import resolve_project
+
+# Keywords bank vectors for website copy: the SEO vectors plus benefit angles
+KEYWORD_VECTORS = ("A", "B", "C", "F")
 
 def load_config():
     """Load configuration from config.json"""
@@ -119,6 +127,11 @@ def load_input_files(config, input_dir=None):
         print("  - Testimonials/reviews file")
         return None
     
+    input_content["keywords_bank.md"] = keywords_for_prompt(
+        file_types["keywords"], input_content["keywords_bank.md"], config, KEYWORD_VECTORS,
+        query=input_content["message_house.md"]
+    )
+    
     print(f"\n[SUCCESS] Successfully loaded all 3 required input types")
     return input_content
 
@@ -162,8 +175,12 @@ Remember: The logic behind the content order is more valuable than the content i
         marketing_testimonials=input_content["marketing_testimonials.md"]
     )
 
-def generate_website_copy(config, system_prompt, user_prompt):
-    """Generate website copy using Claude API"""
+def generate_website_copy(config, system_prompt, user_prompt, output_path=None):
+    """Generate website copy using Claude API
+
+    With output_path the response is streamed straight into that file
+    (written as .partial, renamed when complete).
+    """
     
     # Get API key from config
     api_key = config.get("anthropic_api_key")
@@ -172,34 +189,36 @@ def generate_website_copy(config, system_prompt, user_prompt):
         return None
     
     try:
-        # Initialize Claude client
-        client = anthropic.Anthropic(api_key=api_key)
-        
         print("Generating website copy...")
         print("This may take 30-60 seconds for comprehensive analysis...")
         
-        # Generate response
-        response = client.messages.create(
+        # Generate response through the shared pooled client
+        messages = [
+            {
+                "role": "user",
+                "content": user_prompt
+            }
+        ]
+        options = dict(
+            system=system_blocks(system_prompt),
+            agent="website_copy",
             model=config["model"],
             max_tokens=config["max_tokens"],
-            temperature=config["temperature"],
-            system=system_prompt,
-            messages=[
-                {
-                    "role": "user",
-                    "content": user_prompt
-                }
-            ]
+            temperature=config["temperature"]
         )
+        if output_path is not None:
+            response = get_client(config).stream_message(messages, output_path, **options)
+        else:
+            response = get_client(config).create_message(messages, **options)
         
-        return response.content[0].text
+        return extract_text(response)
         
     except Exception as e:
         print(f"Error generating website copy: {e}")
         return None
 
-def save_output(config, content, output_dir=None):
-    """Save generated website copy to output directory"""
+def get_output_path(config, output_dir=None):
+    """Timestamped path for a new website copy output"""
     if output_dir is None:
         output_dir = Path(__file__).parent.parent / config["output_dir"]
     output_dir.mkdir(exist_ok=True)
@@ -207,7 +226,12 @@ def save_output(config, content, output_dir=None):
     # Create timestamped filename
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"website_copy_{timestamp}.md"
-    filepath = output_dir / filename
+    return output_dir / filename
+
+def save_output(config, content, output_dir=None):
+    """Save generated website copy to output directory"""
+    filepath = get_output_path(config, output_dir)
+    filename = filepath.name
     
     try:
         with open(filepath, 'w', encoding='utf-8') as f:
@@ -221,13 +245,14 @@ def save_output(config, content, output_dir=None):
         print(f"Error saving output: {e}")
         return None
 
-def get_project_paths(config_file="config.json"):
-    """Get project-specific paths from configuration"""
+def get_project_paths(config_file="config.json", project=None):
+    """Get project-specific paths (explicit project, else --project / PIPELINE_PROJECT, else current_project from configuration)"""
     config_path = Path(__file__).parent.parent / config_file
     try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-        project = config.get("current_project", None)
+        if project is None:
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+            project = resolve_project(config, Path(__file__).resolve().parent.parent)
         
         if project:
             return {
@@ -248,42 +273,58 @@ def get_project_paths(config_file="config.json"):
             "output_dir": Path(__file__).parent.parent / "3_unlabeled"
         }
 
-def main():
-    """Main execution function"""
+def run(project=None, config=None):
+    """Generate website copy for one project (Agent 0b calls this in-process)
+
+    Returns the output path, or None on failure.
+    """
     print("=== Website Copy Agent - Generation ===\n")
     
     # Get project-aware paths
-    paths = get_project_paths()
+    paths = get_project_paths(project=project)
     
     # Load configuration
-    config = load_config()
+    if config is None:
+        config = load_config()
     if not config:
-        return
+        return None
     
     # Load system prompt with project-aware path
     system_prompt = load_system_prompt(config)
     if not system_prompt:
-        return
+        return None
     
     # Load input files with project-aware path
     input_content = load_input_files(config, paths["input_dir"])
     if not input_content:
-        return
+        return None
     
     # Create user prompt
     user_prompt = create_user_prompt(input_content)
     
-    # Generate website copy
-    website_copy = generate_website_copy(config, system_prompt, user_prompt)
+    # Generate website copy (streamed straight into 3_unlabeled unless "stream_output" is false)
+    output_path = get_output_path(config, paths["output_dir"]) if config.get("stream_output", True) else None
+    website_copy = generate_website_copy(config, system_prompt, user_prompt, output_path)
     if not website_copy:
-        return
+        return None
     
     # Save output with project-aware path
-    output_path = save_output(config, website_copy, paths["output_dir"])
+    if output_path is None:
+        output_path = save_output(config, website_copy, paths["output_dir"])
+    else:
+        print(f"\n[SUCCESS] Website copy saved to: {output_path.name}")
+        print(f"Full path: {output_path}")
     if output_path:
         print(f"\n=== Generation Complete ===")
         print(f"Review the output in: {output_path}")
         print(f"Use scripts/evaluate.py to score and provide feedback")
     
+    return output_path
+
+def main():
+    """Main execution function"""
+    if not run():
+        sys.exit(1)
+    
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -15,8 +15,6 @@ DO NOT modify the foundation patterns - only customize the business logic sectio
 import json
 import os
 import sys
-import urllib.request
-import urllib.parse
 from datetime import datetime
 from pathlib import Path
 
@@ -58,13 +56,14 @@ def load_file(file_path):
 # PATTERN 4: PROJECT PATH HANDLING (Universal - DO NOT MODIFY)
 # =============================================================================
 
-def get_project_paths(config_file="config.json"):
-    """Get project-specific paths from configuration - STANDARD PATTERN"""
+def get_project_paths(config_file="config.json", project=None):
+    """Get project-specific paths (explicit project, else current_project) - STANDARD PATTERN"""
     config_path = Path(__file__).parent.parent / config_file
     try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-        project = config.get("current_project", None)
+        if project is None:
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+            project = config.get("current_project", None)
         
         if project:
             # New project-based structure
@@ -92,55 +91,12 @@ def get_project_paths(config_file="config.json"):
 # PATTERN 5: CLAUDE API CALLING (Universal - DO NOT MODIFY)
 # =============================================================================
 
-def call_claude_api(prompt, config):
-    """Call Claude API using urllib - STANDARD PATTERN"""
-    try:
-        # Prepare the request
-        url = "https://api.anthropic.com/v1/messages"
-        
-        data = {
-            "model": config['model'],
-            "max_tokens": config['max_tokens'],
-            "temperature": config['temperature'],
-            "messages": [
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ]
-        }
-        
-        # Convert to JSON
-        json_data = json.dumps(data).encode('utf-8')
-        
-        # Create request
-        req = urllib.request.Request(url)
-        req.add_header('Content-Type', 'application/json')
-        req.add_header('x-api-key', config['anthropic_api_key'])
-        req.add_header('anthropic-version', '2023-06-01')
-        
-        print("Calling Claude API...")
-        
-        # Make the request
-        with urllib.request.urlopen(req, json_data) as response:
-            response_data = json.loads(response.read().decode('utf-8'))
-            
-        # Extract the content
-        if 'content' in response_data and len(response_data['content']) > 0:
-            return response_data['content'][0]['text']
-        else:
-            print("Error: Unexpected API response format")
-            print("Response:", response_data)
-            return None
-            
-    except urllib.error.HTTPError as e:
-        print(f"HTTP Error: {e.code} - {e.reason}")
-        error_body = e.read().decode('utf-8')
-        print(f"Error details: {error_body}")
-        return None
-    except Exception as e:
-        print(f"Error calling Claude API: {e}")
-        return None
+# All agents share one pooled, keep-alive client in agents/shared/llm_client.py.
+# Import it instead of copying an urllib implementation into each script, so
+# performance and reliability fixes reach every agent at once.
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "agents" / "shared"))
+from llm_client import call_claude_api  # In agent scripts: parent.parent.parent / "shared"
 
 # =============================================================================
 # PATTERN 6: OUTPUT SAVING (Universal - DO NOT MODIFY)
@@ -265,17 +221,21 @@ def find_input_files(input_dir, pattern="*.md"):
 # PATTERN 9: MAIN EXECUTION TEMPLATE (Customize Business Logic Sections)
 # =============================================================================
 
-def main_execution_template(agent_name, agent_prefix, content_key="content"):
+def main_execution_template(agent_name, agent_prefix, content_key="content", project=None, config=None):
     """
     Main execution template - STANDARD STRUCTURE
     
     CUSTOMIZE: Input file detection, content generation logic
     DO NOT MODIFY: Path handling, API calling, file saving structure
+    
+    Expose this as the script's run(project=None, config=None) entry point:
+    Agent 0b calls it in-process, so it returns the output path (or None on
+    failure) instead of calling sys.exit(). main() exits non-zero on None.
     """
     print(f"{agent_name} Generator Starting...")
     
     # Get project-aware paths (STANDARD)
-    paths = get_project_paths()
+    paths = get_project_paths(project=project)
     input_dir = paths["input_dir"]
     system_assets_dir = paths["system_assets_dir"]
     output_dir = paths["output_dir"]
@@ -283,24 +243,25 @@ def main_execution_template(agent_name, agent_prefix, content_key="content"):
     # Find input files (CUSTOMIZE PATTERN AS NEEDED)
     input_file = find_input_files(input_dir, "*.md")  # Modify pattern as needed
     if not input_file:
-        sys.exit(1)
+        return None
     
     system_prompt_file = system_assets_dir / "system_prompt.md"
     
     # Load configuration (STANDARD)
     print("Loading configuration...")
-    config = load_config()
+    if config is None:
+        config = load_config()
     
     # Load input files (STANDARD)
     print("Loading input content...")
     input_content = load_file(input_file)
     if not input_content:
-        sys.exit(1)
+        return None
     
     print("Loading system prompt...")
     system_prompt = load_file(system_prompt_file)
     if not system_prompt:
-        sys.exit(1)
+        return None
     
     print("Loading examples...")
     example = load_example_from_json(content_key)
@@ -309,13 +270,13 @@ def main_execution_template(agent_name, agent_prefix, content_key="content"):
     print("Generating content...")
     generated_content = generate_content_custom(input_content, system_prompt, example, config)
     if not generated_content:
-        sys.exit(1)
+        return None
     
     # Save output (STANDARD)
     print("Saving output...")
     output_path = save_output(generated_content, output_dir, agent_prefix)
     if not output_path:
-        sys.exit(1)
+        return None
     
     # Success message (STANDARD)
     print(f"""
@@ -330,6 +291,8 @@ Next steps:
 2. Evaluate and score it using scripts/evaluate.py
 3. Move to 4_labeled_md/ and 5_labeled_json/ when reviewed
 """)
+    
+    return output_path
 
 # =============================================================================
 # PATTERN 10: CONTENT GENERATION TEMPLATE (Customize Entirely)